@@ -0,0 +1,159 @@
+"""
+Admission control for LLM-bound agent runs: bounded concurrency, priority queue, load shedding
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Dict, Any, List, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class Priority(IntEnum):
+    """Lower value is served first"""
+    INTERACTIVE = 0  # Live chat / WebSocket users
+    BATCH = 1        # Evaluation replays and other offline callers
+
+class Overloaded(Exception):
+    """Raised when a request is shed; status_code is 429 (queue full) or 503 (waited too long)"""
+
+    def __init__(self, message: str, retry_after: float, status_code: int = 429):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.status_code = status_code
+
+class AdmissionController:
+    """
+    Caps concurrent agent runs at `max_in_flight`.
+
+    Requests beyond that wait in a priority queue of at most `max_queue`
+    entries (interactive ahead of batch, FIFO within a priority). When the
+    queue is full a new request is rejected straight away, unless it
+    outranks the lowest-priority waiter, which is shed in its place. A
+    waiter that is not admitted within `queue_timeout` seconds is rejected
+    too. Rejections carry a Retry-After estimate from the recent run time.
+    """
+
+    def __init__(self, max_in_flight: int = 8, max_queue: int = 64, queue_timeout: float = 30.0):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self._in_flight = 0
+        self._queue: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+        self._avg_run_seconds = 5.0  # EWMA seed until real runs are observed
+        self._waits: deque = deque(maxlen=1000)
+        self.peak_queue_depth = 0
+        self.admitted = {priority.name.lower(): 0 for priority in Priority}
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self.shed_for_priority = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, waiter in self._queue if not waiter.done())
+
+    def retry_after(self) -> float:
+        """Seconds until a slot is likely free, given the queue ahead"""
+        return self._avg_run_seconds * (self.queue_depth + 1) / self.max_in_flight
+
+    def _wake_next(self):
+        """Hand a free slot to the best waiting request"""
+        while self._queue and self._in_flight < self.max_in_flight:
+            _, _, waiter = heapq.heappop(self._queue)
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def _shed_lowest(self, priority: Priority) -> bool:
+        """Reject the lowest-priority, newest waiter if it ranks below `priority`"""
+        pending = [entry for entry in self._queue if not entry[2].done()]
+        if not pending:
+            return False
+        worst = max(pending, key=lambda entry: (entry[0], entry[1]))
+        if worst[0] <= priority:
+            return False
+        worst[2].set_exception(Overloaded("Request shed for higher-priority traffic", self.retry_after()))
+        self.shed_for_priority += 1
+        return True
+
+    async def _acquire(self, priority: Priority) -> float:
+        """Wait for a slot; returns seconds spent queued"""
+        if self._in_flight < self.max_in_flight and not self.queue_depth:
+            self._in_flight += 1
+            return 0.0
+
+        if self.queue_depth >= self.max_queue and not self._shed_lowest(priority):
+            self.rejected_full += 1
+            raise Overloaded("Too many requests queued, please retry shortly", self.retry_after(), 429)
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (int(priority), next(self._sequence), waiter))
+        self.peak_queue_depth = max(self.peak_queue_depth, self.queue_depth)
+        started = time.monotonic()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                return time.monotonic() - started  # Admitted just as the timer fired
+            waiter.cancel()
+            self.rejected_timeout += 1
+            raise Overloaded("Service is busy, please retry shortly", self.retry_after(), 503)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._release()  # Slot was handed to us; pass it on
+            else:
+                waiter.cancel()
+            raise
+        return time.monotonic() - started
+
+    def _release(self):
+        self._in_flight -= 1
+        self._wake_next()
+
+    @asynccontextmanager
+    async def admit(self, priority: Priority = Priority.INTERACTIVE):
+        """Hold an in-flight slot for the duration of the block, or raise Overloaded"""
+        waited = await self._acquire(priority)
+        self._waits.append(waited)
+        self.admitted[priority.name.lower()] += 1
+        if waited > 0.05:
+            logger.info(f"⏳ Admitted {priority.name.lower()} request after {waited * 1000:.0f}ms in queue")
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * (time.monotonic() - started)
+            self._release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "peak_queue_depth": self.peak_queue_depth,
+            "admitted": dict(self.admitted),
+            "rejected_queue_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+            "shed_for_priority": self.shed_for_priority,
+            "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+            "p95_wait_ms": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+            "avg_run_seconds": round(self._avg_run_seconds, 2),
+            "retry_after_estimate": math.ceil(self.retry_after())
+        }
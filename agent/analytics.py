@@ -0,0 +1,315 @@
+"""
+Vectorized NAV analytics: returns, CAGR, volatility, risk ratios, drawdown and SIP XIRR
+
+Every function works on a (funds x dates) NAV matrix aligned on one date
+grid, so a comparison of many funds is a handful of array operations.
+Percentages in the final report are expressed in percent (12.5 = 12.5%).
+"""
+
+import math
+import warnings
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .nav_store import NavSeries, to_iso
+
+TRADING_DAYS = 252
+DAYS_PER_YEAR = 365.0
+
+TRAILING_PERIODS = {"1m": 30, "3m": 91, "6m": 182, "1y": 365, "3y": 1095, "5y": 1826}
+
+# Annualized risk below this is float noise (a flat NAV, e.g. a liquid fund); ratios over it are NaN
+MIN_RISK = 1e-9
+
+@contextmanager
+def _nan_safe():
+    """Silence the warnings NumPy raises for all-NaN rows and 0/0; those results are NaN by design"""
+    with warnings.catch_warnings(), np.errstate(invalid="ignore", divide="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        yield
+
+def align_series(series: Sequence[NavSeries]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Align NAV series on the union of their dates.
+
+    Returns (grid, navs) where grid is ascending date32 and navs is a
+    (funds x dates) float64 matrix, forward-filled over holidays and NaN
+    before each fund's first NAV and after its last one, so a fund whose
+    history ends early never gets a made-up flat tail.
+    """
+    non_empty = [s.dates for s in series if len(s)]
+    if not non_empty:
+        return np.zeros(0, dtype=np.int32), np.full((len(series), 0), np.nan)
+
+    grid = np.unique(np.concatenate(non_empty))
+    matrix = np.full((len(series), len(grid)), np.nan)
+    for row, s in enumerate(series):
+        if not len(s):
+            continue
+        idx = np.searchsorted(s.dates, grid, side="right") - 1
+        valid = (idx >= 0) & (grid <= s.dates[-1])
+        matrix[row, valid] = np.asarray(s.navs)[idx[valid]]
+    return grid, matrix
+
+def _index_at_or_before(grid: np.ndarray, days: np.ndarray) -> np.ndarray:
+    return np.searchsorted(grid, days, side="right") - 1
+
+def annualize(total_return: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """Convert a total return over `days` calendar days to a compound annual rate"""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.power(1.0 + total_return, DAYS_PER_YEAR / days) - 1.0
+
+def trailing_returns(grid: np.ndarray, navs: np.ndarray,
+                     periods: Dict[str, int] = TRAILING_PERIODS) -> Dict[str, np.ndarray]:
+    """
+    Point-to-point returns to each fund's latest NAV for each period.
+
+    Periods up to a year are absolute; longer periods are annualized (CAGR),
+    following the usual mutual fund factsheet convention. A period the
+    fund's own history doesn't fully cover is NaN.
+    """
+    funds = navs.shape[0]
+    if not len(grid):
+        return {name: np.full(funds, np.nan) for name in periods}
+
+    first, last = _first_valid_index(navs), _last_valid_index(navs)
+    rows = np.flatnonzero(last >= 0)
+    end_day = grid[last[rows]]
+    end = navs[rows, last[rows]]
+
+    results = {}
+    for name, days in periods.items():
+        result = np.full(funds, np.nan)
+        start = _index_at_or_before(grid, end_day - days)
+        covered = (start >= 0) & (start >= first[rows])
+        if covered.any():
+            with np.errstate(invalid="ignore", divide="ignore"):
+                total = end[covered] / navs[rows[covered], start[covered]] - 1.0
+            span = (end_day[covered] - grid[start[covered]]).astype(np.float64)
+            result[rows[covered]] = annualize(total, span) if days > 365 else total
+        results[name] = result
+    return results
+
+def _first_valid_index(navs: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(navs)
+    first = valid.argmax(axis=1)
+    first[~valid.any(axis=1)] = -1
+    return first
+
+def _last_valid_index(navs: np.ndarray) -> np.ndarray:
+    valid = ~np.isnan(navs)
+    last = navs.shape[1] - 1 - valid[:, ::-1].argmax(axis=1)
+    last[~valid.any(axis=1)] = -1
+    return last
+
+def cagr(grid: np.ndarray, navs: np.ndarray) -> np.ndarray:
+    """Compound annual growth rate from each fund's first NAV in the window to its last"""
+    first, last = _first_valid_index(navs), _last_valid_index(navs)
+    result = np.full(navs.shape[0], np.nan)
+    ok = first >= 0
+    if not ok.any():
+        return result
+    rows = np.flatnonzero(ok)
+    start_nav = navs[rows, first[ok]]
+    days = (grid[last[ok]] - grid[first[ok]]).astype(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result[rows] = np.where(days > 0, annualize(navs[rows, last[ok]] / start_nav - 1.0, days), np.nan)
+    return result
+
+def daily_returns(navs: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return navs[:, 1:] / navs[:, :-1] - 1.0
+
+def annualized_volatility(navs: np.ndarray) -> np.ndarray:
+    with _nan_safe():
+        return np.nanstd(daily_returns(navs), axis=1, ddof=1) * math.sqrt(TRADING_DAYS)
+
+def sharpe_ratio(annual_return: np.ndarray, volatility: np.ndarray, risk_free_rate: float) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(volatility > MIN_RISK, (annual_return - risk_free_rate) / volatility, np.nan)
+
+def sortino_ratio(navs: np.ndarray, annual_return: np.ndarray, risk_free_rate: float) -> np.ndarray:
+    """
+    Excess annual return over annualized downside deviation below the daily risk-free rate.
+
+    Undefined (NaN), like the Sharpe ratio, when returns don't vary: a flat
+    NAV falls short of the risk-free rate by the same amount every day,
+    which is a shortfall but not a risk.
+    """
+    daily_rf = (1.0 + risk_free_rate) ** (1.0 / TRADING_DAYS) - 1.0
+    returns = daily_returns(navs)
+    shortfall = np.minimum(returns - daily_rf, 0.0)
+    with _nan_safe():
+        downside = np.sqrt(np.nanmean(shortfall ** 2, axis=1)) * math.sqrt(TRADING_DAYS)
+        spread = np.nanstd(returns, axis=1) * math.sqrt(TRADING_DAYS)
+        defined = (downside > MIN_RISK) & (spread > MIN_RISK)
+        return np.where(defined, (annual_return - risk_free_rate) / downside, np.nan)
+
+def max_drawdown(navs: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns (max drawdown as a negative fraction, peak index, trough index); indices are -1 if undefined"""
+    funds = navs.shape[0]
+    if not navs.size:
+        return np.full(funds, np.nan), np.full(funds, -1), np.full(funds, -1)
+
+    peaks = np.fmax.accumulate(navs, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        drawdowns = navs / peaks - 1.0
+    has_data = ~np.all(np.isnan(drawdowns), axis=1)
+
+    filled = np.where(np.isnan(drawdowns), np.inf, drawdowns)
+    trough = filled.argmin(axis=1)
+    depth = filled[np.arange(funds), trough]
+
+    # Peak = highest NAV at or before the trough
+    before_trough = np.arange(navs.shape[1])[None, :] <= trough[:, None]
+    peak = np.where(before_trough & ~np.isnan(navs), navs, -np.inf).argmax(axis=1)
+
+    depth = np.where(has_data, depth, np.nan)
+    trough = np.where(has_data & (depth < 0), trough, -1)
+    peak = np.where(has_data & (depth < 0), peak, -1)
+    return depth, peak, trough
+
+def rolling_returns(grid: np.ndarray, navs: np.ndarray, window_days: int = 365) -> np.ndarray:
+    """(funds x dates) matrix of window returns ending on each date, annualized beyond a year"""
+    start_idx = _index_at_or_before(grid, grid - window_days)
+    valid = (start_idx >= 0) & (grid - grid[0] >= window_days) if len(grid) else np.zeros(0, dtype=bool)
+    result = np.full(navs.shape, np.nan)
+    if not valid.any():
+        return result
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = navs[:, valid] / navs[:, start_idx[valid]] - 1.0
+    span = (grid[valid] - grid[start_idx[valid]]).astype(np.float64)
+    result[:, valid] = annualize(total, span) if window_days > 365 else total
+    return result
+
+def xirr(cashflows: np.ndarray, days: np.ndarray, low: float = -0.99, high: float = 10.0,
+         iterations: int = 100) -> np.ndarray:
+    """
+    Annualized IRR for each row of (funds x flows) cashflows on common dates.
+
+    Solved by vectorized bisection, which is robust for the SIP pattern of
+    outflows followed by one inflow (NPV is monotonic in the rate).
+    """
+    years = (days - days[0]).astype(np.float64) / DAYS_PER_YEAR
+
+    def npv(rates: np.ndarray) -> np.ndarray:
+        return np.sum(cashflows / np.power(1.0 + rates[:, None], years[None, :]), axis=1)
+
+    lo = np.full(cashflows.shape[0], low)
+    hi = np.full(cashflows.shape[0], high)
+    npv_lo = npv(lo)
+    solvable = np.sign(npv_lo) != np.sign(npv(hi))
+    for _ in range(iterations):
+        mid = (lo + hi) / 2.0
+        npv_mid = npv(mid)
+        same = np.sign(npv_mid) == np.sign(npv_lo)
+        lo = np.where(same, mid, lo)
+        npv_lo = np.where(same, npv_mid, npv_lo)
+        hi = np.where(same, hi, mid)
+    return np.where(solvable & ~np.isnan(cashflows).any(axis=1), (lo + hi) / 2.0, np.nan)
+
+def sip_xirr(grid: np.ndarray, navs: np.ndarray, amount: float, months: int) -> Dict[str, np.ndarray]:
+    """
+    Simulate a monthly SIP on the first NAV date of each of the last `months`
+    months of each fund's history and value it at that fund's latest NAV.
+    Funds whose history doesn't hold all `months` instalments get NaN.
+    """
+    funds = navs.shape[0]
+    result = {"xirr": np.full(funds, np.nan), "invested": np.full(funds, np.nan), "value": np.full(funds, np.nan)}
+    if not len(grid) or months <= 0:
+        return result
+
+    month_of = grid.astype("datetime64[D]").astype("datetime64[M]")
+    first, last = _first_valid_index(navs), _last_valid_index(navs)
+    for row in np.flatnonzero(last >= 0):
+        lo, hi = first[row], last[row]
+        _, first_in_month = np.unique(month_of[lo:hi + 1], return_index=True)
+        # Skip the current month's instalment when it falls on the valuation date
+        sip_idx = (first_in_month + lo)[first_in_month + lo < hi][-months:]
+        if len(sip_idx) < months:
+            continue
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            units = (amount / navs[row, sip_idx]).sum()
+        value = units * navs[row, hi]
+        cashflows = np.append(np.full(len(sip_idx), -amount), value)[None, :]
+        flow_days = np.append(grid[sip_idx], grid[hi])
+        result["xirr"][row] = xirr(cashflows, flow_days)[0]
+        result["invested"][row] = amount * len(sip_idx)
+        result["value"][row] = value
+    return result
+
+def _pct(value: float, digits: int = 2) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value) * 100, digits)
+
+def _num(value: float, digits: int = 2) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+def compute_fund_analytics(series: Sequence[NavSeries], window_years: float = 3.0,
+                           risk_free_rate: float = 0.065, sip_amount: float = 10000.0,
+                           sip_months: int = 36, rolling_days: int = 365) -> Dict[str, Dict[str, Any]]:
+    """
+    Full analytics report for several funds at once, keyed by ISIN.
+
+    Trailing returns use each fund's full history; CAGR, volatility,
+    Sharpe/Sortino, drawdown and rolling returns use the last `window_years`.
+    """
+    grid, navs = align_series(series)
+    report: Dict[str, Dict[str, Any]] = {}
+    if not len(grid):
+        return {s.isin: {"error": "No NAV history"} for s in series}
+
+    trailing = trailing_returns(grid, navs)
+
+    window_start = _index_at_or_before(grid, np.array([grid[-1] - int(window_years * DAYS_PER_YEAR)]))[0]
+    window_grid, window_navs = grid[max(window_start, 0):], navs[:, max(window_start, 0):]
+
+    growth = cagr(window_grid, window_navs)
+    volatility = annualized_volatility(window_navs)
+    sharpe = sharpe_ratio(growth, volatility, risk_free_rate)
+    sortino = sortino_ratio(window_navs, growth, risk_free_rate)
+    drawdown, peak, trough = max_drawdown(window_navs)
+    rolling = rolling_returns(window_grid, window_navs, rolling_days)
+    sip = sip_xirr(grid, navs, sip_amount, sip_months)
+
+    with _nan_safe():
+        rolling_mean = np.nanmean(rolling, axis=1)
+        rolling_min = np.nanmin(rolling, axis=1)
+        rolling_max = np.nanmax(rolling, axis=1)
+        rolling_positive = np.sum(rolling > 0, axis=1) / np.sum(~np.isnan(rolling), axis=1)
+
+    for i, s in enumerate(series):
+        if not len(s):
+            report[s.isin] = {"error": "No NAV history"}
+            continue
+        report[s.isin] = {
+            "as_of": to_iso(s.dates[-1]),
+            "latest_nav": _num(s.navs[-1], 4),
+            "history_start": to_iso(s.dates[0]),
+            "trailing_returns_pct": {name: _pct(values[i]) for name, values in trailing.items()},
+            "window_years": window_years,
+            "cagr_pct": _pct(growth[i]),
+            "volatility_pct": _pct(volatility[i]),
+            "sharpe_ratio": _num(sharpe[i]),
+            "sortino_ratio": _num(sortino[i]),
+            "max_drawdown_pct": _pct(drawdown[i]),
+            "max_drawdown_peak": to_iso(window_grid[peak[i]]) if peak[i] >= 0 else None,
+            "max_drawdown_trough": to_iso(window_grid[trough[i]]) if trough[i] >= 0 else None,
+            f"rolling_{rolling_days}d_pct": {
+                "mean": _pct(rolling_mean[i]),
+                "min": _pct(rolling_min[i]),
+                "max": _pct(rolling_max[i]),
+                "positive_share_pct": _pct(rolling_positive[i])
+            },
+            "sip": {
+                "monthly_amount": sip_amount,
+                "months": sip_months,
+                "invested": _num(sip["invested"][i]),
+                "value": _num(sip["value"][i]),
+                "xirr_pct": _pct(sip["xirr"][i])
+            },
+            "risk_free_rate_pct": _pct(risk_free_rate)
+        }
+    return report
@@ -0,0 +1,242 @@
+"""
+TTL + LRU response cache for upstream fund API responses
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from .config import AgentConfig
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def _normalize_value(value: Any) -> str:
+    """Normalize a key component: case-insensitive, whitespace-collapsed"""
+    return re.sub(r"\s+", " ", str(value)).strip().lower()
+
+def make_cache_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build a normalized cache key from an endpoint name and its parameters.
+
+    "HDFC Flexi Cap" and "hdfc flexi cap " produce the same key, and
+    parameter order does not matter.
+    """
+    parts = [_normalize_value(endpoint)]
+    for name in sorted(params or {}):
+        value = params[name]
+        if value is None:
+            continue
+        parts.append(f"{_normalize_value(name)}={_normalize_value(value)}")
+    return "|".join(parts)
+
+class SQLiteCacheTier:
+    """Optional on-disk cache tier that survives process restarts"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Return (value, expires_at) for a live entry, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            return row[0], row[1]
+
+    def set(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            )
+            self._conn.commit()
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM response_cache WHERE key LIKE ?", (prefix + "%",))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class ResponseCache:
+    """
+    In-memory LRU cache with per-endpoint TTLs and an optional SQLite tier.
+
+    Values are raw response bodies (JSON text), so every caller decodes its
+    own copy and cached data can never be mutated through a shared object.
+    Endpoints with a TTL of 0 (or no TTL and no default) are not cached.
+    """
+
+    def __init__(self, max_entries: int = 1000, default_ttl: float = 0,
+                 endpoint_ttls: Optional[Dict[str, float]] = None,
+                 disk_tier: Optional[SQLiteCacheTier] = None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.endpoint_ttls = endpoint_ttls or {}
+        self.disk_tier = disk_tier
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_config(cls, config: AgentConfig) -> Optional['ResponseCache']:
+        """Build the cache described by AgentConfig, or None if caching is disabled"""
+        if not config.RESPONSE_CACHE_ENABLED:
+            return None
+
+        endpoint_ttls = {
+            # Catalogue / identity lookups
+            "funds_search": config.CACHE_TTL_CATALOGUE,
+            "funds_list": config.CACHE_TTL_CATALOGUE,
+            "bse_schemes": config.CACHE_TTL_CATALOGUE,
+            "bse_scheme": config.CACHE_TTL_CATALOGUE,
+            "fund_details": config.CACHE_TTL_CATALOGUE,
+            "sip_codes": config.CACHE_TTL_CATALOGUE,
+            # Data that moves with the daily NAV
+            "nav": config.CACHE_TTL_NAV,
+            "returns": config.CACHE_TTL_NAV,
+            "complete": config.CACHE_TTL_NAV,
+            "compare": config.CACHE_TTL_NAV,
+            "performance": config.CACHE_TTL_NAV,
+            # Monthly disclosures
+            "factsheet": config.CACHE_TTL_FACTSHEET,
+            "holdings": config.CACHE_TTL_HOLDINGS,
+        }
+
+        disk_tier = SQLiteCacheTier(config.RESPONSE_CACHE_SQLITE_PATH) if config.RESPONSE_CACHE_SQLITE_PATH else None
+
+        return cls(
+            max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+            default_ttl=config.CACHE_TTL_DEFAULT,
+            endpoint_ttls=endpoint_ttls,
+            disk_tier=disk_tier
+        )
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.endpoint_ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Return the cached body for endpoint + params, or None on miss"""
+        if self.ttl_for(endpoint) <= 0:
+            return None
+
+        key = make_cache_key(endpoint, params)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+
+        if self.disk_tier is not None:
+            try:
+                disk_entry = self.disk_tier.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache read failed: {e}")
+                disk_entry = None
+            if disk_entry is not None:
+                with self._lock:
+                    self._store(key, disk_entry[0], disk_entry[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                return disk_entry[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, endpoint: str, params: Optional[Dict[str, Any]], value: str):
+        """Store a response body under endpoint + params using the endpoint's TTL"""
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return
+
+        key = make_cache_key(endpoint, params)
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+
+        if self.disk_tier is not None:
+            try:
+                self.disk_tier.set(key, value, expires_at)
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache write failed: {e}")
+
+    def _store(self, key: str, value: str, expires_at: float):
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, endpoint: Optional[str] = None):
+        """Drop all entries, or only those for one endpoint"""
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+                prefix = ""
+            else:
+                prefix = _normalize_value(endpoint) + "|"
+                for key in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[key]
+
+        if self.disk_tier is not None:
+            self.disk_tier.delete_prefix(prefix)
+
+    def close(self):
+        if self.disk_tier is not None:
+            self.disk_tier.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "disk_tier": self.disk_tier.path if self.disk_tier else None
+        }
@@ -28,7 +28,93 @@ class AgentConfig:
     API_TIMEOUT: int = int(os.getenv("API_TIMEOUT", "300"))  # 5 minutes for thorough processing  
     WEB_SCRAPE_TIMEOUT: int = int(os.getenv("WEB_SCRAPE_TIMEOUT", "180"))  # 3 minutes for web search
     
+    # HTTP connection pool (shared aiohttp session in ToolOrchestrator)
+    HTTP_POOL_LIMIT: int = int(os.getenv("HTTP_POOL_LIMIT", "100"))  # Total open connections
+    HTTP_POOL_LIMIT_PER_HOST: int = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))  # Connections per upstream host
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))  # Seconds to cache DNS lookups
+    HTTP_KEEPALIVE_TIMEOUT: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))  # Seconds to keep idle connections
+    HTTP_MAX_CONCURRENCY: int = int(os.getenv("HTTP_MAX_CONCURRENCY", "32"))  # In-flight upstream requests (0 = unlimited)
+    HTTP_MAX_CONCURRENCY_PER_HOST: int = int(os.getenv("HTTP_MAX_CONCURRENCY_PER_HOST", "8"))  # In-flight per host (0 = unlimited)
+    
+    # Response cache for fund API lookups (TTLs in seconds, 0 disables caching for that group)
+    RESPONSE_CACHE_ENABLED: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_MAX_ENTRIES: int = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+    RESPONSE_CACHE_SQLITE_PATH: str = os.getenv("RESPONSE_CACHE_SQLITE_PATH", "")  # Empty = memory only
+    CACHE_TTL_CATALOGUE: int = int(os.getenv("CACHE_TTL_CATALOGUE", "86400"))  # Search / scheme master: daily
+    CACHE_TTL_NAV: int = int(os.getenv("CACHE_TTL_NAV", "86400"))  # NAV, returns, complete data: daily
+    CACHE_TTL_FACTSHEET: int = int(os.getenv("CACHE_TTL_FACTSHEET", "604800"))  # Factsheets: weekly
+    CACHE_TTL_HOLDINGS: int = int(os.getenv("CACHE_TTL_HOLDINGS", "2592000"))  # Portfolio disclosures: monthly
+    CACHE_TTL_DEFAULT: int = int(os.getenv("CACHE_TTL_DEFAULT", "3600"))  # Ratings, sectors, NFOs, etc.
+    
+    # Coalesce concurrent identical upstream requests into one call
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    
+    # call_db_api phase scheduling: sequential | hedged | concurrent
+    DB_SEARCH_MODE: str = os.getenv("DB_SEARCH_MODE", "hedged")
+    DB_SEARCH_HEDGE_DELAY: float = float(os.getenv("DB_SEARCH_HEDGE_DELAY", "0.3"))  # Seconds between phase starts
+    DB_SEARCH_LATENCY_BUDGET: float = float(os.getenv("DB_SEARCH_LATENCY_BUDGET", "0"))  # 0 = no budget
+    
+    # Local fund catalogue index (refreshed in the background by the API server)
+    FUND_INDEX_ENABLED: bool = os.getenv("FUND_INDEX_ENABLED", "true").lower() == "true"
+    FUND_INDEX_REFRESH_INTERVAL: int = int(os.getenv("FUND_INDEX_REFRESH_INTERVAL", "21600"))  # 6 hours
+    FUND_INDEX_PAGE_SIZE: int = int(os.getenv("FUND_INDEX_PAGE_SIZE", "500"))
+    FUND_INDEX_MAX_PAGES: int = int(os.getenv("FUND_INDEX_MAX_PAGES", "200"))
+    FUND_INDEX_MIN_SCORE: float = float(os.getenv("FUND_INDEX_MIN_SCORE", "0.8"))  # Below this, search upstream
+    FUND_INDEX_MAX_RESULTS: int = int(os.getenv("FUND_INDEX_MAX_RESULTS", "10"))
+    FUND_INDEX_MIN_QUERY_LENGTH: int = int(os.getenv("FUND_INDEX_MIN_QUERY_LENGTH", "8"))  # Shorter queries (e.g. a bare AMC) need a clear lead
+    FUND_INDEX_MIN_MARGIN: float = float(os.getenv("FUND_INDEX_MIN_MARGIN", "0.05"))  # Lead over the runner-up for an ambiguous query
+    
+    # Local columnar NAV history store (memory-mapped, append-only)
+    NAV_STORE_ENABLED: bool = os.getenv("NAV_STORE_ENABLED", "true").lower() == "true"
+    NAV_STORE_DIR: str = os.getenv("NAV_STORE_DIR", "data/nav_store")
+    NAV_STORE_REFRESH_INTERVAL: int = int(os.getenv("NAV_STORE_REFRESH_INTERVAL", "43200"))  # 12 hours
+    ANALYTICS_RISK_FREE_RATE: float = float(os.getenv("ANALYTICS_RISK_FREE_RATE", "0.065"))  # Annual, for Sharpe/Sortino
+    
+    # Per-session agent memory pool
+    AGENT_SESSION_POOL_SIZE: int = int(os.getenv("AGENT_SESSION_POOL_SIZE", "1000"))  # Max sessions held in memory
+    AGENT_SESSION_TTL: int = int(os.getenv("AGENT_SESSION_TTL", "3600"))  # Drop sessions idle this long (seconds)
+    MEMORY_TOKEN_BUDGET: int = int(os.getenv("MEMORY_TOKEN_BUDGET", "1500"))  # Max history tokens sent per turn
+    MEMORY_SUMMARY_TOKEN_BUDGET: int = int(os.getenv("MEMORY_SUMMARY_TOKEN_BUDGET", "300"))  # Share kept for the rolling summary
+    SESSION_HISTORY_MAX_MESSAGES: int = int(os.getenv("SESSION_HISTORY_MAX_MESSAGES", "100"))  # Per UserSession transcript
+    
+    # Admission control for agent runs (LLM-bound)
+    ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "8"))  # Concurrent agent runs
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))  # Waiting requests before shedding (429)
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "30"))  # Max queue wait before 503
+    
+    # Client-side rate limiting for the LLM endpoint (Groq / Moonshot)
+    LLM_RATE_LIMIT_ENABLED: bool = os.getenv("LLM_RATE_LIMIT_ENABLED", "true").lower() == "true"
+    LLM_REQUESTS_PER_MINUTE: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "10000"))
+    LLM_RATE_LIMIT_SHARED_PATH: str = os.getenv("LLM_RATE_LIMIT_SHARED_PATH", "")  # SQLite file shared across processes; empty = in-process
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "4"))  # 429/5xx retries, paced by the limiter
+    LLM_FALLBACK_AFTER_BLOCK_SECONDS: float = float(os.getenv("LLM_FALLBACK_AFTER_BLOCK_SECONDS", "60"))
+    LLM_STREAMING: bool = os.getenv("LLM_STREAMING", "true").lower() == "true"  # Token streaming for /api/chat/stream and WebSocket
+    
+    # Deterministic fast path for single-fund NAV / factsheet lookups (skips the ReAct loop)
+    FAST_PATH_ENABLED: bool = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+    FAST_PATH_MIN_INTENT_CONFIDENCE: float = float(os.getenv("FAST_PATH_MIN_INTENT_CONFIDENCE", "0.85"))  # IntentParser confidence
+    FAST_PATH_MIN_MATCH_SCORE: float = float(os.getenv("FAST_PATH_MIN_MATCH_SCORE", "0.9"))  # Fund index score for a name match
+    FAST_PATH_MIN_MATCH_MARGIN: float = float(os.getenv("FAST_PATH_MIN_MATCH_MARGIN", "0.05"))  # Lead over the runner-up match
+    FAST_PATH_LLM_PHRASING: bool = os.getenv("FAST_PATH_LLM_PHRASING", "false").lower() == "true"  # One LLM call to rephrase
+    
+    # Exact + semantic cache of final agent answers, TTL by intent type
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+    LLM_CACHE_TTL_DATA: int = int(os.getenv("LLM_CACHE_TTL_DATA", "3600"))  # Fund/NAV/returns answers
+    LLM_CACHE_TTL_CONCEPT: int = int(os.getenv("LLM_CACHE_TTL_CONCEPT", "604800"))  # General / KYC explanations: weekly
+    LLM_CACHE_SEMANTIC_ENABLED: bool = os.getenv("LLM_CACHE_SEMANTIC_ENABLED", "true").lower() == "true"
+    LLM_CACHE_SIMILARITY_THRESHOLD: float = float(os.getenv("LLM_CACHE_SIMILARITY_THRESHOLD", "0.9"))  # Cosine similarity
+    LLM_CACHE_SEMANTIC_INTENTS: str = os.getenv("LLM_CACHE_SEMANTIC_INTENTS", "general_info,kyc_query,smalltalk")
+    LLM_CACHE_EMBEDDING_MODEL: str = os.getenv("LLM_CACHE_EMBEDDING_MODEL", "")  # sentence-transformers model; empty = local hashing
+    
+    # Speculative fund data prefetch while the agent's first LLM step runs
+    PREFETCH_ENABLED: bool = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+    PREFETCH_DETAILS: bool = os.getenv("PREFETCH_DETAILS", "true").lower() == "true"  # Also fetch details for the top search hit's ISIN
+    PREFETCH_MAX_ISINS: int = int(os.getenv("PREFETCH_MAX_ISINS", "3"))  # ISINs named in one question
+    
     # Agent behavior settings
+    AGENT_MODE: str = os.getenv("AGENT_MODE", "react").lower()  # react | tools (parallel function calls per step)
     CONFIDENCE_THRESHOLD: float = float(os.getenv("CONFIDENCE_THRESHOLD", "0.75"))
     MAX_WEB_SOURCES: int = 5
     
@@ -45,6 +131,16 @@ class AgentConfig:
     # Evaluation Settings
     ENABLE_DEEPEVAL: bool = os.getenv("ENABLE_DEEPEVAL", "true").lower() == "true"
     AUTO_EVALUATE: bool = os.getenv("AUTO_EVALUATE", "true").lower() == "true"
+    EVAL_JUDGE_MODE: str = os.getenv("EVAL_JUDGE_MODE", "batched")  # "batched" (one JSON call) or "per_metric"
+    JUDGE_CACHE_ENABLED: bool = os.getenv("JUDGE_CACHE_ENABLED", "true").lower() == "true"  # Reuse scores of unchanged outputs
+    JUDGE_CACHE_PATH: str = os.getenv("JUDGE_CACHE_PATH", "data/judge_cache.sqlite")  # Local SQLite file
+    EVAL_QUEUE_WORKERS: int = int(os.getenv("EVAL_QUEUE_WORKERS", "2"))  # Concurrent background evaluations
+    EVAL_QUEUE_MAX_SIZE: int = int(os.getenv("EVAL_QUEUE_MAX_SIZE", "500"))  # Pending evaluations before dropping
+    EVAL_QUEUE_OVERFLOW: str = os.getenv("EVAL_QUEUE_OVERFLOW", "sample")  # "drop" (only when full) or "sample"
+    EVAL_QUEUE_SAMPLE_RATE: float = float(os.getenv("EVAL_QUEUE_SAMPLE_RATE", "0.2"))  # Share admitted above the watermark
+    EVAL_QUEUE_SAMPLE_WATERMARK: float = float(os.getenv("EVAL_QUEUE_SAMPLE_WATERMARK", "0.8"))  # Fraction of capacity where sampling starts
+    EVAL_QUEUE_DRAIN_TIMEOUT: float = float(os.getenv("EVAL_QUEUE_DRAIN_TIMEOUT", "30"))  # Seconds to finish the backlog on shutdown
+    EVAL_RUNNER_WORKERS: int = int(os.getenv("EVAL_RUNNER_WORKERS", "4"))  # Concurrent test cases in run_evaluation.py
     AGENT_VERSION: str = os.getenv("AGENT_VERSION", "1.0.0")
     environment: str = os.getenv("ENVIRONMENT", "development")
     
@@ -0,0 +1,196 @@
+"""
+Token-budgeted conversation memory with a rolling extractive summary
+"""
+
+import re
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from utils.logger import get_logger
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # ImportError, or the encoding file can't be fetched offline
+    _ENCODING = None
+
+logger = get_logger(__name__)
+
+_ISIN_PATTERN = re.compile(r"\bINF[A-Z0-9]{9}\b")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def count_tokens(text: str) -> int:
+    """Tokens in text with the local tokenizer (~4 chars per token without tiktoken)"""
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, marking the cut"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _ENCODING is not None:
+        return _ENCODING.decode(_ENCODING.encode(text, disallowed_special=())[:max_tokens]) + " …"
+    return text[:max_tokens * 4] + " …"
+
+_GREETING = re.compile(r"^(hi|hello|hey|great question|sure|of course|absolutely)\b", re.IGNORECASE)
+
+def _first_sentence(text: str, max_words: int, skip_greetings: bool = False) -> str:
+    """First (substantive) sentence of text, capped at max_words"""
+    sentences = _SENTENCE_END.split(" ".join(text.split()))
+    sentence = sentences[0]
+    if skip_greetings:
+        sentence = next((s for s in sentences if len(s.split()) >= 4 and not _GREETING.match(s)), sentence)
+    words = sentence.split()
+    return " ".join(words[:max_words]) + (" …" if len(words) > max_words else "")
+
+def summarize_turn(user_text: str, assistant_text: str) -> str:
+    """One-line extractive digest of a turn: the question, the answer's lead and any ISINs"""
+    line = f"- User asked: {_first_sentence(user_text, 25)}"
+    lead = _first_sentence(assistant_text, 30, skip_greetings=True)
+    if lead:
+        line += f" | Assistant: {lead}"
+    isins = list(dict.fromkeys(_ISIN_PATTERN.findall(assistant_text)))
+    if isins:
+        line += f" | ISINs: {', '.join(isins[:5])}"
+    return line
+
+class MemoryMetrics:
+    """Process-wide prompt-token accounting shared by all session memories"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.full_history_tokens = 0
+        self.prompt_tokens = 0
+        self.tokens_saved = 0
+        self.turns_summarized = 0
+
+    def record_load(self, full_tokens: int, used_tokens: int):
+        with self._lock:
+            self.loads += 1
+            self.full_history_tokens += full_tokens
+            self.prompt_tokens += used_tokens
+            self.tokens_saved += max(0, full_tokens - used_tokens)
+
+    def record_summarized(self, turns: int = 1):
+        with self._lock:
+            self.turns_summarized += turns
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tokenizer": "tiktoken:cl100k_base" if _ENCODING is not None else "chars/4",
+                "loads": self.loads,
+                "full_history_tokens": self.full_history_tokens,
+                "prompt_history_tokens": self.prompt_tokens,
+                "tokens_saved": self.tokens_saved,
+                "avg_tokens_saved_per_turn": round(self.tokens_saved / self.loads, 1) if self.loads else 0.0,
+                "turns_summarized": self.turns_summarized
+            }
+
+class TokenBudgetMemory:
+    """
+    Conversation memory that renders at most `token_budget` tokens of history.
+
+    The most recent turns are kept verbatim while they fit in the budget;
+    older turns are folded into a rolling summary of one extractive line per
+    turn (question, answer lead, ISINs), itself capped at `summary_budget`
+    tokens by dropping its oldest lines. No LLM call is made to summarize.
+
+    Exposes the same load_memory_variables / save_context interface as
+    LangChain's ConversationBufferMemory with a string buffer.
+    """
+
+    def __init__(self, token_budget: int = 1500, summary_budget: int = 300,
+                 memory_key: str = "chat_history", input_key: str = "input", output_key: str = "output",
+                 human_prefix: str = "User", ai_prefix: str = "Assistant",
+                 metrics: Optional[MemoryMetrics] = None):
+        self.token_budget = token_budget
+        self.summary_budget = min(summary_budget, token_budget)
+        self.memory_key = memory_key
+        self.input_key = input_key
+        self.output_key = output_key
+        self.human_prefix = human_prefix
+        self.ai_prefix = ai_prefix
+        self.metrics = metrics or MemoryMetrics()
+
+        # (rendered turn, token count), oldest first
+        self._turns: deque = deque()
+        self._summary: deque = deque()
+        self._summary_tokens = 0
+        self._full_tokens = 0
+        self.last_prompt_tokens = 0
+        self.last_tokens_saved = 0
+
+    @property
+    def memory_variables(self) -> List[str]:
+        return [self.memory_key]
+
+    @property
+    def buffer(self) -> str:
+        """History as it will appear in the prompt"""
+        parts = []
+        if self._summary:
+            parts.append("Summary of earlier conversation:\n" + "\n".join(self._summary))
+        parts.extend(turn for turn, _ in self._turns)
+        return "\n".join(parts)
+
+    def _window_tokens(self) -> int:
+        return sum(tokens for _, tokens in self._turns)
+
+    def _add_summary_line(self, line: str):
+        tokens = count_tokens(line)
+        self._summary.append(line)
+        self._summary_tokens += tokens
+        while self._summary_tokens > self.summary_budget and len(self._summary) > 1:
+            self._summary_tokens -= count_tokens(self._summary.popleft())
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, Any]):
+        user_text = str(inputs.get(self.input_key, ""))
+        assistant_text = str(outputs.get(self.output_key, ""))
+        turn = f"{self.human_prefix}: {user_text}\n{self.ai_prefix}: {assistant_text}"
+        turn_tokens = count_tokens(turn)
+        self._full_tokens += turn_tokens
+
+        # A single oversized turn is cut down so the newest exchange always fits
+        max_turn_tokens = max(1, self.token_budget - self.summary_budget)
+        if turn_tokens > max_turn_tokens:
+            turn = truncate_to_tokens(turn, max_turn_tokens)
+            turn_tokens = count_tokens(turn)
+        self._turns.append((turn, turn_tokens))
+
+        # Fold the oldest verbatim turns into the summary until the window fits
+        while len(self._turns) > 1 and self._window_tokens() + self._summary_tokens > self.token_budget:
+            old_turn, _ = self._turns.popleft()
+            old_user, _, old_assistant = old_turn.partition(f"\n{self.ai_prefix}: ")
+            self._add_summary_line(summarize_turn(old_user[len(self.human_prefix) + 2:], old_assistant))
+            self.metrics.record_summarized()
+
+    def load_memory_variables(self, inputs: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        history = self.buffer
+        self.last_prompt_tokens = count_tokens(history)
+        self.last_tokens_saved = max(0, self._full_tokens - self.last_prompt_tokens)
+        if history:
+            self.metrics.record_load(self._full_tokens, self.last_prompt_tokens)
+        return {self.memory_key: history}
+
+    def clear(self):
+        self._turns.clear()
+        self._summary.clear()
+        self._summary_tokens = 0
+        self._full_tokens = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "turns_verbatim": len(self._turns),
+            "summary_lines": len(self._summary),
+            "full_history_tokens": self._full_tokens,
+            "last_prompt_tokens": self.last_prompt_tokens,
+            "last_tokens_saved": self.last_tokens_saved
+        }
@@ -4,13 +4,21 @@ Core Mutual Funds Agent implementation using LangChain zero-shot approach
 
 import asyncio
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 
 from .config import AgentConfig
 from .intent_parser import IntentParser, Intent, SentimentLabel, IntentType
 from .tools import ToolOrchestrator
 from .response_formatter import ResponseFormatter
 from .moonshot_llm import get_chat_llm
+from .session_pool import SessionPool, SessionState
+from .conversation_memory import TokenBudgetMemory, MemoryMetrics
+from .admission import AdmissionController, Priority
+from .rate_limiter import LLMRateLimiter
+from .streaming import StreamingEventHandler, FINAL_ANSWER_MARKER
+from .fast_path import FastPathRouter
+from .llm_cache import LLMResponseCache, is_context_dependent
+from .prefetch import Prefetcher, current_prefetch, take_prefetched
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -28,13 +36,42 @@ class MutualFundsAgent:
         self.tool_orchestrator = ToolOrchestrator(config)
         self.response_formatter = ResponseFormatter(config)
         
-        # Track tools used in last execution
+        # Track tools used in last execution (per-session traces live in self.sessions)
         self.last_tools_used = []
         self.last_retrieval_context = []
         
+        # Per-session conversation memory; the agent executor itself is stateless and shared
+        self.memory_metrics = MemoryMetrics()
+        self.sessions = SessionPool(
+            self._create_memory,
+            max_sessions=config.AGENT_SESSION_POOL_SIZE,
+            ttl=config.AGENT_SESSION_TTL
+        )
+        
+        # Bounds concurrent agent runs; excess requests queue by priority or are shed
+        self.admission = AdmissionController(
+            max_in_flight=config.ADMISSION_MAX_IN_FLIGHT,
+            max_queue=config.ADMISSION_MAX_QUEUE,
+            queue_timeout=config.ADMISSION_QUEUE_TIMEOUT
+        )
+        
+        # Client-side RPM/TPM pacing for the LLM endpoint (None when disabled)
+        self.llm_rate_limiter = LLMRateLimiter.from_config(config)
+        
+        # Direct tool answers for simple single-fund lookups (None when disabled)
+        self.fast_path = FastPathRouter(
+            config, self.tool_orchestrator, self.response_formatter,
+            phrase=self._phrase_fast_path_answer
+        ) if config.FAST_PATH_ENABLED else None
+        
+        # Exact + semantic cache of final answers, scoped by intent (None when disabled)
+        self.llm_cache = LLMResponseCache.from_config(config)
+        
+        # Speculative fund fetches started from the parsed intent (None when disabled)
+        self.prefetcher = Prefetcher(config, self.tool_orchestrator) if config.PREFETCH_ENABLED else None
+        
         # Initialize components lazily
         self._llm = None
-        self._memory = None
         self._tools = None
         self._agent = None
 
@@ -167,7 +204,10 @@ class MutualFundsAgent:
                 # Use the proper Moonshot LLM initialization
                 self._llm = get_chat_llm(
                     model_name=self.config.MOONSHOT_MODEL,
-                    temperature=self.config.MOONSHOT_TEMPERATURE
+                    temperature=self.config.MOONSHOT_TEMPERATURE,
+                    rate_limiter=self.llm_rate_limiter,
+                    max_retries=self.config.LLM_MAX_RETRIES,
+                    streaming=self.config.LLM_STREAMING
                 )
                 logger.info(f"Moonshot LLM initialized successfully with model: {self.config.MOONSHOT_MODEL}")
             except Exception as e:
@@ -178,16 +218,18 @@ class MutualFundsAgent:
                 self._llm = FakeListLLM(responses=["I apologize, but I'm unable to process your request at the moment due to a configuration issue. Please check the API key settings."])
         return self._llm
     
-    @property
-    def memory(self):
-        """Lazy initialization of memory"""
-        if self._memory is None:
-            from langchain.memory import ConversationBufferMemory
-            self._memory = ConversationBufferMemory(
-                memory_key="chat_history",
-                return_messages=True
-            )
-        return self._memory
+    def _create_memory(self) -> TokenBudgetMemory:
+        """Fresh token-budgeted conversation memory for one session"""
+        return TokenBudgetMemory(
+            token_budget=self.config.MEMORY_TOKEN_BUDGET,
+            summary_budget=self.config.MEMORY_SUMMARY_TOKEN_BUDGET,
+            memory_key="chat_history",
+            input_key="input",
+            output_key="output",
+            human_prefix="User",
+            ai_prefix="Assistant",
+            metrics=self.memory_metrics
+        )
     
     @property
     def tools(self):
@@ -199,6 +241,8 @@ class MutualFundsAgent:
     @property
     def agent(self):
         """Lazy initialization of LangChain agent with optimized settings"""
+        if self._agent is None and self.uses_tool_calling:
+            self._agent = self._create_tool_calling_agent()
         if self._agent is None:
             from langchain.agents import initialize_agent, AgentType
             
@@ -261,7 +305,7 @@ DO NOT write explanatory text without proper Action/Final Answer format!""",
 4. Keep responses conversational, warm, and helpful
 5. If you see [User: Name] at the start, use that name in your greeting
 
-Question: {input}
+{chat_history}Question: {input}
 {agent_scratchpad}"""
             }
             
@@ -270,7 +314,6 @@ Question: {input}
                 llm=self.llm,
                 agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
                 handle_parsing_errors=True,
-                memory=self.memory,
                 verbose=True,
                 max_iterations=25,  # Increased to 25 to allow complete reasoning chains
                 max_execution_time=180,  # Increased to 3 minutes to match timeout
@@ -279,6 +322,55 @@ Question: {input}
             )
         return self._agent
     
+    @property
+    def uses_tool_calling(self) -> bool:
+        """True when AGENT_MODE=tools and the LLM supports native function calling"""
+        return self.config.AGENT_MODE == "tools" and hasattr(self.llm, "bind_tools")
+    
+    def _create_tool_calling_agent(self):
+        """
+        OpenAI-style tool-calling agent: one LLM step may request several tool
+        calls, which AgentExecutor runs concurrently (asyncio.gather) and feeds
+        back together as tool messages before the next LLM call
+        """
+        from langchain.agents import AgentExecutor, create_openai_tools_agent
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+        
+        system_prompt = """You are an expert mutual funds assistant with access to tools for retrieving fund data.
+
+RULES:
+1. ALWAYS use tools to answer questions - NEVER provide generic responses
+2. Call several tools in the SAME step whenever the calls don't depend on each other:
+   - Comparisons: call search_funds_db for EACH fund at once, then compare_multiple_funds / get_fund_analytics with the ISINs
+   - Several facts about one fund (factsheet, returns, holdings, NAV history): request them together
+3. Only answer once the tool results contain the data you need; never invent numbers
+
+CONVERSATIONAL TONE - your answer MUST have:
+1. **Personalized Opening** - use the name from [User: Name] if present
+2. **Main Answer Content** - detailed response with data from tools
+3. **Engaging Follow-up** - a context-aware question (e.g. performance, holdings, comparisons)
+
+QUERY HANDLING:
+- Specific funds: search_funds_db with the fund name, or get_fund_by_isin with an ISIN
+- General concepts: search_tavily_data for definitions and concepts"""
+        
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", system_prompt),
+            ("human", "{chat_history}{input}"),
+            MessagesPlaceholder("agent_scratchpad")
+        ])
+        
+        logger.info("Using tool-calling agent (parallel tool calls per step)")
+        return AgentExecutor(
+            agent=create_openai_tools_agent(self.llm, self.tools, prompt),
+            tools=self.tools,
+            handle_parsing_errors=True,
+            verbose=True,
+            max_iterations=25,
+            max_execution_time=180,
+            return_intermediate_steps=True
+        )
+    
     def _summarize_tool_result(self, result: Dict[str, Any], query: str) -> str:
         """Return raw tool result data for agent to synthesize - no hardcoded templates"""
         # Ensure result is a dictionary
@@ -348,21 +440,10 @@ Question: {input}
         """Create conversational tools for the LangChain agent"""
         from langchain.agents import Tool
         
-        def search_funds_db(query: str) -> str:
+        async def search_funds_db(query: str) -> str:
             """Search for specific mutual fund information in the production database"""
             try:
-                # Create new event loop for this thread if none exists
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        raise RuntimeError("Event loop is closed")
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                result = loop.run_until_complete(
-                    self.tool_orchestrator.call_db_api(fund_name=query, deep_search=True)
-                )
+                result = await take_prefetched("search", query) or await self.tool_orchestrator.call_db_api(fund_name=query, deep_search=True)
                 
                 # Return conversational structured data for agent to synthesize
                 if not isinstance(result, dict):
@@ -431,21 +512,10 @@ Question: {input}
             except Exception as e:
                 return f"I'm having trouble accessing our fund database right now. Error: {str(e)}. Please try again in a moment."
         
-        def search_tavily_data(query: str) -> str:
+        async def search_tavily_data(query: str) -> str:
             """Search web using Tavily API for general mutual fund knowledge and concepts"""
             try:
-                # Create new event loop for this thread if none exists
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        raise RuntimeError("Event loop is closed")
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                result = loop.run_until_complete(
-                    self.tool_orchestrator.call_tavily_search(query=query)
-                )
+                result = await self.tool_orchestrator.call_tavily_search(query=query)
                 
                 # Return conversational web search results
                 if not isinstance(result, dict):
@@ -484,21 +554,10 @@ Question: {input}
             except Exception as e:
                 return f"I encountered an issue while searching for web information: {str(e)}. Let me help you with specific fund data from our database instead."
         
-        def search_bse_schemes(query: str) -> str:
+        async def search_bse_schemes(query: str) -> str:
             """Search BSE scheme data for additional mutual fund information"""
             try:
-                # Create new event loop for this thread if none exists
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        raise RuntimeError("Event loop is closed")
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                result = loop.run_until_complete(
-                    self.tool_orchestrator.call_bse_schemes_api(scheme_name=query)
-                )
+                result = await self.tool_orchestrator.call_bse_schemes_api(scheme_name=query)
                 
                 if isinstance(result, dict) and result.get("found"):
                     return f"I found additional information about '{query}' from BSE schemes database. The data shows relevant fund details that might be helpful for your query."
@@ -507,21 +566,10 @@ Question: {input}
             except Exception as e:
                 return f"I had trouble accessing the BSE schemes database: {str(e)}. Let me help you with our main fund database instead."
         
-        def get_fund_by_isin(isin: str) -> str:
+        async def get_fund_by_isin(isin: str) -> str:
             """Get comprehensive fund details using exact ISIN code"""
             try:
-                # Create new event loop for this thread if none exists
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        raise RuntimeError("Event loop is closed")
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                result = loop.run_until_complete(
-                    self.tool_orchestrator.call_db_api_by_isin(isin=isin)
-                )
+                result = await take_prefetched("isin", isin) or await self.tool_orchestrator.call_db_api_by_isin(isin=isin)
                 
                 if isinstance(result, dict) and result.get("found"):
                     return f"Perfect! I found detailed information for ISIN {isin}. This includes comprehensive fund data like factsheet details, performance history, holdings, and current NAV information."
@@ -530,22 +578,11 @@ Question: {input}
             except Exception as e:
                 return f"I had trouble looking up ISIN {isin}: {str(e)}. Please double-check the ISIN format."
         
-        def search_comprehensive_fund_data(query: str) -> str:
+        async def search_comprehensive_fund_data(query: str) -> str:
             """Get detailed analysis and comprehensive information about mutual funds"""
             try:
-                # Create new event loop for this thread if none exists
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        raise RuntimeError("Event loop is closed")
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
                 # Search for comprehensive fund data
-                basic_result = loop.run_until_complete(
-                    self.tool_orchestrator.call_db_api(fund_name=query, deep_search=True)
-                )
+                basic_result = await take_prefetched("search", query) or await self.tool_orchestrator.call_db_api(fund_name=query, deep_search=True)
                 
                 # Create comprehensive conversational analysis
                 if not basic_result.get("found", False) or not basic_result.get("results"):
@@ -609,96 +646,113 @@ Question: {input}
             Tool(
                 name="search_funds_db",
                 description="🏦 FUND DATABASE: Search our comprehensive mutual funds database for specific fund information. Use this for: NAV, performance data, fund manager details, expense ratios, minimum investments, SIP options. Perfect for specific fund names or AMC queries like 'DSP funds', 'HDFC Top 100', 'Axis Bluechip'. Returns user-friendly fund information ready for conversation.",
-                func=search_funds_db
+                func=None,
+                coroutine=search_funds_db
             ),
             Tool(
                 name="search_tavily_data", 
                 description="🌐 WEB KNOWLEDGE: Search current web sources for general mutual fund concepts and market insights. Use this for: 'What is SIP?', 'Explain mutual funds', 'Investment strategies', 'Market trends', conceptual questions. Returns educational explanations in conversational language.",
-                func=search_tavily_data
+                func=None,
+                coroutine=search_tavily_data
             ),
             Tool(
                 name="search_bse_schemes",
                 description="📊 BSE BACKUP: Alternative database search for additional fund information from BSE. Use as secondary option when main database doesn't have sufficient details. Input: fund name or scheme name.",
-                func=search_bse_schemes  
+                func=None,
+                coroutine=search_bse_schemes
             ),
             Tool(
                 name="get_fund_by_isin",
                 description="🎯 ISIN LOOKUP: Get complete fund details using exact ISIN code. Use when user provides or asks about specific ISIN codes. Returns comprehensive fund information including factsheet, performance, holdings. Input: ISIN code (e.g., 'INF846K01EW2').",
-                func=get_fund_by_isin
+                func=None,
+                coroutine=get_fund_by_isin
             ),
             Tool(
                 name="search_comprehensive_fund_data",
                 description="🔍 DETAILED ANALYSIS: Comprehensive fund search with detailed analysis and formatting. Use for complex queries requiring in-depth fund information, comparisons, or when user asks for 'detailed analysis' or 'comprehensive information'. Returns structured detailed fund analysis.",
-                func=search_comprehensive_fund_data
+                func=None,
+                coroutine=search_comprehensive_fund_data
             ),
             Tool(
                 name="get_top_performers",
                 description="⭐ TOP PERFORMERS: Get top performing mutual funds by time period. Use when user asks for 'best funds', 'top performing funds', 'highest returns'. Input: time period like '1y', '3y', '5y'. Example: 'show me top performing funds in last 1 year'.",
-                func=lambda query: self._run_async_tool(self.tool_orchestrator.get_top_performing_funds(period=query if query in ['1y', '3y', '5y'] else '1y'))
+                func=None,
+                coroutine=lambda query: self._run_tool(self.tool_orchestrator.get_top_performing_funds(period=query if query in ['1y', '3y', '5y'] else '1y'))
             ),
             Tool(
                 name="search_by_ratings",
                 description="⭐ FUND RATINGS: Search funds by rating (1-5 stars). Use when user asks about 'highly rated funds', '5-star funds', 'best rated funds'. Input: rating number like '4' or '5'.",
-                func=lambda rating: self._run_async_tool(self.tool_orchestrator.search_funds_by_ratings(min_rating=int(rating) if rating.isdigit() else 4))
+                func=None,
+                coroutine=lambda rating: self._run_tool(self.tool_orchestrator.search_funds_by_ratings(min_rating=int(rating) if rating.isdigit() else 4))
             ),
             Tool(
                 name="search_by_sector",
                 description="🏭 SECTOR FUNDS: Search funds by sector allocation (Technology, Banking, Pharma, Auto, etc.). Use when user asks about sector-specific funds. Input: sector name like 'Technology', 'Banking', 'Healthcare'.",
-                func=lambda sector: self._run_async_tool(self.tool_orchestrator.search_funds_by_sector(sector))
+                func=None,
+                coroutine=lambda sector: self._run_tool(self.tool_orchestrator.search_funds_by_sector(sector))
             ),
             Tool(
                 name="search_by_risk",
                 description="⚠️ RISK-BASED: Search funds by risk level (Low, Moderate, High, Very High). Use when user asks about 'low risk funds', 'high risk funds', 'safe investments'. Input: risk level.",
-                func=lambda risk: self._run_async_tool(self.tool_orchestrator.search_funds_by_risk(risk_level=risk))
+                func=None,
+                coroutine=lambda risk: self._run_tool(self.tool_orchestrator.search_funds_by_risk(risk_level=risk))
             ),
             Tool(
                 name="get_fund_factsheet",
                 description="📄 FACTSHEET: Get detailed factsheet for a fund using ISIN. Use when user asks for 'factsheet', 'complete details', 'full information'. Input: ISIN code.",
-                func=lambda isin: self._run_async_tool(self.tool_orchestrator.get_fund_factsheet(isin))
+                func=None,
+                coroutine=lambda isin: self._run_tool(self.tool_orchestrator.get_fund_factsheet(isin))
             ),
             Tool(
                 name="get_fund_returns",
                 description="📈 RETURNS HISTORY: Get historical returns data for a fund. Use when user asks about 'returns', 'performance history', 'how has fund performed'. Input: ISIN code.",
-                func=lambda isin: self._run_async_tool(self.tool_orchestrator.get_fund_returns(isin))
+                func=None,
+                coroutine=lambda isin: self._run_tool(self.tool_orchestrator.get_fund_returns(isin))
             ),
             Tool(
                 name="get_fund_holdings",
                 description="💼 PORTFOLIO HOLDINGS: Get fund's portfolio holdings/stocks. Use when user asks 'what stocks does fund invest in', 'portfolio composition', 'holdings'. Input: ISIN code.",
-                func=lambda isin: self._run_async_tool(self.tool_orchestrator.get_fund_holdings(isin))
+                func=None,
+                coroutine=lambda isin: self._run_tool(self.tool_orchestrator.get_fund_holdings(isin))
             ),
             Tool(
                 name="get_nav_history",
-                description="📊 NAV HISTORY: Get NAV price history over time. Use when user asks about 'NAV trend', 'price history', 'NAV chart data'. Input: ISIN code.",
-                func=lambda isin: self._run_async_tool(self.tool_orchestrator.get_fund_nav_history(isin))
+                description="📊 NAV HISTORY: Get NAV price history over time (start/latest NAV, % change, high/low and recent NAVs). Use when user asks about 'NAV trend', 'price history', 'NAV chart data'. Input: ISIN code, optionally followed by number of days, e.g. 'INF846K01EW2' or 'INF846K01EW2, 90'.",
+                func=None,
+                coroutine=lambda query: self._run_tool(self.tool_orchestrator.get_nav_history_summary(
+                    query.split(',')[0].strip(),
+                    last_days=int(query.split(',')[1]) if ',' in query and query.split(',')[1].strip().isdigit() else 365
+                ))
+            ),
+            Tool(
+                name="get_fund_analytics",
+                description="📐 FUND ANALYTICS: Compute trailing returns (1m-5y), CAGR, volatility, Sharpe/Sortino ratios, maximum drawdown, rolling 1-year returns and SIP XIRR from NAV history, for one or several funds at once. Use for 'how risky is', 'drawdown', 'Sharpe ratio', 'SIP returns', or comparing performance/risk of funds. Input: comma-separated ISIN codes.",
+                func=None,
+                coroutine=lambda isins: self._run_tool(self.tool_orchestrator.get_fund_analytics(isins.split(',')))
             ),
             Tool(
                 name="compare_multiple_funds",
                 description="⚖️ FUND COMPARISON: Compare 2 or more funds side-by-side. Use when user asks to 'compare funds', 'which is better', 'difference between'. Input: comma-separated ISIN codes.",
-                func=lambda isins: self._run_async_tool(self.tool_orchestrator.compare_funds([isin.strip() for isin in isins.split(',')]))
+                func=None,
+                coroutine=lambda isins: self._run_tool(self.tool_orchestrator.compare_funds([isin.strip() for isin in isins.split(',')]))
             ),
             Tool(
                 name="get_nfo_list",
                 description="🆕 NEW FUND OFFERS: Get list of New Fund Offers (NFOs). Use when user asks about 'new funds', 'upcoming NFOs', 'latest launches'. Input: 'open', 'closed', or blank for all.",
-                func=lambda status: self._run_async_tool(self.tool_orchestrator.get_nfo_list(status if status else None))
+                func=None,
+                coroutine=lambda status: self._run_tool(self.tool_orchestrator.get_nfo_list(status if status else None))
             ),
             Tool(
                 name="get_sip_codes",
                 description="🔄 SIP CODES: Get SIP transaction codes for a fund. Use when user asks about 'SIP codes', 'how to start SIP'. Input: ISIN code.",
-                func=lambda isin: self._run_async_tool(self.tool_orchestrator.get_sip_codes_by_isin(isin))
+                func=None,
+                coroutine=lambda isin: self._run_tool(self.tool_orchestrator.get_sip_codes_by_isin(isin))
             )
         ]
     
-    def _run_async_tool(self, coroutine):
-        """Helper to run async tool methods in sync context"""
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                raise RuntimeError("Event loop is closed")
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        
-        result = loop.run_until_complete(coroutine)
+    async def _run_tool(self, coroutine) -> str:
+        """Await an orchestrator call on the running loop and format its result for the agent"""
+        result = await coroutine
         
         # Format result for agent
         if result.get("found"):
@@ -709,12 +763,128 @@ Question: {input}
     
     async def process_request(self, user_input: str, 
                             session_context: List[Dict[str, Any]] = None,
-                            user_name: Optional[str] = None) -> str:
+                            user_name: Optional[str] = None,
+                            session_id: Optional[str] = None,
+                            priority: Priority = Priority.INTERACTIVE) -> str:
         """
         Intelligent conversational agent for mutual fund queries with smart routing
         
         Uses fast fallback for simple listings, full agent for specific queries.
+        Requests with a session_id share that session's memory; without one the
+        turn runs with an empty, throwaway memory.
+        
+        Runs are admitted through self.admission; raises Overloaded when the
+        request is shed so callers can answer 429/503 with Retry-After.
+        Simple lookups answered by the fast path, and questions answered from
+        the LLM cache, skip the agent and need no slot, except for the LLM
+        call of FAST_PATH_LLM_PHRASING, which is admitted at `priority`.
+        """
+        direct_answer = await self._try_direct_answer(user_input, user_name, session_id, priority)
+        if direct_answer is not None:
+            return direct_answer
+        
+        async with self.admission.admit(priority):
+            return await self._process_request(user_input, user_name, session_id)
+    
+    async def stream_request(self, user_input: str,
+                             user_name: Optional[str] = None,
+                             session_id: Optional[str] = None,
+                             priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run a request like process_request, yielding events as they happen
+        
+        The first event is {"type": "accepted"} once admission control lets the
+        run start (Overloaded is raised before that). Then come thinking /
+        tool_start / tool_end / token events, and finally {"type": "final",
+        "message": ...} with the complete, post-processed response. Closing the
+        iterator early cancels the run.
+        """
+        direct_answer = await self._try_direct_answer(user_input, user_name, session_id, priority)
+        if direct_answer is not None:
+            yield {"type": "accepted"}
+            yield {"type": "final", "message": direct_answer}
+            return
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        # Tool-calling answers are plain content; ReAct answers follow "Final Answer:"
+        handler = StreamingEventHandler(queue, answer_marker=None if self.uses_tool_calling else FINAL_ANSWER_MARKER)
+        
+        async with self.admission.admit(priority):
+            yield {"type": "accepted"}
+            run = asyncio.create_task(self._process_request(user_input, user_name, session_id, callbacks=[handler]))
+            try:
+                while not run.done():
+                    next_event = asyncio.ensure_future(queue.get())
+                    await asyncio.wait({next_event, run}, return_when=asyncio.FIRST_COMPLETED)
+                    if next_event.done():
+                        yield next_event.result()
+                    else:
+                        next_event.cancel()
+                while not queue.empty():
+                    yield queue.get_nowait()
+                yield {"type": "final", "message": run.result()}
+            finally:
+                if not run.done():
+                    run.cancel()
+                    logger.info("Streaming client went away; cancelled agent run")
+    
+    def _cache_applies(self, user_input: str, state: SessionState) -> bool:
+        """Shared answers only fit questions that don't lean on this session's history"""
+        return self.llm_cache is not None and (state.turns == 0 or not is_context_dependent(user_input))
+    
+    async def _try_direct_answer(self, user_input: str, user_name: Optional[str],
+                                 session_id: Optional[str],
+                                 priority: Priority = Priority.INTERACTIVE) -> Optional[str]:
+        """Answer from the fast path or the LLM cache, or None to run the agent"""
+        if self.fast_path is None and self.llm_cache is None:
+            return None
+        
+        try:
+            intent = await self.intent_parser.parse(user_input)
+            state = self.sessions.acquire(session_id) if session_id else SessionState("", self._create_memory())
+            async with state.lock:
+                answer = await self.fast_path.answer(user_input, intent, user_name, priority) if self.fast_path else None
+                if answer is not None:
+                    text, tools_used, retrieval_context = answer.text, answer.tools_used, answer.retrieval_context
+                elif self._cache_applies(user_input, state):
+                    cached = self.llm_cache.get(user_input, intent.intent, user_name)
+                    if cached is None:
+                        return None
+                    text, tools_used, retrieval_context = cached.answer, cached.tools_used, cached.retrieval_context
+                else:
+                    return None
+                
+                state.memory.save_context({"input": user_input}, {"output": text})
+                state.turns += 1
+                state.last_tools_used = tools_used
+                state.last_retrieval_context = retrieval_context
+                self.last_tools_used = tools_used
+                self.last_retrieval_context = retrieval_context
+            return text
+        except Exception as e:
+            logger.warning(f"Direct answer error, using agent: {e}")
+            return None
+    
+    async def _phrase_fast_path_answer(self, user_input: str, formatted_answer: str,
+                                       priority: Priority = Priority.INTERACTIVE) -> str:
+        """
+        Single LLM call that rewrites a fast-path answer conversationally, using only its facts.
+        
+        The call holds an admission slot like any agent run; when it is shed
+        the fast path keeps its formatted answer.
         """
+        prompt = (
+            "Rewrite the fund information below as a concise, friendly answer to the user's question. "
+            "Use only the facts given; do not add numbers. Keep the disclaimer.\n\n"
+            f"Question: {user_input}\n\nFund information:\n{formatted_answer}"
+        )
+        async with self.admission.admit(priority):
+            result = await self.llm.ainvoke(prompt)
+        return getattr(result, "content", result) or ""
+    
+    async def _process_request(self, user_input: str, user_name: Optional[str],
+                               session_id: Optional[str], callbacks: Optional[List] = None) -> str:
+        """Run one admitted request through the conversational agent"""
         logger.info(f"Processing conversational request: {user_input[:100]}...")
         
         try:
@@ -729,7 +899,27 @@ Question: {input}
             logger.info(f"Sending query to agent: {user_input[:100]}...")
             
             # Run the conversational agent and return raw output
-            response = await self._run_conversational_agent(user_input, intent, user_name)
+            if session_id:
+                state = self.sessions.acquire(session_id)
+            else:
+                state = SessionState("", self._create_memory())
+            async with state.lock:
+                # Fund data the agent will most likely ask for is fetched while the LLM reasons
+                prefetch = self.prefetcher.begin(user_input, intent) if self.prefetcher else None
+                prefetch_token = current_prefetch.set(prefetch)
+                try:
+                    cacheable = self._cache_applies(user_input, state)
+                    response = await self._run_conversational_agent(user_input, intent, user_name, state, callbacks)
+                    if response:
+                        state.memory.save_context({"input": user_input}, {"output": response})
+                        state.turns += 1
+                        if cacheable and not self._is_incomplete_response(response):
+                            self.llm_cache.set(user_input, intent.intent, response, user_name,
+                                               state.last_tools_used, state.last_retrieval_context)
+                finally:
+                    current_prefetch.reset(prefetch_token)
+                    if prefetch is not None:
+                        prefetch.close()
             
             # Return whatever LangChain gives us - NO fallback, NO formatting
             logger.info(f"📤 Returning to frontend: {response[:200] if response else 'EMPTY'}...")
@@ -790,15 +980,27 @@ Question: {input}
             
         return False
     
-    async def _run_conversational_agent(self, user_input: str, intent: Intent, user_name: Optional[str] = None) -> str:
+    def _format_chat_history(self, state: SessionState) -> str:
+        """Render a session's memory for the {chat_history} prompt slot"""
+        history = state.memory.load_memory_variables({}).get("chat_history", "")
+        if history:
+            logger.info(f"🧠 Session history: {state.memory.last_prompt_tokens} prompt tokens "
+                        f"({state.memory.last_tokens_saved} saved vs. full history)")
+        return f"Previous conversation:\n{history}\n\n" if history else ""
+    
+    async def _run_conversational_agent(self, user_input: str, intent: Intent, user_name: Optional[str] = None,
+                                        state: Optional[SessionState] = None, callbacks: Optional[List] = None) -> str:
         """Run the agent with conversational focus and retry logic"""
+        if state is None:
+            state = SessionState("", self._create_memory())
+        chat_history = self._format_chat_history(state)
+        
         max_retries = 2
         retry_delay = 2
         
         for attempt in range(max_retries):
             try:
                 logger.info(f"Running conversational LangChain agent (attempt {attempt + 1}/{max_retries})...")
-                loop = asyncio.get_event_loop()
                 
                 # Embed user name in the input string if provided
                 if user_name:
@@ -807,9 +1009,9 @@ Question: {input}
                     enhanced_input = user_input
                 
                 result = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        None, 
-                        lambda: self.agent.invoke({"input": enhanced_input})
+                    self.agent.ainvoke(
+                        {"input": enhanced_input, "chat_history": chat_history},
+                        config={"callbacks": callbacks} if callbacks else None
                     ),
                     timeout=180  # Increased to 3 minutes to allow agent to complete
                 )
@@ -833,9 +1035,9 @@ Question: {input}
                 response = result.get("output", "")
                 intermediate_steps = result.get("intermediate_steps", [])
                 
-                # Track tools used and retrieval context
-                self.last_tools_used = []
-                self.last_retrieval_context = []
+                # Track tools used and retrieval context for this session's turn
+                tools_used = []
+                retrieval_context = []
                 
                 # Authoritative tools - only these should be used for faithfulness evaluation
                 # These are database/API tools that return structured, verified data
@@ -875,7 +1077,8 @@ Question: {input}
                     
                     # NFO tools
                     'get_nfo_list',
-                    'get_nav_history'
+                    'get_nav_history',
+                    'get_fund_analytics'
                 }
                 
                 for step in intermediate_steps:
@@ -885,24 +1088,29 @@ Question: {input}
                         tool_name = None
                         if hasattr(action, 'tool'):
                             tool_name = action.tool
-                            self.last_tools_used.append(tool_name)
+                            tools_used.append(tool_name)
                         
                         # Extract retrieval context ONLY from authoritative database/API tools
                         # Skip Tavily and other web search results for faithfulness evaluation
                         if observation and tool_name in authoritative_tools:
                             context_str = str(observation)[:2000]  # Increased to 2000 chars to capture all numbers
                             if context_str.strip():
-                                self.last_retrieval_context.append(context_str)
+                                retrieval_context.append(context_str)
                                 logger.debug(f"📋 Added retrieval context from {tool_name}: {context_str[:100]}...")
                 
                 logger.info(f"Output: '{response[:100] if response else 'EMPTY'}'")
                 logger.info(f"Intermediate steps: {len(intermediate_steps)}")
-                logger.info(f"Tools used: {self.last_tools_used}")
-                logger.info(f"📊 Retrieval context captured from {len(self.last_retrieval_context)} authoritative tool(s)")
+                logger.info(f"Tools used: {tools_used}")
+                logger.info(f"📊 Retrieval context captured from {len(retrieval_context)} authoritative tool(s)")
+                
+                state.last_tools_used = tools_used
+                state.last_retrieval_context = retrieval_context
+                self.last_tools_used = tools_used
+                self.last_retrieval_context = retrieval_context
                 
                 # Validate response against retrieval context for hallucinations
-                if response and self.last_retrieval_context:
-                    response = self._validate_response_grounding(response, self.last_retrieval_context)
+                if response and retrieval_context:
+                    response = self._validate_response_grounding(response, retrieval_context)
                 
                 # If output is empty, extract from intermediate_steps (the last observation)
                 if not response and intermediate_steps:
@@ -1369,18 +1577,13 @@ You have complete freedom to decide tool usage and response formatting based on
         try:
             logger.info("Running fully agentic LangChain agent...")
             
-            # Run the agent in an executor with timeout protection
-            loop = asyncio.get_event_loop()
-            
+            # Run the agent on the current loop with timeout protection
             # Add debug logging before agent invocation
             logger.info(f"About to invoke agent with input length: {len(enhanced_input)}")
             
             # Add timeout wrapper
             result = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None, 
-                    lambda: self.agent.invoke({"input": enhanced_input})
-                ),
+                self.agent.ainvoke({"input": enhanced_input, "chat_history": ""}),
                 timeout=25  # Increased to 25 seconds to match agent execution time
             )
             
@@ -1421,47 +1624,19 @@ You have complete freedom to decide tool usage and response formatting based on
         return "I'd be happy to help with your mutual fund query!\n\nTo provide you with accurate information, could you please specify:\n• **Fund name** (e.g., \"Axis Bluechip Fund\", \"SBI Small Cap Fund\")\n• **What you'd like to know** (current NAV, performance, fund manager, etc.)\n\nThis helps me search the right data sources for you."
     
     def _should_use_fallback_due_to_rate_limit(self) -> bool:
-        """Check if we should proactively use fallback due to approaching rate limits"""
-        try:
-            # Track rate limit errors in a simple way
-            # In a real system, you might use Redis or a database for this
-            import os
-            import time
-            
-            rate_limit_file = "rate_limit_tracker.tmp"
-            current_time = time.time()
-            
-            # Check if we've had a recent rate limit error (within last 10 minutes)
-            if os.path.exists(rate_limit_file):
-                try:
-                    with open(rate_limit_file, 'r') as f:
-                        last_error_time = float(f.read().strip())
-                    
-                    # If we had a rate limit error in the last 5 minutes, use fallback
-                    if current_time - last_error_time < 300:  # 5 minutes instead of 10
-                        logger.info(f"Recent rate limit error detected ({(current_time - last_error_time)/60:.1f} minutes ago)")
-                        return True
-                        
-                except (ValueError, IOError):
-                    # If file is corrupted, ignore and continue
-                    pass
-            
+        """Check if we should proactively use fallback because the LLM endpoint is rate limited"""
+        if self.llm_rate_limiter is None:
             return False
-            
-        except Exception as e:
-            logger.error(f"Error checking rate limit status: {e}")
-            return False  # Default to trying the agent if we can't check
+        blocked_for = self.llm_rate_limiter.blocked_for()
+        if blocked_for > self.config.LLM_FALLBACK_AFTER_BLOCK_SECONDS:
+            logger.info(f"LLM endpoint rate limited for another {blocked_for:.0f}s")
+            return True
+        return False
 
-    def _record_rate_limit_error(self):
-        """Record that a rate limit error occurred"""
-        try:
-            import time
-            rate_limit_file = "rate_limit_tracker.tmp"
-            with open(rate_limit_file, 'w') as f:
-                f.write(str(time.time()))
-            logger.info("Rate limit error recorded for future fallback decisions")
-        except Exception as e:
-            logger.error(f"Error recording rate limit: {e}")
+    def _record_rate_limit_error(self, retry_after: float = 60.0):
+        """Record that a rate limit error occurred; paces further requests instead of failing them"""
+        if self.llm_rate_limiter is not None:
+            self.llm_rate_limiter.record_rate_limited(retry_after)
 
     def _extract_fund_name_from_input(self, user_input: str) -> Optional[str]:
         """Extract potential fund name from user input using simple heuristics"""
@@ -1922,18 +2097,13 @@ The information above provides current market perspectives on your question. The
         try:
             logger.info("Running fully agentic LangChain agent...")
             
-            # Run the agent in an executor with timeout protection
-            loop = asyncio.get_event_loop()
-            
+            # Run the agent on the current loop with timeout protection
             # Add debug logging before agent invocation
             logger.info(f"About to invoke agent with input length: {len(enhanced_input)}")
             
             # Add timeout wrapper
             result = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None, 
-                    lambda: self.agent.invoke({"input": enhanced_input})
-                ),
+                self.agent.ainvoke({"input": enhanced_input, "chat_history": ""}),
                 timeout=15  # Reduced to 15 seconds for faster debugging
             )
             
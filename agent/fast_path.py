@@ -0,0 +1,249 @@
+"""
+Deterministic fast path for simple fund lookups that don't need the ReAct loop
+"""
+
+import asyncio
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from .admission import Priority
+from .config import AgentConfig
+from .intent_parser import Intent, IntentType
+from .response_formatter import ResponseFormatter
+from .tools import ToolOrchestrator
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ISIN_PATTERN = re.compile(r"\bINF[A-Z0-9]{9}\b")
+
+# Phrases that mark a single-fund lookup; anything broader goes to the agent
+_FACTSHEET_PHRASES = ("factsheet", "fact sheet", "details of", "details for", "details about",
+                      "information about", "info on", "tell me about")
+# Words stripped from a lookup to leave the fund name ("NAV of HDFC Flexi Cap" -> "HDFC Flexi Cap")
+_LOOKUP_WORDS = re.compile(
+    r"\b(what|whats|what's|is|are|the|a|an|of|for|on|about|me|show|give|get|tell|please|current|latest|today|"
+    r"todays|today's|nav|navs|net|asset|value|factsheet|fact|sheet|details|information|info|isin)\b",
+    re.IGNORECASE
+)
+# Follow-ups and multi-fund questions need conversation context or reasoning
+_AGENT_ONLY = re.compile(r"\b(it|its|this|that|these|those|them|and|or|vs|versus|compare|better|should)\b", re.IGNORECASE)
+
+@dataclass
+class FastPathAnswer:
+    """A response produced without the agent, plus the trace the evaluator expects"""
+    text: str
+    route: str
+    isin: str
+    tools_used: List[str] = field(default_factory=list)
+    retrieval_context: List[str] = field(default_factory=list)
+
+class FastPathStats:
+    """Counts of requests answered by the fast path vs. handed to the agent"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fast_path = {}
+        self.agent_path = {}
+        self.llm_phrasings = 0
+
+    def record_fast(self, route: str):
+        with self._lock:
+            self.fast_path[route] = self.fast_path.get(route, 0) + 1
+
+    def record_agent(self, reason: str):
+        with self._lock:
+            self.agent_path[reason] = self.agent_path.get(reason, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            fast = sum(self.fast_path.values())
+            total = fast + sum(self.agent_path.values())
+            return {
+                "fast_path_hits": fast,
+                "agent_path_hits": total - fast,
+                "fast_path_ratio": round(fast / total, 3) if total else 0.0,
+                "fast_path_by_route": dict(self.fast_path),
+                "agent_path_by_reason": dict(self.agent_path),
+                "llm_phrasings": self.llm_phrasings
+            }
+
+class FastPathRouter:
+    """
+    Answers "NAV of <fund>" and "factsheet for <fund or ISIN>" directly.
+
+    Uses the IntentParser result (intent, metric, fund name entity) plus an
+    ISIN regex. When the intent is confident and the fund resolves to a
+    single ISIN - given explicitly, or an unambiguous local fund index match -
+    the matching ToolOrchestrator method is called and its result rendered
+    with ResponseFormatter. The LLM is used at most once, to rephrase that
+    answer, and only when FAST_PATH_LLM_PHRASING is on; `phrase` receives
+    the request priority so the caller can admit that call. Anything else
+    returns None and the caller runs the full agent.
+    """
+
+    def __init__(self, config: AgentConfig, tool_orchestrator: ToolOrchestrator,
+                 response_formatter: ResponseFormatter,
+                 phrase: Optional[Callable[[str, str, Priority], Awaitable[str]]] = None):
+        self.config = config
+        self.tools = tool_orchestrator
+        self.formatter = response_formatter
+        self.phrase = phrase
+        self.stats = FastPathStats()
+
+    def _route(self, user_input: str, intent: Intent) -> Optional[str]:
+        """'nav', 'factsheet' or None"""
+        user_lower = user_input.lower()
+        if intent.intent == IntentType.NAV_REQUEST or intent.entities.metric == "nav":
+            return "nav"
+        if intent.intent == IntentType.FUND_QUERY and any(phrase in user_lower for phrase in _FACTSHEET_PHRASES):
+            return "factsheet"
+        if intent.intent == IntentType.FUND_QUERY and ISIN_PATTERN.search(user_input.upper()):
+            return "factsheet"
+        return None
+
+    @staticmethod
+    def _lookup_subject(user_input: str, intent: Intent) -> str:
+        """Fund name left once the lookup phrasing is removed"""
+        if intent.entities.fund_name:
+            return intent.entities.fund_name
+        subject = _LOOKUP_WORDS.sub(" ", re.sub(r"[?!.,:;\"']", " ", user_input))
+        return " ".join(subject.split())
+
+    def _resolve_isin(self, user_input: str, intent: Intent) -> Dict[str, Any]:
+        """{"isin", "record", "score"} for a confident match, or {"reason"} explaining why not"""
+        isins = list(dict.fromkeys(ISIN_PATTERN.findall(user_input.upper())))
+        if len(isins) == 1:
+            return {"isin": isins[0], "record": None, "score": 1.0}
+        if len(isins) > 1:
+            return {"reason": "multiple_funds"}
+
+        subject = self._lookup_subject(user_input, intent)
+        if len(subject) < 4:
+            return {"reason": "no_fund_name"}
+
+        matches = self.tools.match_fund_name(subject, limit=2)
+        if not matches:
+            return {"reason": "no_index_match"}
+        (record, score), runner_up = matches[0], (matches[1][1] if len(matches) > 1 else 0.0)
+        if score < self.config.FAST_PATH_MIN_MATCH_SCORE:
+            return {"reason": "low_match_score"}
+        if score - runner_up < self.config.FAST_PATH_MIN_MATCH_MARGIN:
+            return {"reason": "ambiguous_match"}
+        return {"isin": record.isin, "record": record, "score": score}
+
+    @staticmethod
+    def _fund_from_factsheet(factsheet: Any) -> Dict[str, Any]:
+        if isinstance(factsheet, list):
+            factsheet = factsheet[0] if factsheet else {}
+        if isinstance(factsheet, dict) and isinstance(factsheet.get("data"), dict):
+            factsheet = factsheet["data"]
+        if not isinstance(factsheet, dict):
+            return {}
+        fund = {
+            "scheme_name": factsheet.get("scheme_name") or factsheet.get("fund_name"),
+            "amc_name": factsheet.get("amc") or factsheet.get("amc_name"),
+            "fund_manager": factsheet.get("fund_manager"),
+            "fund_type": factsheet.get("scheme_type") or factsheet.get("fund_type"),
+            "category": factsheet.get("sub_category") or factsheet.get("category"),
+            "aum": factsheet.get("aum"),
+            "expense_ratio": factsheet.get("expense_ratio"),
+            "benchmark": factsheet.get("benchmark"),
+            "sebi_risk_category": factsheet.get("sebi_risk_category")
+        }
+        return {k: v for k, v in fund.items() if v not in (None, "")}
+
+    async def _lookup(self, route: str, isin: str, record) -> Optional[Dict[str, Any]]:
+        """Call the orchestrator and shape its output for ResponseFormatter"""
+        fund: Dict[str, Any] = {"isin": isin}
+        if record is not None:
+            fund.update({"scheme_name": record.scheme_name, "amc_name": record.amc_name, "fund_type": record.category})
+
+        if route == "nav":
+            nav_summary = await self.tools.get_nav_history_summary(isin, last_days=30)
+            results = [nav_summary]
+            tools_used = ["get_nav_history"]
+        else:
+            factsheet, nav_summary = await asyncio.gather(
+                self.tools.get_fund_factsheet(isin),
+                self.tools.get_nav_history_summary(isin, last_days=30)
+            )
+            if not factsheet.get("found"):
+                return None
+            fund.update(self._fund_from_factsheet(factsheet.get("results")))
+            results = [factsheet, nav_summary]
+            tools_used = ["get_fund_factsheet", "get_nav_history"]
+
+        if nav_summary.get("found"):
+            fund["nav"] = nav_summary.get("latest_nav")
+            fund["nav_date"] = nav_summary.get("latest_date")
+        if route == "nav" and not fund.get("nav"):
+            return None
+        if not fund.get("scheme_name"):
+            fund["scheme_name"] = isin
+
+        return {
+            "result": {
+                "found": True,
+                "results": [fund],
+                "source": nav_summary.get("source", "") if route == "nav" else "FACTSHEET_API",
+                "confidence": 1.0,
+                "retrieved_at": datetime.now().isoformat()
+            },
+            "tools_used": tools_used,
+            "retrieval_context": [str(result)[:2000] for result in results if result.get("found")]
+        }
+
+    async def answer(self, user_input: str, intent: Intent, user_name: Optional[str] = None,
+                     priority: Priority = Priority.INTERACTIVE) -> Optional[FastPathAnswer]:
+        """Answer directly, or return None (and count why) so the agent handles it"""
+        route = self._route(user_input, intent)
+        if route is None:
+            self.stats.record_agent("not_a_lookup")
+            return None
+        if intent.confidence < self.config.FAST_PATH_MIN_INTENT_CONFIDENCE:
+            self.stats.record_agent("low_intent_confidence")
+            return None
+        if _AGENT_ONLY.search(user_input):
+            self.stats.record_agent("needs_context")
+            return None
+
+        resolved = self._resolve_isin(user_input, intent)
+        if "isin" not in resolved:
+            self.stats.record_agent(resolved["reason"])
+            return None
+
+        try:
+            lookup = await self._lookup(route, resolved["isin"], resolved["record"])
+        except Exception as e:
+            logger.warning(f"Fast path lookup failed for {resolved['isin']}: {e}")
+            lookup = None
+        if lookup is None:
+            self.stats.record_agent("tool_miss")
+            return None
+
+        confidence = round(min(intent.confidence, resolved["score"]), 3)
+        text = await self.formatter.format_response(lookup["result"], intent, user_name=user_name,
+                                                    confidence=confidence, method_used="Deterministic fast path")
+        if self.phrase is not None and self.config.FAST_PATH_LLM_PHRASING:
+            try:
+                text = await self.phrase(user_input, text, priority) or text
+                self.stats.llm_phrasings += 1
+            except Exception as e:
+                logger.warning(f"Fast path phrasing failed, using formatted answer: {e}")
+
+        self.stats.record_fast(route)
+        logger.info(f"⚡ Fast path ({route}) answered for {resolved['isin']} (confidence {confidence})")
+        return FastPathAnswer(
+            text=text,
+            route=route,
+            isin=resolved["isin"],
+            tools_used=lookup["tools_used"],
+            retrieval_context=lookup["retrieval_context"]
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.stats.get_stats()
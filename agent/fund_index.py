@@ -0,0 +1,217 @@
+"""
+Local in-memory fund catalogue with a character-trigram inverted index
+"""
+
+import math
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Set, FrozenSet, Iterable, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def normalize_name(name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9]+", " ", name.lower())).strip()
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Character trigrams of each word, padded so short words still index"""
+    grams = set()
+    for word in normalize_name(text).split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return frozenset(grams)
+
+@dataclass(frozen=True)
+class FundRecord:
+    """Catalogue entry kept in the index"""
+    isin: str
+    scheme_name: str
+    amc_name: str = ""
+    category: str = ""
+
+    @classmethod
+    def from_api(cls, fund: Dict[str, Any]) -> Optional['FundRecord']:
+        """Build a record from a /api/funds/ row, or None if it lacks a name or ISIN"""
+        isin = fund.get("isin")
+        name = fund.get("scheme_name") or fund.get("fund_name") or fund.get("name")
+        if not isin or not name:
+            return None
+        return cls(
+            isin=str(isin).strip().upper(),
+            scheme_name=str(name).strip(),
+            amc_name=str(fund.get("amc_name") or fund.get("fund_house") or fund.get("amc_code") or ""),
+            category=str(fund.get("category") or fund.get("fund_type") or fund.get("scheme_type") or "")
+        )
+
+class FundNameIndex:
+    """
+    Snapshot of the fund catalogue with a trigram inverted index.
+
+    Queries are scored by how much of the query's trigrams a scheme name
+    contains (with a small Dice term to prefer tighter names), so
+    "hdfc flexi cap" resolves to HDFC Flexi Cap plans without a network
+    round-trip. Refreshes are applied as a diff: only added, changed and
+    removed schemes touch the postings. The full catalogue row of each
+    scheme is kept alongside, so a hit carries the same fields (NAV,
+    returns, expense ratio, manager) as an upstream search result.
+    """
+
+    CONTAINMENT_WEIGHT = 0.85
+    DICE_WEIGHT = 0.15
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._records: Dict[str, FundRecord] = {}
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._gram_counts: Dict[str, int] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self.last_refresh: Optional[float] = None
+        self.refresh_count = 0
+        self.lookups = 0
+        self.confident_hits = 0
+        self._memory_bytes = 0
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _add(self, record: FundRecord):
+        grams = trigrams(record.scheme_name)
+        self._records[record.isin] = record
+        self._gram_counts[record.isin] = len(grams)
+        for gram in grams:
+            self._postings[gram].add(record.isin)
+
+    def _remove(self, isin: str):
+        self._rows.pop(isin, None)
+        record = self._records.pop(isin, None)
+        if record is None:
+            return
+        del self._gram_counts[isin]
+        for gram in trigrams(record.scheme_name):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(isin)
+                if not postings:
+                    del self._postings[gram]
+
+    def upsert(self, records: Iterable[FundRecord]) -> Tuple[int, int]:
+        """Add or update records, returning (added, updated)"""
+        added = updated = 0
+        with self._lock:
+            for record in records:
+                existing = self._records.get(record.isin)
+                if existing == record:
+                    continue
+                if existing is not None:
+                    self._remove(record.isin)
+                    updated += 1
+                else:
+                    added += 1
+                self._add(record)
+        return added, updated
+
+    def apply_snapshot(self, records: Iterable[FundRecord],
+                       rows: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, int]:
+        """
+        Make the index match a full catalogue snapshot, touching only what changed.
+
+        `rows` maps ISIN to the raw catalogue row; it replaces the stored
+        details wholesale since NAVs and returns change on every refresh.
+        """
+        snapshot = {record.isin: record for record in records}
+        with self._lock:
+            removed = [isin for isin in self._records if isin not in snapshot]
+            for isin in removed:
+                self._remove(isin)
+            added, updated = self.upsert(snapshot.values())
+            if rows is not None:
+                self._rows = {isin: row for isin, row in rows.items() if isin in snapshot}
+            self.last_refresh = time.time()
+            self.refresh_count += 1
+            self._memory_bytes = self._estimate_memory()
+
+        return {"added": added, "updated": updated, "removed": len(removed), "total": len(snapshot)}
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.0) -> List[Tuple[FundRecord, float]]:
+        """Return up to `limit` (record, score) pairs, best first"""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        with self._lock:
+            self.lookups += 1
+            if not self._records:
+                return []
+
+            # A scheme scoring >= min_score must contain at least this share of the query
+            min_containment = max(0.0, (min_score - self.DICE_WEIGHT) / self.CONTAINMENT_WEIGHT)
+            # ...so it must contain one of the (|Q| - ceil(share * |Q|) + 1) rarest query trigrams
+            by_rarity = sorted(query_grams, key=lambda g: len(self._postings.get(g, ())))
+            required = len(query_grams) - math.ceil(min_containment * len(query_grams) - 1e-9) + 1
+            candidates: Set[str] = set()
+            for gram in by_rarity[:max(1, required)]:
+                candidates.update(self._postings.get(gram, ()))
+
+            postings = [self._postings[g] for g in by_rarity if g in self._postings]
+            scored = []
+            for isin in candidates:
+                shared = sum(1 for posting in postings if isin in posting)
+                containment = shared / len(query_grams)
+                dice = 2 * shared / (len(query_grams) + self._gram_counts[isin])
+                score = self.CONTAINMENT_WEIGHT * containment + self.DICE_WEIGHT * dice
+                if score >= min_score:
+                    scored.append((self._records[isin], score))
+
+        scored.sort(key=lambda item: (-item[1], item[0].scheme_name))
+        return scored[:limit]
+
+    def details(self, isin: str) -> Optional[Dict[str, Any]]:
+        """Raw catalogue row for a scheme, or None if the snapshot didn't include it"""
+        with self._lock:
+            return self._rows.get(isin)
+
+    def _estimate_memory(self) -> int:
+        """Approximate bytes held by records and postings"""
+        size = sys.getsizeof(self._records) + sys.getsizeof(self._gram_counts) + sys.getsizeof(self._postings)
+        for isin, record in self._records.items():
+            size += sys.getsizeof(isin) + sys.getsizeof(record)
+            size += sum(sys.getsizeof(value) for value in (record.scheme_name, record.amc_name, record.category))
+        for gram, postings in self._postings.items():
+            size += sys.getsizeof(gram) + sys.getsizeof(postings)
+        for row in self._rows.values():
+            size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+        return size
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "funds": len(self._records),
+            "trigrams": len(self._postings),
+            "memory_bytes": self._memory_bytes,
+            "last_refresh": self.last_refresh,
+            "refresh_count": self.refresh_count,
+            "lookups": self.lookups,
+            "confident_hits": self.confident_hits
+        }
+
+    @staticmethod
+    def record_to_result(record: FundRecord, score: float,
+                         details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Shape an index hit like the upstream search results (the full row when available)"""
+        result = dict(details) if details else {}
+        fields = asdict(record)
+        category = fields.pop("category")
+        result.update(fields)
+        result.setdefault("fund_type", category)
+        result["match_score"] = round(score, 3)
+        return result
@@ -0,0 +1,196 @@
+"""
+Shared, pooled aiohttp client for the upstream fund APIs
+"""
+
+import asyncio
+import aiohttp
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .config import AgentConfig
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class ConcurrencyLimiter:
+    """
+    Caps in-flight upstream requests globally and per host.
+
+    Fan-outs (keyword / fuzzy variant searches, phase hedging) can issue
+    many requests for one user query; the limiter makes the excess wait
+    instead of flooding the API. A limit of 0 disables that cap. Like the
+    sessions, semaphores are kept per running event loop.
+    """
+
+    def __init__(self, max_concurrency: int, max_per_host: int):
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self._state: Dict[asyncio.AbstractEventLoop, Tuple[Optional[asyncio.Semaphore], Dict[str, asyncio.Semaphore]]] = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.waited = 0
+
+    def _semaphores(self, host: str) -> Tuple[Optional[asyncio.Semaphore], Optional[asyncio.Semaphore]]:
+        loop = asyncio.get_running_loop()
+        state = self._state.get(loop)
+        if state is None:
+            for stale_loop in [l for l in self._state if l.is_closed()]:
+                del self._state[stale_loop]
+            global_sem = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency > 0 else None
+            state = (global_sem, {})
+            self._state[loop] = state
+
+        global_sem, host_sems = state
+        host_sem = None
+        if self.max_per_host > 0:
+            host_sem = host_sems.get(host)
+            if host_sem is None:
+                host_sem = host_sems[host] = asyncio.Semaphore(self.max_per_host)
+        return global_sem, host_sem
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        """Hold one global and one per-host slot for the duration of a request"""
+        global_sem, host_sem = self._semaphores(host)
+        if (global_sem and global_sem.locked()) or (host_sem and host_sem.locked()):
+            self.waited += 1
+
+        # Per-host first so a saturated host does not tie up global slots
+        if host_sem is not None:
+            await host_sem.acquire()
+        try:
+            if global_sem is not None:
+                await global_sem.acquire()
+            try:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+            finally:
+                if global_sem is not None:
+                    global_sem.release()
+        finally:
+            if host_sem is not None:
+                host_sem.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_per_host": self.max_per_host,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "waited": self.waited
+        }
+
+class HTTPClientPool:
+    """
+    Owns a long-lived aiohttp.ClientSession with keep-alive, per-host
+    connection caps and a DNS cache.
+
+    Sessions are bound to the event loop they were created on, so one
+    session is kept per running loop. In the API server that is a single
+    session opened on startup and closed on shutdown; the CLI and the
+    evaluation runner get one lazily on first use.
+    """
+
+    def __init__(self, config: AgentConfig):
+        self.config = config
+        self._sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+        self.limiter = ConcurrencyLimiter(config.HTTP_MAX_CONCURRENCY, config.HTTP_MAX_CONCURRENCY_PER_HOST)
+        self.requests_made = 0
+        self.sessions_created = 0
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a session backed by a keep-alive connection pool"""
+        connector = aiohttp.TCPConnector(
+            limit=self.config.HTTP_POOL_LIMIT,
+            limit_per_host=self.config.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=self.config.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=self.config.HTTP_KEEPALIVE_TIMEOUT
+        )
+        self.sessions_created += 1
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)
+        )
+
+    async def start(self) -> aiohttp.ClientSession:
+        """Open the pooled session for the running event loop"""
+        return self.get_session()
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session for the running event loop, creating it if needed"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+
+        if session is None or session.closed:
+            # Drop sessions whose loops are gone (e.g. short-lived thread loops)
+            for stale_loop in [l for l in self._sessions if l.is_closed()]:
+                del self._sessions[stale_loop]
+
+            session = self._create_session()
+            self._sessions[loop] = session
+            logger.info(
+                f"Opened pooled HTTP session (limit={self.config.HTTP_POOL_LIMIT}, "
+                f"per_host={self.config.HTTP_POOL_LIMIT_PER_HOST})"
+            )
+
+        return session
+
+    @asynccontextmanager
+    async def session(self, url: Optional[str] = None):
+        """
+        Yield the pooled session without closing it on exit.
+
+        Drop-in replacement for ``async with aiohttp.ClientSession() as session``.
+        When ``url`` is given, a concurrency slot for its host is held until
+        the block exits, so read the response inside the block.
+        """
+        self.requests_made += 1
+        if url is None:
+            yield self.get_session()
+            return
+
+        async with self.limiter.slot(urlsplit(url).netloc):
+            yield self.get_session()
+
+    async def close(self):
+        """Close the pooled session(s) and release their connections"""
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+
+        for loop, session in list(self._sessions.items()):
+            if session.closed:
+                continue
+            if loop is current_loop:
+                await session.close()
+            elif not loop.is_closed() and not loop.is_running():
+                loop.run_until_complete(session.close())
+            else:
+                logger.warning("Skipping close of HTTP session bound to a busy event loop")
+
+        self._sessions.clear()
+        logger.info("Closed pooled HTTP session(s)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Connection pool statistics"""
+        open_connections = 0
+        for session in self._sessions.values():
+            connector = session.connector
+            if connector is not None and not session.closed:
+                open_connections += sum(len(conns) for conns in connector._conns.values())
+
+        return {
+            "sessions_open": sum(1 for s in self._sessions.values() if not s.closed),
+            "sessions_created": self.sessions_created,
+            "requests_made": self.requests_made,
+            "idle_connections": open_connections,
+            "limit": self.config.HTTP_POOL_LIMIT,
+            "limit_per_host": self.config.HTTP_POOL_LIMIT_PER_HOST,
+            "concurrency": self.limiter.get_stats()
+        }
@@ -0,0 +1,284 @@
+"""
+Exact and semantic cache of agent answers, scoped by intent type
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .intent_parser import IntentType
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_ANCHORS = re.compile(r"\bINF[A-Z0-9]{9}\b|\d+(?:\.\d+)?", re.IGNORECASE)
+# Questions that lean on earlier turns can't be answered from a shared cache
+_CONTEXT_DEPENDENT = re.compile(
+    r"\b(it|its|this|that|these|those|them|they|above|previous|earlier|same|again|more|else|also)\b", re.IGNORECASE
+)
+_STOPWORDS = frozenset("a an the is are was were be of for to in on and or do does can i me my you your please "
+                       "what whats s tell explain about meant mean means".split())
+_USER_PLACEHOLDER = "\x00user\x00"
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+def is_context_dependent(text: str) -> bool:
+    return bool(_CONTEXT_DEPENDENT.search(text))
+
+class HashingEmbedder:
+    """
+    Dependency-free local embedding: signed feature hashing of content words,
+    word bigrams and character trigrams into `dim` dimensions, L2-normalized.
+    Good enough to match rephrasings ("what is a mutual fund?" / "what's
+    mutual fund") without a model download.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    @staticmethod
+    def _stem(word: str) -> str:
+        return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        words = [w for w in normalize_question(text).split() if w not in _STOPWORDS] or normalize_question(text).split()
+        words = [self._stem(w) for w in words]
+        features = [(f"w:{w}", 1.0) for w in words]
+        features += [(f"b:{a} {b}", 0.7) for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f" {word} "
+            features += [(f"c:{padded[i:i + 3]}", 0.3) for i in range(len(padded) - 2)]
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += weight if digest[4] & 1 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class SentenceTransformerEmbedder:
+    """Wraps a sentence-transformers model (optional dependency)"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        self.name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    def embed(self, text: str) -> np.ndarray:
+        return np.asarray(self.model.encode(text, normalize_embeddings=True), dtype=np.float32)
+
+def make_embedder(model_name: str = ""):
+    """sentence-transformers model if configured and installed, else the hashing embedder"""
+    if model_name:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:  # ImportError, or the model can't be loaded offline
+            logger.warning(f"Embedding model '{model_name}' unavailable ({e}); using hashing embedder")
+    return HashingEmbedder()
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    expires_at: float
+    scope: str
+    question: str
+    tools_used: List[str] = field(default_factory=list)
+    retrieval_context: List[str] = field(default_factory=list)
+    hits: int = 0
+
+class LLMResponseCache:
+    """
+    Two-level cache of final agent answers.
+
+    Level one is exact: a hash of the normalized question within its intent
+    scope. Level two (optional) is semantic: the question's embedding is
+    compared by cosine similarity against cached questions of the same
+    intent, and the best match above `similarity_threshold` is served -
+    only for intents in `semantic_intents`, and only when both questions
+    carry the same ISINs and numbers. TTLs are per intent, so answers that
+    quote NAVs or returns expire with the data while concept answers live
+    longer; an intent with TTL 0 is never cached.
+    """
+
+    def __init__(self, intent_ttls: Dict[str, float], max_entries: int = 5000,
+                 semantic_enabled: bool = True, similarity_threshold: float = 0.9,
+                 semantic_intents: Optional[List[str]] = None, embedder=None):
+        self.intent_ttls = intent_ttls
+        self.max_entries = max_entries
+        self.semantic_enabled = semantic_enabled
+        self.similarity_threshold = similarity_threshold
+        self.semantic_intents = set(semantic_intents or [])
+        self.embedder = embedder or HashingEmbedder()
+
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._vectors: Dict[str, Dict[str, np.ndarray]] = {}  # scope -> key -> embedding
+        self._matrices: Dict[str, Tuple[List[str], np.ndarray]] = {}  # scope -> stacked embeddings
+        self._lock = threading.RLock()
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.skipped = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_config(cls, config) -> Optional['LLMResponseCache']:
+        if not config.LLM_CACHE_ENABLED:
+            return None
+        data_intents = (IntentType.FUND_QUERY, IntentType.NAV_REQUEST, IntentType.COMPARE_FUNDS,
+                        IntentType.PERFORMANCE_HISTORY, IntentType.REDEMPTION_QUERY)
+        concept_intents = (IntentType.GENERAL_INFO, IntentType.KYC_QUERY, IntentType.GREETING, IntentType.SMALLTALK)
+        intent_ttls = {intent.value: config.LLM_CACHE_TTL_DATA for intent in data_intents}
+        intent_ttls.update({intent.value: config.LLM_CACHE_TTL_CONCEPT for intent in concept_intents})
+        intent_ttls[IntentType.ACCOUNT_ISSUE.value] = 0  # User-specific
+        return cls(
+            intent_ttls=intent_ttls,
+            max_entries=config.LLM_CACHE_MAX_ENTRIES,
+            semantic_enabled=config.LLM_CACHE_SEMANTIC_ENABLED,
+            similarity_threshold=config.LLM_CACHE_SIMILARITY_THRESHOLD,
+            semantic_intents=[i.strip() for i in config.LLM_CACHE_SEMANTIC_INTENTS.split(",") if i.strip()],
+            embedder=make_embedder(config.LLM_CACHE_EMBEDDING_MODEL) if config.LLM_CACHE_SEMANTIC_ENABLED else None
+        )
+
+    @staticmethod
+    def _key(scope: str, question: str) -> str:
+        return hashlib.sha256(f"{scope}|{normalize_question(question)}".encode("utf-8")).hexdigest()
+
+    def _uses_semantic(self, scope: str) -> bool:
+        return self.semantic_enabled and scope in self.semantic_intents
+
+    @staticmethod
+    def _render(entry: CachedAnswer, user_name: Optional[str]) -> str:
+        return entry.answer.replace(_USER_PLACEHOLDER, user_name or "there")
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None and key in self._vectors.get(entry.scope, {}):
+            del self._vectors[entry.scope][key]
+            self._matrices.pop(entry.scope, None)
+
+    def _matrix(self, scope: str) -> Tuple[List[str], np.ndarray]:
+        if scope not in self._matrices:
+            vectors = self._vectors.get(scope, {})
+            keys = list(vectors)
+            self._matrices[scope] = (keys, np.stack([vectors[k] for k in keys]) if keys else np.empty((0, 0), np.float32))
+        return self._matrices[scope]
+
+    def _semantic_lookup(self, scope: str, question: str) -> Optional[Tuple[str, float]]:
+        keys, matrix = self._matrix(scope)
+        if not keys:
+            return None
+        scores = matrix @ self.embedder.embed(question)
+        anchors = sorted(_ANCHORS.findall(question.upper()))
+        for index in np.argsort(-scores):
+            score = float(scores[index])
+            if score < self.similarity_threshold:
+                return None
+            entry = self._entries.get(keys[index])
+            if entry is not None and sorted(_ANCHORS.findall(entry.question.upper())) == anchors:
+                return keys[index], score
+        return None
+
+    def get(self, question: str, intent: IntentType, user_name: Optional[str] = None) -> Optional[CachedAnswer]:
+        """Cached answer for the question, with the user's name filled in, or None"""
+        scope = intent.value
+        if self.intent_ttls.get(scope, 0) <= 0:
+            return None
+
+        with self._lock:
+            key = self._key(scope, question)
+            match = "exact"
+            entry = self._entries.get(key)
+            if entry is None and self._uses_semantic(scope):
+                found = self._semantic_lookup(scope, question)
+                if found is not None:
+                    key, similarity = found
+                    entry = self._entries[key]
+                    match = f"semantic ({similarity:.2f})"
+
+            if entry is not None and entry.expires_at <= time.time():
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            if match == "exact":
+                self.exact_hits += 1
+            else:
+                self.semantic_hits += 1
+            logger.info(f"💾 LLM cache hit [{scope}, {match}] for: {question[:80]}")
+            return CachedAnswer(self._render(entry, user_name), entry.expires_at, scope, entry.question,
+                                list(entry.tools_used), list(entry.retrieval_context), entry.hits)
+
+    def set(self, question: str, intent: IntentType, answer: str, user_name: Optional[str] = None,
+            tools_used: Optional[List[str]] = None, retrieval_context: Optional[List[str]] = None):
+        scope = intent.value
+        ttl = self.intent_ttls.get(scope, 0)
+        if ttl <= 0 or not answer:
+            self.skipped += 1
+            return
+
+        if user_name:
+            answer = answer.replace(user_name, _USER_PLACEHOLDER)
+        key = self._key(scope, question)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = CachedAnswer(answer, time.time() + ttl, scope, question,
+                                              list(tools_used or []), list(retrieval_context or []))
+            if self._uses_semantic(scope):
+                self._vectors.setdefault(scope, {})[key] = self.embedder.embed(question)
+                self._matrices.pop(scope, None)
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, intent: Optional[IntentType] = None) -> int:
+        """Drop every entry, or every entry of one intent; returns the count dropped"""
+        with self._lock:
+            keys = [k for k, e in self._entries.items() if intent is None or e.scope == intent.value]
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.exact_hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.exact_hits + self.semantic_hits) / lookups, 3) if lookups else 0.0,
+                "stores": self.stores,
+                "skipped": self.skipped,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "semantic": {
+                    "enabled": self.semantic_enabled,
+                    "embedder": getattr(self.embedder, "name", type(self.embedder).__name__),
+                    "threshold": self.similarity_threshold,
+                    "intents": sorted(self.semantic_intents)
+                }
+            }
@@ -6,6 +6,7 @@ import os
 import logging
 from typing import Optional
 from dotenv import load_dotenv
+import httpx
 
 # Load environment variables
 load_dotenv()
@@ -22,13 +23,17 @@ if MOONSHOT_KEY:
 
 from langchain_openai import ChatOpenAI
 
-def get_chat_llm(model_name: Optional[str] = None, temperature: float = 0.0) -> ChatOpenAI:
+def get_chat_llm(model_name: Optional[str] = None, temperature: float = 0.0,
+                 rate_limiter=None, max_retries: int = 2, streaming: bool = False) -> ChatOpenAI:
     """
     Returns a ChatOpenAI model configured to use your Groq (Moonshot) endpoint.
     
     Args:
         model_name: Model name to use (defaults to MOONSHOT_MODEL from env)
         temperature: Temperature setting for the model
+        rate_limiter: Optional LLMRateLimiter; paces every request through httpx event hooks
+        max_retries: Retries on 429/5xx (paced by the rate limiter when one is given)
+        streaming: Stream completions so callbacks receive tokens as they arrive
         
     Returns:
         Configured ChatOpenAI instance
@@ -40,13 +45,21 @@ def get_chat_llm(model_name: Optional[str] = None, temperature: float = 0.0) ->
     if not api_key:
         raise ValueError("MOONSHOT_API_KEY not found in environment variables")
     
+    client_kwargs = {}
+    if rate_limiter is not None:
+        client_kwargs["http_client"] = httpx.Client(event_hooks=rate_limiter.httpx_hooks())
+        client_kwargs["http_async_client"] = httpx.AsyncClient(event_hooks=rate_limiter.async_httpx_hooks())
+    
     try:
         llm = ChatOpenAI(
             model=model,
             temperature=temperature,
             max_tokens=1500,
             base_url=base_url,
-            api_key=api_key
+            api_key=api_key,
+            max_retries=max_retries,
+            streaming=streaming,
+            **client_kwargs
         )
         logging.info(f"Moonshot LLM initialized successfully with model: {model}")
         return llm
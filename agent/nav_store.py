@@ -0,0 +1,264 @@
+"""
+Columnar NAV history store backed by memory-mapped files
+"""
+
+import os
+import re
+import threading
+import time
+from datetime import datetime, date
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DATE_DTYPE = np.int32  # days since 1970-01-01 (date32)
+NAV_DTYPE = np.float64
+EPOCH = date(1970, 1, 1)
+
+_ISIN_PATTERN = re.compile(r"^[A-Z0-9]{12}$")
+
+def parse_nav_date(value: Any) -> Optional[int]:
+    """Parse an API date ('2024-01-31', '31-01-2024', '31-Jan-2024') to date32"""
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return (value - EPOCH).days
+    if not value:
+        return None
+    text = str(value).strip().split("T")[0]
+    for fmt in ("%Y-%m-%d", "%d-%m-%Y", "%d-%b-%Y", "%d/%m/%Y"):
+        try:
+            return (datetime.strptime(text, fmt).date() - EPOCH).days
+        except ValueError:
+            continue
+    return None
+
+def nav_points_from_api(data: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Extract (dates, navs) sorted by date from a /api/funds/{isin}/nav payload.
+
+    Accepts {"nav_history": [...]}, {"data": [...]} or a bare list of
+    {"date": ..., "nav": ...} rows; unparseable rows are skipped.
+    """
+    rows = data
+    if isinstance(data, dict):
+        rows = data.get("nav_history") or data.get("data") or data.get("results") or []
+
+    points: Dict[int, float] = {}
+    for row in rows if isinstance(rows, list) else []:
+        if not isinstance(row, dict):
+            continue
+        day = parse_nav_date(row.get("date") or row.get("nav_date"))
+        try:
+            nav = float(row.get("nav"))
+        except (TypeError, ValueError):
+            continue
+        if day is not None and np.isfinite(nav):
+            points[day] = nav
+
+    days = np.array(sorted(points), dtype=DATE_DTYPE)
+    navs = np.array([points[d] for d in days.tolist()], dtype=NAV_DTYPE)
+    return days, navs
+
+def to_iso(day: int) -> str:
+    return str(np.datetime64(int(day), "D"))
+
+class NavSeries:
+    """A (dates, navs) slice; arrays are read-only views of the store's memory maps"""
+
+    __slots__ = ("isin", "dates", "navs")
+
+    def __init__(self, isin: str, dates: np.ndarray, navs: np.ndarray):
+        self.isin = isin
+        self.dates = dates
+        self.navs = navs
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def as_datetime64(self) -> np.ndarray:
+        return self.dates.astype("datetime64[D]")
+
+def slice_series(series: NavSeries, start: Optional[int] = None, end: Optional[int] = None,
+                 last_days: Optional[int] = None) -> NavSeries:
+    """Slice a series by inclusive date32 bounds or trailing calendar days, without copying"""
+    dates = series.dates
+    if not len(dates):
+        return series
+    if last_days is not None:
+        start = int(dates[-1]) - last_days
+    lo = int(np.searchsorted(dates, start, side="left")) if start is not None else 0
+    hi = int(np.searchsorted(dates, end, side="right")) if end is not None else len(dates)
+    return NavSeries(series.isin, dates[lo:hi], series.navs[lo:hi])
+
+class NavStore:
+    """
+    Per-ISIN NAV history persisted as two append-only columns:
+
+        {isin}.dates  int32 days since epoch, ascending
+        {isin}.navs   float64 NAV values
+
+    Reads memory-map the files, so slices (last N days, date range) are
+    zero-copy views found with a binary search. Refreshes append only the
+    points newer than the last stored date.
+    """
+
+    def __init__(self, directory: str, refresh_interval: float = 43200):
+        self.directory = directory
+        self.refresh_interval = refresh_interval
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        self.appends = 0
+        self.points_appended = 0
+        self.reads = 0
+
+    def _paths(self, isin: str) -> Tuple[str, str]:
+        isin = isin.strip().upper()
+        if not _ISIN_PATTERN.match(isin):
+            raise ValueError(f"Invalid ISIN: {isin}")
+        base = os.path.join(self.directory, isin)
+        return base + ".dates", base + ".navs"
+
+    def _open(self, isin: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Memory-map an ISIN's columns, or None if nothing is stored"""
+        cached = self._maps.get(isin)
+        if cached is not None:
+            return cached
+
+        dates_path, navs_path = self._paths(isin)
+        if not os.path.exists(dates_path) or not os.path.exists(navs_path):
+            return None
+
+        # A crash between the two appends leaves one column longer; trust the shorter
+        length = min(os.path.getsize(dates_path) // np.dtype(DATE_DTYPE).itemsize,
+                     os.path.getsize(navs_path) // np.dtype(NAV_DTYPE).itemsize)
+        if length == 0:
+            return None
+
+        dates = np.memmap(dates_path, dtype=DATE_DTYPE, mode="r", shape=(length,))
+        navs = np.memmap(navs_path, dtype=NAV_DTYPE, mode="r", shape=(length,))
+        self._maps[isin] = (dates, navs)
+        return dates, navs
+
+    @staticmethod
+    def _align(dates_path: str, navs_path: str):
+        """Cut both columns back to their common length (a crash can leave one longer)"""
+        if not os.path.exists(dates_path) or not os.path.exists(navs_path):
+            return
+        length = min(os.path.getsize(dates_path) // np.dtype(DATE_DTYPE).itemsize,
+                     os.path.getsize(navs_path) // np.dtype(NAV_DTYPE).itemsize)
+        for path, dtype in ((dates_path, DATE_DTYPE), (navs_path, NAV_DTYPE)):
+            size = length * np.dtype(dtype).itemsize
+            if os.path.getsize(path) != size:
+                logger.warning(f"NAV store column {os.path.basename(path)} misaligned; truncating to {length} points")
+                os.truncate(path, size)
+
+    def last_date(self, isin: str) -> Optional[int]:
+        with self._lock:
+            columns = self._open(isin.upper())
+        return int(columns[0][-1]) if columns is not None else None
+
+    def is_stale(self, isin: str) -> bool:
+        """True if the ISIN has never been refreshed, or not within refresh_interval"""
+        isin = isin.upper()
+        refreshed_at = self._refreshed_at.get(isin)
+        if refreshed_at is None:
+            dates_path, _ = self._paths(isin)
+            if not os.path.exists(dates_path):
+                return True
+            refreshed_at = os.path.getmtime(dates_path)
+        return time.time() - refreshed_at > self.refresh_interval
+
+    def append(self, isin: str, days: np.ndarray, navs: np.ndarray) -> int:
+        """Append points newer than the last stored date; returns how many were written"""
+        isin = isin.strip().upper()
+        dates_path, navs_path = self._paths(isin)
+
+        with self._lock:
+            # Appends go to the end of each file, so both must end at the same point
+            self._align(dates_path, navs_path)
+            columns = self._open(isin)
+            if columns is not None:
+                newer = days > columns[0][-1]
+                days, navs = days[newer], navs[newer]
+                if len(days):
+                    # Existing views stay valid; new reads remap the grown files
+                    self._maps.pop(isin, None)
+
+            if len(days):
+                with open(dates_path, "ab") as f:
+                    f.write(np.ascontiguousarray(days, dtype=DATE_DTYPE).tobytes())
+                with open(navs_path, "ab") as f:
+                    f.write(np.ascontiguousarray(navs, dtype=NAV_DTYPE).tobytes())
+                self.appends += 1
+                self.points_appended += len(days)
+            elif os.path.exists(dates_path):
+                # Nothing new, but remember that the ISIN is up to date
+                os.utime(dates_path)
+
+            self._refreshed_at[isin] = time.time()
+
+        return len(days)
+
+    def get(self, isin: str, start: Optional[int] = None, end: Optional[int] = None,
+            last_days: Optional[int] = None) -> Optional[NavSeries]:
+        """
+        Return the stored series for an ISIN, optionally sliced.
+
+        start/end are inclusive date32 values; last_days keeps the points
+        within that many calendar days of the latest NAV.
+        """
+        isin = isin.strip().upper()
+        with self._lock:
+            columns = self._open(isin)
+        if columns is None:
+            return None
+
+        self.reads += 1
+        return slice_series(NavSeries(isin, *columns), start, end, last_days)
+
+    def isins(self) -> List[str]:
+        return sorted(name[:-len(".dates")] for name in os.listdir(self.directory) if name.endswith(".dates"))
+
+    def get_stats(self) -> Dict[str, Any]:
+        stored = self.isins()
+        size = sum(os.path.getsize(os.path.join(self.directory, name)) for name in os.listdir(self.directory)
+                   if name.endswith((".dates", ".navs")))
+        return {
+            "directory": self.directory,
+            "isins": len(stored),
+            "bytes_on_disk": size,
+            "open_maps": len(self._maps),
+            "appends": self.appends,
+            "points_appended": self.points_appended,
+            "reads": self.reads
+        }
+
+def summarize_series(series: NavSeries, recent: int = 10) -> Dict[str, Any]:
+    """Compact, text-friendly summary of a NAV slice for the agent"""
+    if series is None or not len(series):
+        return {"points": 0}
+
+    navs = series.navs
+    start_nav, latest_nav = float(navs[0]), float(navs[-1])
+    tail = slice(max(0, len(series) - recent), len(series))
+    return {
+        "points": len(series),
+        "start_date": to_iso(series.dates[0]),
+        "start_nav": round(start_nav, 4),
+        "latest_date": to_iso(series.dates[-1]),
+        "latest_nav": round(latest_nav, 4),
+        "change_pct": round((latest_nav / start_nav - 1) * 100, 2) if start_nav else None,
+        "high": round(float(navs.max()), 4),
+        "low": round(float(navs.min()), 4),
+        "recent_nav": [
+            {"date": to_iso(d), "nav": round(float(n), 4)}
+            for d, n in zip(series.dates[tail][::-1].tolist(), navs[tail][::-1].tolist())
+        ]
+    }
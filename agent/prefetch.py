@@ -0,0 +1,172 @@
+"""
+Speculative prefetch of fund data while the agent's first LLM step is running
+"""
+
+import asyncio
+import re
+import threading
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional, Tuple
+
+from .config import AgentConfig
+from .fund_index import normalize_name
+from .intent_parser import Intent, IntentType
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+ISIN_PATTERN = re.compile(r"\bINF[A-Z0-9]{9}\b")
+
+# Intents whose next step is almost always a fund search or ISIN lookup
+PREFETCH_INTENTS = (IntentType.FUND_QUERY, IntentType.NAV_REQUEST, IntentType.PERFORMANCE_HISTORY,
+                    IntentType.COMPARE_FUNDS, IntentType.REDEMPTION_QUERY)
+
+# The prefetch scope of the agent run in progress (set by MutualFundsAgent for one turn)
+current_prefetch: ContextVar[Optional['PrefetchScope']] = ContextVar("current_prefetch", default=None)
+
+class PrefetchStats:
+    """Process-wide prefetch accounting"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.unused = 0
+        self.failed = 0
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "turns_prefetched": self.turns,
+                "prefetches_started": self.started,
+                "hits": self.hits,
+                "misses": self.misses,
+                "unused": self.unused,
+                "failed": self.failed,
+                "hit_rate": round(self.hits / self.started, 3) if self.started else 0.0
+            }
+
+class PrefetchScope:
+    """
+    Speculative fetches for one request, keyed by (kind, normalized argument).
+
+    Tools call take() with the same kind/argument they are about to fetch;
+    a running or finished prefetch is awaited instead of issuing the call
+    again. close() cancels whatever the turn did not use.
+    """
+
+    def __init__(self, stats: PrefetchStats):
+        self.stats = stats
+        self._tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+        self._used: set = set()
+        self._closed = False
+
+    @staticmethod
+    def _key(kind: str, argument: str) -> Tuple[str, str]:
+        argument = argument.strip()
+        return kind, argument.upper() if kind == "isin" else normalize_name(argument)
+
+    def start(self, kind: str, argument: str, coroutine):
+        key = self._key(kind, argument)
+        if self._closed or key in self._tasks:
+            coroutine.close()
+            return
+        self._tasks[key] = asyncio.ensure_future(coroutine)
+        self.stats.add(started=1)
+        logger.info(f"🔮 Prefetching {kind} '{argument}'")
+
+    async def take(self, kind: str, argument: str) -> Optional[Dict[str, Any]]:
+        """The prefetched result for this call, or None to fetch it live"""
+        key = self._key(kind, argument)
+        task = self._tasks.get(key)
+        if task is None:
+            self.stats.add(misses=1)
+            return None
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Prefetch of {key} failed, fetching live: {e}")
+            return None
+        if not isinstance(result, dict):
+            return None
+        if key not in self._used:
+            self._used.add(key)
+            self.stats.add(hits=1)
+        return result
+
+    def close(self):
+        """Cancel unfinished prefetches and count the ones never used"""
+        self._closed = True
+        unused = failed = 0
+        for key, task in self._tasks.items():
+            if key in self._used:
+                continue
+            unused += 1
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled() and task.exception() is not None:
+                failed += 1
+        self.stats.add(unused=unused, failed=failed)
+        self._tasks.clear()
+
+async def take_prefetched(kind: str, argument: str) -> Optional[Dict[str, Any]]:
+    """Prefetched result for the current agent run, if any"""
+    scope = current_prefetch.get()
+    if scope is None:
+        return None
+    return await scope.take(kind, argument)
+
+class Prefetcher:
+    """
+    Starts search -> ISIN -> details fetches from the parsed intent.
+
+    An explicit ISIN goes straight to call_db_api_by_isin (what the
+    get_fund_by_isin tool runs). A fund name goes to call_db_api (what
+    search_funds_db runs) and, once that resolves, the top result's ISIN is
+    prefetched too. Fetches go through the orchestrator, so even a call the
+    agent phrases differently finds the response cache warm.
+    """
+
+    def __init__(self, config: AgentConfig, tool_orchestrator):
+        self.config = config
+        self.tools = tool_orchestrator
+        self.stats = PrefetchStats()
+
+    def begin(self, user_input: str, intent: Intent) -> Optional[PrefetchScope]:
+        """Start prefetches for a turn, or return None when nothing is worth fetching"""
+        if intent.intent not in PREFETCH_INTENTS:
+            return None
+
+        isins: List[str] = list(dict.fromkeys(ISIN_PATTERN.findall(user_input.upper())))
+        fund_name = intent.entities.fund_name
+        if not isins and not fund_name:
+            return None
+
+        scope = PrefetchScope(self.stats)
+        for isin in isins[:self.config.PREFETCH_MAX_ISINS]:
+            scope.start("isin", isin, self.tools.call_db_api_by_isin(isin=isin))
+        if fund_name and not isins:
+            scope.start("search", fund_name, self._search_then_details(scope, fund_name))
+        self.stats.add(turns=1)
+        return scope
+
+    async def _search_then_details(self, scope: PrefetchScope, fund_name: str) -> Dict[str, Any]:
+        result = await self.tools.call_db_api(fund_name=fund_name, deep_search=True)
+        if self.config.PREFETCH_DETAILS and result.get("found"):
+            top = result.get("results") or []
+            isin = top[0].get("isin") if top and isinstance(top[0], dict) else None
+            if isin:
+                scope.start("isin", isin, self.tools.call_db_api_by_isin(isin=isin))
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.stats.get_stats()
@@ -0,0 +1,319 @@
+"""
+Client-side request/token rate limiting for the LLM endpoint (Groq / Moonshot)
+"""
+
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+import httpx
+
+from .conversation_memory import count_tokens
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse reset/retry headers such as '7.66s', '2m59.56s', '120ms' or '30' into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+class _MemoryBucketStore:
+    """Bucket levels for a single process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Tuple[float, float, float]] = {}  # name -> (level, updated_at, blocked_until)
+
+    def transact(self, name: str, fn):
+        with self._lock:
+            state = self._state.get(name)
+            new_state, result = fn(state)
+            self._state[name] = new_state
+            return result
+
+    def read(self, name: str) -> Optional[Tuple[float, float, float]]:
+        with self._lock:
+            return self._state.get(name)
+
+class _SQLiteBucketStore:
+    """
+    Bucket levels shared by every process pointing at the same file.
+
+    Each reservation is a read-modify-write inside BEGIN IMMEDIATE, so
+    concurrent API workers and evaluation runners draw from one budget.
+    That can wait up to the 10s busy timeout on the file lock, so async
+    callers run transact() in a thread. Reads take no write lock (WAL).
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            "name TEXT PRIMARY KEY, level REAL NOT NULL, updated_at REAL NOT NULL, blocked_until REAL NOT NULL)"
+        )
+
+    def transact(self, name: str, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT level, updated_at, blocked_until FROM rate_buckets WHERE name = ?", (name,)
+                ).fetchone()
+                new_state, result = fn(tuple(row) if row else None)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, level, updated_at, blocked_until) VALUES (?, ?, ?, ?)",
+                    (name, *new_state)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return result
+
+    def read(self, name: str) -> Optional[Tuple[float, float, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT level, updated_at, blocked_until FROM rate_buckets WHERE name = ?", (name,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def close(self):
+        self._conn.close()
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations rather than refusals.
+
+    reserve() deducts immediately, letting the level go negative, and
+    returns how long the caller must wait for the level to refill to zero;
+    callers are therefore paced in arrival order instead of failing.
+    """
+
+    def __init__(self, name: str, capacity: float, per_minute: float, store):
+        self.name = name
+        self.capacity = float(capacity)
+        self.rate = per_minute / 60.0
+        self.store = store
+
+    def _refilled(self, state: Optional[Tuple[float, float, float]], now: float) -> Tuple[float, float]:
+        if state is None:
+            return self.capacity, 0.0
+        level, updated_at, blocked_until = state
+        return min(self.capacity, level + (now - updated_at) * self.rate), blocked_until
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` and return the seconds to wait before using it"""
+        def apply(state):
+            now = time.time()
+            level, blocked_until = self._refilled(state, now)
+            level -= amount
+            wait = max(-level / self.rate if level < 0 else 0.0, blocked_until - now, 0.0)
+            return (level, now, blocked_until), wait
+        return self.store.transact(self.name, apply)
+
+    def adjust(self, delta: float):
+        """Give back (positive) or take (negative) tokens after the real cost is known"""
+        def apply(state):
+            now = time.time()
+            level, blocked_until = self._refilled(state, now)
+            return (min(self.capacity, level + delta), now, blocked_until), None
+        self.store.transact(self.name, apply)
+
+    def sync_remaining(self, remaining: float, reset_seconds: Optional[float] = None):
+        """Never assume more headroom than the server reports"""
+        def apply(state):
+            now = time.time()
+            level, blocked_until = self._refilled(state, now)
+            if remaining <= 0 and reset_seconds:
+                blocked_until = max(blocked_until, now + reset_seconds)
+            return (min(level, remaining), now, blocked_until), None
+        self.store.transact(self.name, apply)
+
+    def block(self, seconds: float):
+        """Hold all reservations for `seconds` (e.g. after a 429 with Retry-After)"""
+        def apply(state):
+            now = time.time()
+            level, blocked_until = self._refilled(state, now)
+            return (level, now, max(blocked_until, now + seconds)), None
+        self.store.transact(self.name, apply)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current level and block, without writing (cheap enough to call on the event loop)"""
+        now = time.time()
+        level, blocked_until = self._refilled(self.store.read(self.name), now)
+        return {"level": round(level, 1), "blocked_for": round(max(0.0, blocked_until - now), 2)}
+
+class LLMRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute pacing for the LLM endpoint.
+
+    Attach it to the OpenAI-compatible client through httpx event hooks
+    (see httpx_hooks / async_httpx_hooks): each request reserves one
+    request plus its estimated tokens (prompt + max_tokens) and waits for
+    them; each response trues the token bucket up with the reported usage
+    and folds in x-ratelimit-* headers, and a 429 pauses every caller for
+    the server's Retry-After. With a shared_path the buckets live in SQLite
+    so several processes share one budget, and the async hooks run the
+    bucket transactions in a worker thread to keep the event loop free.
+    """
+
+    def __init__(self, requests_per_minute: float = 60, tokens_per_minute: float = 10000,
+                 shared_path: Optional[str] = None):
+        self.store = _SQLiteBucketStore(shared_path) if shared_path else _MemoryBucketStore()
+        self.shared_path = shared_path
+        self.requests = TokenBucket("requests", requests_per_minute, requests_per_minute, self.store)
+        self.tokens = TokenBucket("tokens", tokens_per_minute, tokens_per_minute, self.store)
+        self.paced_requests = 0
+        self.total_wait_seconds = 0.0
+        self.rate_limited_responses = 0
+        self._reserved: Dict[int, int] = {}
+
+    @classmethod
+    def from_config(cls, config) -> Optional['LLMRateLimiter']:
+        if not config.LLM_RATE_LIMIT_ENABLED:
+            return None
+        return cls(
+            requests_per_minute=config.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=config.LLM_TOKENS_PER_MINUTE,
+            shared_path=config.LLM_RATE_LIMIT_SHARED_PATH or None
+        )
+
+    @staticmethod
+    def estimate_tokens(request: httpx.Request) -> int:
+        """Prompt tokens plus the completion budget of a chat/completions request"""
+        try:
+            payload = json.loads(request.content or b"{}")
+        except (ValueError, UnicodeDecodeError):
+            return 1
+        prompt = 0
+        for message in payload.get("messages") or []:
+            content = message.get("content")
+            if isinstance(content, list):
+                content = " ".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+            prompt += count_tokens(str(content or "")) + 4  # per-message framing
+        prompt += count_tokens(str(payload.get("prompt") or ""))
+        return prompt + int(payload.get("max_tokens") or payload.get("max_completion_tokens") or 0)
+
+    def _reserve(self, request: httpx.Request) -> float:
+        estimate = self.estimate_tokens(request)
+        if len(self._reserved) > 1000:
+            self._reserved.clear()  # Requests that never got a response (connection errors)
+        self._reserved[id(request)] = estimate
+        wait = max(self.requests.reserve(1), self.tokens.reserve(estimate))
+        if wait > 0:
+            self.paced_requests += 1
+            self.total_wait_seconds += wait
+            logger.info(f"🚦 Pacing LLM request for {wait:.1f}s (~{estimate} tokens)")
+        return wait
+
+    def _observe(self, response: httpx.Response, usage_tokens: Optional[int]):
+        estimate = self._reserved.pop(id(response.request), None)
+        headers = response.headers
+
+        if usage_tokens is not None and estimate is not None:
+            self.tokens.adjust(estimate - usage_tokens)
+
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is not None:
+                try:
+                    bucket.sync_remaining(float(remaining), parse_reset(headers.get(f"x-ratelimit-reset-{kind}")))
+                except ValueError:
+                    pass
+
+        if response.status_code == 429:
+            self.rate_limited_responses += 1
+            retry_after = parse_reset(headers.get("retry-after")) or parse_reset(headers.get("x-ratelimit-reset-tokens")) or 10.0
+            self.record_rate_limited(retry_after)
+
+    @staticmethod
+    def _usage_from_body(response: httpx.Response) -> Optional[int]:
+        try:
+            return int(response.json()["usage"]["total_tokens"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _wants_body(self, response: httpx.Response) -> bool:
+        # Streaming bodies must not be consumed here
+        return response.status_code == 200 and "application/json" in response.headers.get("content-type", "")
+
+    async def acquire_async(self, request: httpx.Request):
+        if self.shared_path:
+            wait = await asyncio.to_thread(self._reserve, request)
+        else:
+            wait = self._reserve(request)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def observe_async(self, response: httpx.Response):
+        usage = None
+        if self._wants_body(response):
+            await response.aread()
+            usage = self._usage_from_body(response)
+        if self.shared_path:
+            await asyncio.to_thread(self._observe, response, usage)
+        else:
+            self._observe(response, usage)
+
+    def acquire(self, request: httpx.Request):
+        wait = self._reserve(request)
+        if wait > 0:
+            time.sleep(wait)
+
+    def observe(self, response: httpx.Response):
+        usage = None
+        if self._wants_body(response):
+            response.read()
+            usage = self._usage_from_body(response)
+        self._observe(response, usage)
+
+    def httpx_hooks(self) -> Dict[str, list]:
+        return {"request": [self.acquire], "response": [self.observe]}
+
+    def async_httpx_hooks(self) -> Dict[str, list]:
+        return {"request": [self.acquire_async], "response": [self.observe_async]}
+
+    def record_rate_limited(self, retry_after: float):
+        """Pause all requests sharing this limiter for retry_after seconds"""
+        self.requests.block(retry_after)
+        logger.warning(f"⏸️ LLM rate limited upstream; pausing requests for {retry_after:.1f}s")
+
+    def blocked_for(self) -> float:
+        """Seconds until requests are allowed again after an upstream 429"""
+        return self.requests.snapshot()["blocked_for"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "sqlite" if self.shared_path else "memory",
+            "requests_per_minute": self.requests.capacity,
+            "tokens_per_minute": self.tokens.capacity,
+            "requests_bucket": self.requests.snapshot(),
+            "tokens_bucket": self.tokens.snapshot(),
+            "paced_requests": self.paced_requests,
+            "total_wait_seconds": round(self.total_wait_seconds, 2),
+            "rate_limited_responses": self.rate_limited_responses
+        }
@@ -21,7 +21,8 @@ class ResponseFormatter:
     async def format_response(self, result: Dict[str, Any], intent: Intent,
                             user_name: Optional[str] = None,
                             sources_used: List[Dict[str, Any]] = None,
-                            confidence: float = 0.0) -> str:
+                            confidence: float = 0.0,
+                            method_used: str = "LangChain zero-shot") -> str:
         """Format the final response according to specifications"""
         
         if sources_used is None:
@@ -46,7 +47,7 @@ class ResponseFormatter:
                 return self._format_error_response(result, intent, user_name)
             
             # Handle successful responses
-            return await self._format_success_response(result, intent, user_name, sources_used, confidence)
+            return await self._format_success_response(result, intent, user_name, sources_used, confidence, method_used)
             
         except Exception as e:
             logger.error(f"Error in format_response: {str(e)}")
@@ -126,7 +127,7 @@ What would you like to do next?
     
     async def _format_success_response(self, result: Dict[str, Any], intent: Intent,
                                      user_name: Optional[str], sources_used: List[Dict[str, Any]],
-                                     confidence: float) -> str:
+                                     confidence: float, method_used: str = "LangChain zero-shot") -> str:
         """Format successful response with complete structure"""
         
         # Safe sentiment extraction with comprehensive error handling
@@ -212,7 +213,7 @@ What would you like to do next?
         response_parts.append("**⚖️ Disclaimer:** Not financial advice; confirm with official sources or your advisor.")
         
         # 11. Metadata JSON
-        metadata = self._generate_metadata(result, sources_used, confidence, intent)
+        metadata = self._generate_metadata(result, sources_used, confidence, intent, method_used)
         response_parts.append("---")
         response_parts.append("```json")
         response_parts.append(json.dumps(metadata, indent=2))
@@ -465,7 +466,8 @@ What would you like to do next?
         return f"{level} ({confidence:.2f}/1.0) {explanation}"
     
     def _generate_metadata(self, result: Dict[str, Any], sources_used: List[Dict[str, Any]],
-                          confidence: float, intent: Intent) -> Dict[str, Any]:
+                          confidence: float, intent: Intent,
+                          method_used: str = "LangChain zero-shot") -> Dict[str, Any]:
         """Generate metadata JSON"""
         
         tools_used = ["INTENT_PARSER"]
@@ -497,7 +499,7 @@ What would you like to do next?
             })
         
         return {
-            "method_used": "LangChain zero-shot",
+            "method_used": method_used,
             "tools_used": tools_used,
             "retrieval_path": retrieval_path,
             "sources": formatted_sources,
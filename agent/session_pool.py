@@ -0,0 +1,109 @@
+"""
+Bounded pool of per-session agent state (conversation memory and last-run trace)
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Callable, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class SessionState:
+    """Conversation memory and last-turn trace owned by one session"""
+
+    __slots__ = ("session_id", "memory", "last_tools_used", "last_retrieval_context",
+                 "created_at", "last_used", "turns", "lock")
+
+    def __init__(self, session_id: str, memory: Any):
+        self.session_id = session_id
+        self.memory = memory
+        self.last_tools_used: List[str] = []
+        self.last_retrieval_context: List[str] = []
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.turns = 0
+        # Serializes turns within a session so memory reads/writes stay ordered
+        self.lock = asyncio.Lock()
+
+class SessionPool:
+    """
+    LRU + TTL bounded map of session id -> SessionState.
+
+    Each session gets its own memory object from `memory_factory`, so
+    concurrent sessions never share conversation history. Sessions idle
+    longer than `ttl` seconds are dropped on access, and the least recently
+    used session is evicted once `max_sessions` is reached, which keeps
+    per-process memory bounded regardless of how many sessions connect.
+    """
+
+    def __init__(self, memory_factory: Callable[[], Any], max_sessions: int = 1000, ttl: float = 3600):
+        self.memory_factory = memory_factory
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self.hits = 0
+        self.created = 0
+        self.evicted_lru = 0
+        self.evicted_ttl = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expire(self, now: float):
+        """Drop sessions idle past the TTL; oldest are at the front"""
+        while self._sessions:
+            session_id, state = next(iter(self._sessions.items()))
+            if now - state.last_used <= self.ttl:
+                break
+            del self._sessions[session_id]
+            self.evicted_ttl += 1
+
+    def acquire(self, session_id: str) -> SessionState:
+        """Return the state for a session, creating it (and evicting if full) when needed"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+
+            state = self._sessions.get(session_id)
+            if state is not None:
+                self._sessions.move_to_end(session_id)
+                state.last_used = now
+                self.hits += 1
+                return state
+
+            while len(self._sessions) >= self.max_sessions:
+                evicted_id, _ = self._sessions.popitem(last=False)
+                self.evicted_lru += 1
+                logger.debug(f"♻️ Evicted agent session {evicted_id} (pool full)")
+
+            state = SessionState(session_id, self.memory_factory())
+            self._sessions[session_id] = state
+            self.created += 1
+            return state
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        """Look up a session without creating or refreshing it"""
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def discard(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire(time.time())
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "created": self.created,
+                "evicted_lru": self.evicted_lru,
+                "evicted_ttl": self.evicted_ttl
+            }
@@ -0,0 +1,143 @@
+"""
+Vectorized fund-name similarity scoring
+"""
+
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from .fund_index import trigrams
+
+TRIGRAM_BITS = 512
+
+# Popcount of every byte value; numpy 1.x has no bitwise_count
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# Sequential sums of 0.1, matching the float rounding of `bonus += 0.1` in a loop
+_BONUS_STEPS = np.concatenate(([0.0], np.cumsum(np.full(4096, 0.1))))
+
+class NameMatrix:
+    """
+    Candidate names pre-tokenized into NumPy arrays.
+
+    Each name becomes a row of unique token ids (padded with -1) and a
+    trigram bitset, so a query is scored against every candidate with a
+    handful of array operations. Build it once for a catalogue or result
+    list and reuse it across queries.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self.vocab: Dict[str, int] = {}
+
+        rows = []
+        for name in self.names:
+            ids = {self.vocab.setdefault(token, len(self.vocab)) for token in name.lower().split()}
+            rows.append(sorted(ids))
+
+        width = max((len(row) for row in rows), default=0)
+        self.token_ids = np.full((len(rows), max(width, 1)), -1, dtype=np.int32)
+        for i, row in enumerate(rows):
+            self.token_ids[i, :len(row)] = row
+        self.token_counts = np.array([len(row) for row in rows], dtype=np.int32)
+        self.mask = self.token_ids >= 0
+        self.vocab_tokens = np.array(list(self.vocab), dtype=str)
+        self._trigram_bits: Optional[np.ndarray] = None
+
+    @property
+    def trigram_bits(self) -> np.ndarray:
+        """N x (TRIGRAM_BITS / 8) packed trigram bitsets, built on first use"""
+        if self._trigram_bits is None:
+            self._trigram_bits = np.frombuffer(
+                b"".join(trigram_bitset(name).tobytes() for name in self.names), dtype=np.uint8
+            ).reshape(len(self.names), TRIGRAM_BITS // 8)
+        return self._trigram_bits
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _gather(self, per_token: np.ndarray) -> np.ndarray:
+        """Sum a per-vocabulary-token value over each candidate's tokens"""
+        if not len(per_token):
+            return np.zeros(len(self.names), dtype=per_token.dtype)
+        values = per_token[np.where(self.mask, self.token_ids, 0)]
+        return np.where(self.mask, values, 0).sum(axis=1)
+
+def trigram_bitset(text: str) -> np.ndarray:
+    """Hash a name's trigrams into a fixed-width bitset"""
+    mask = 0
+    for gram in trigrams(text):
+        # Stable across processes, unlike hash()
+        mask |= 1 << (int.from_bytes(gram.encode("utf-8"), "little") * 2654435761 % TRIGRAM_BITS)
+    return np.frombuffer(mask.to_bytes(TRIGRAM_BITS // 8, "little"), dtype=np.uint8)
+
+def _as_matrix(candidates: Union[Sequence[str], NameMatrix]) -> NameMatrix:
+    return candidates if isinstance(candidates, NameMatrix) else NameMatrix(candidates)
+
+def batch_similarity(query: str, candidates: Union[Sequence[str], NameMatrix],
+                     mode: str = "compat") -> np.ndarray:
+    """
+    Score one query against N candidate names in a single call.
+
+    Modes:
+        compat:  word Jaccard + 0.1 per (query word, name word) substring pair,
+                 capped at 1.0 - identical to the original per-pair scorer
+        trigram: Jaccard over hashed character-trigram bitsets (typo tolerant)
+    """
+    matrix = _as_matrix(candidates)
+    if not len(matrix):
+        return np.zeros(0, dtype=np.float64)
+
+    if mode == "trigram":
+        query_bits = trigram_bitset(query)
+        inter = _POPCOUNT[matrix.trigram_bits & query_bits].sum(axis=1, dtype=np.int32)
+        union = _POPCOUNT[matrix.trigram_bits | query_bits].sum(axis=1, dtype=np.int32)
+        return np.divide(inter, union, out=np.zeros(len(matrix), dtype=np.float64), where=union > 0)
+
+    if mode != "compat":
+        raise ValueError(f"Unknown similarity mode: {mode}")
+
+    query_words = list(set(query.lower().split()))
+    vocab = matrix.vocab_tokens
+    in_query = np.zeros(len(vocab), dtype=np.int32)
+    pair_counts = np.zeros(len(vocab), dtype=np.int32)
+
+    for word in query_words:
+        token_id = matrix.vocab.get(word)
+        if token_id is not None:
+            in_query[token_id] = 1
+        if len(vocab):
+            # word in token, or token in word
+            contains = np.char.find(vocab, word) >= 0
+            contained = np.char.find(np.full(len(vocab), word), vocab) >= 0
+            pair_counts += contains | contained
+
+    intersection = matrix._gather(in_query)
+    union = len(query_words) + matrix.token_counts - intersection
+    jaccard = np.divide(intersection, union, out=np.zeros(len(matrix), dtype=np.float64), where=union > 0)
+
+    bonus = _BONUS_STEPS[np.minimum(matrix._gather(pair_counts), len(_BONUS_STEPS) - 1)]
+    scores = np.minimum(1.0, jaccard + bonus)
+    scores[union == 0] = 0.0
+    return scores
+
+def batch_word_coverage(query: str, candidates: Union[Sequence[str], NameMatrix]) -> np.ndarray:
+    """Share of the query's distinct words present in each candidate"""
+    matrix = _as_matrix(candidates)
+    query_words = set(query.lower().split())
+    in_query = np.zeros(len(matrix.vocab), dtype=np.int32)
+    for word in query_words:
+        token_id = matrix.vocab.get(word)
+        if token_id is not None:
+            in_query[token_id] = 1
+    return matrix._gather(in_query) / max(len(query_words), 1)
+
+def contains_any(texts: Sequence[str], keywords: Sequence[str]) -> np.ndarray:
+    """Boolean mask of texts containing at least one keyword as a substring"""
+    if not len(texts):
+        return np.zeros(0, dtype=bool)
+    values = np.array(texts, dtype=str)
+    mask = np.zeros(len(values), dtype=bool)
+    for keyword in keywords:
+        mask |= np.char.find(values, keyword) >= 0
+    return mask
@@ -0,0 +1,88 @@
+"""
+Single-flight coalescing of concurrent identical upstream calls
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Dict, Any, Callable, Awaitable, TypeVar
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key (the leader) runs the coroutine; callers that
+    arrive while it is running await the leader's result instead of issuing
+    their own request. Results are shared as-is, so callers should pass
+    immutable values (e.g. raw response bodies) through it.
+
+    In-flight calls are tracked with thread-safe futures, so callers on
+    different event loops (e.g. evaluation scripts with their own loops) are
+    coalesced too. If the leader is cancelled, waiting callers retry and one
+    of them becomes the new leader.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, concurrent.futures.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn() for key, or join the call already in flight for it"""
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = concurrent.futures.Future()
+                    self._calls[key] = future
+                    self.leaders += 1
+                else:
+                    self.coalesced += 1
+
+            if leader:
+                try:
+                    result = await fn()
+                except BaseException as e:
+                    self._forget(key, future)
+                    if isinstance(e, asyncio.CancelledError):
+                        future.cancel()
+                    else:
+                        self.failures += 1
+                        future.set_exception(e)
+                    raise
+                self._forget(key, future)
+                future.set_result(result)
+                return result
+
+            try:
+                # Shield so a cancelled follower does not cancel the shared call
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    logger.debug(f"Single-flight leader cancelled for {key}, retrying")
+                    continue
+                raise
+
+    def _forget(self, key: str, future: concurrent.futures.Future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "leader_calls": self.leaders,
+            "coalesced_calls": self.coalesced,
+            "failed_calls": self.failures,
+            "coalesce_rate": self.coalesced / total if total else 0.0
+        }
@@ -0,0 +1,89 @@
+"""
+Streaming of agent progress and final-answer tokens to API clients
+"""
+
+import asyncio
+import json
+from typing import Dict, Any, Optional
+from uuid import UUID
+
+from langchain_core.agents import AgentAction
+from langchain_core.callbacks import AsyncCallbackHandler
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+class StreamingEventHandler(AsyncCallbackHandler):
+    """
+    Turns LangChain callbacks for one agent run into client events on a queue.
+
+    Events are dicts with a "type":
+        thinking    the LLM started a reasoning step
+        tool_start  the agent called a tool (tool, input)
+        tool_end    the tool returned (tool, preview)
+        token       a chunk of the final answer, streamed as the LLM writes it
+
+    ReAct output is only forwarded once `answer_marker` ("Final Answer:")
+    appears in an LLM step, so thoughts and action syntax never reach the
+    client. With answer_marker=None (tool-calling agents) every content
+    token is forwarded; tool calls arrive as structured chunks, not text.
+    """
+
+    def __init__(self, queue: asyncio.Queue, preview_chars: int = 200,
+                 answer_marker: Optional[str] = FINAL_ANSWER_MARKER):
+        self.queue = queue
+        self.preview_chars = preview_chars
+        self.answer_marker = answer_marker
+        self._buffers: Dict[UUID, str] = {}
+        self._answering: Dict[UUID, bool] = {}
+        self._tools: Dict[UUID, str] = {}
+        self.streamed_answer = False
+
+    async def _emit(self, event: Dict[str, Any]):
+        await self.queue.put(event)
+
+    async def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs):
+        self._buffers[run_id] = ""
+        self._answering[run_id] = self.answer_marker is None
+        await self._emit({"type": "thinking"})
+
+    async def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        await self.on_llm_start(serialized, [], run_id=run_id, **kwargs)
+
+    async def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs):
+        if self._answering.get(run_id):
+            if token:
+                self.streamed_answer = True
+                await self._emit({"type": "token", "text": token})
+            return
+
+        buffer = self._buffers.get(run_id, "") + token
+        self._buffers[run_id] = buffer
+        marker = buffer.find(self.answer_marker)
+        if marker >= 0:
+            self._answering[run_id] = True
+            first = buffer[marker + len(self.answer_marker):].lstrip()
+            if first:
+                self.streamed_answer = True
+                await self._emit({"type": "token", "text": first})
+
+    async def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        self._buffers.pop(run_id, None)
+        self._answering.pop(run_id, None)
+
+    async def on_agent_action(self, action: AgentAction, *, run_id: UUID, **kwargs):
+        await self._emit({"type": "tool_start", "tool": action.tool, "input": str(action.tool_input)[:self.preview_chars]})
+
+    async def on_tool_start(self, serialized, input_str: str, *, run_id: UUID, **kwargs):
+        self._tools[run_id] = (serialized or {}).get("name", "tool")
+
+    async def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs):
+        tool = self._tools.pop(run_id, "tool")
+        await self._emit({"type": "tool_end", "tool": tool, "preview": str(output)[:self.preview_chars]})
+
+    async def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs):
+        tool = self._tools.pop(run_id, "tool")
+        await self._emit({"type": "tool_end", "tool": tool, "error": str(error)[:self.preview_chars]})
+
+def sse_event(event: Dict[str, Any]) -> str:
+    """Format an event as a Server-Sent Events frame"""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event, default=str)}\n\n"
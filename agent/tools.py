@@ -5,12 +5,19 @@ Tool orchestrator for calling different APIs and services
 import asyncio
 import aiohttp
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from urllib.parse import urlencode
 
 from .config import AgentConfig
 from .intent_parser import IntentType
+from .http_client import HTTPClientPool
+from .cache import ResponseCache, make_cache_key
+from .singleflight import SingleFlight
+from .fund_index import FundNameIndex, FundRecord, normalize_name
+from .similarity import NameMatrix, batch_similarity, batch_word_coverage, contains_any
+from .analytics import compute_fund_analytics
+from .nav_store import NavStore, NavSeries, nav_points_from_api, parse_nav_date, slice_series, summarize_series
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,8 +25,181 @@ logger = get_logger(__name__)
 class ToolOrchestrator:
     """Orchestrates calls to different tools (DB API, AMFI, Web Scraper, Moonshot AI)"""
     
-    def __init__(self, config: AgentConfig):
+    def __init__(self, config: AgentConfig, cache: Optional[ResponseCache] = None):
         self.config = config
+        self.http = HTTPClientPool(config)
+        # Any object with get(endpoint, params) / set(endpoint, params, body) can be plugged in
+        self.cache = cache if cache is not None else ResponseCache.from_config(config)
+        self.single_flight = SingleFlight() if config.SINGLE_FLIGHT_ENABLED else None
+        self.fund_index = FundNameIndex() if config.FUND_INDEX_ENABLED else None
+        self.nav_store = NavStore(config.NAV_STORE_DIR, config.NAV_STORE_REFRESH_INTERVAL) if config.NAV_STORE_ENABLED else None
+        self._fund_index_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Open long-lived resources (pooled HTTP session, fund index refresh) - call on server startup"""
+        await self.http.start()
+        if self.fund_index is not None and self._fund_index_task is None:
+            self._fund_index_task = asyncio.create_task(self._fund_index_refresh_loop())
+        logger.info("ToolOrchestrator started")
+    
+    async def close(self):
+        """Release long-lived resources - call on server shutdown"""
+        if self._fund_index_task is not None:
+            self._fund_index_task.cancel()
+            await asyncio.gather(self._fund_index_task, return_exceptions=True)
+            self._fund_index_task = None
+        await self.http.close()
+        if self.cache is not None:
+            self.cache.close()
+        logger.info("ToolOrchestrator closed")
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Runtime metrics for the orchestrator's shared resources"""
+        return {
+            "http_pool": self.http.get_stats(),
+            "response_cache": self.cache.get_stats() if self.cache is not None else None,
+            "single_flight": self.single_flight.get_stats() if self.single_flight is not None else None,
+            "fund_index": self.fund_index.get_stats() if self.fund_index is not None else None,
+            "nav_store": self.nav_store.get_stats() if self.nav_store is not None else None
+        }
+    
+    async def _fund_index_refresh_loop(self):
+        """Keep the local fund index in sync with the catalogue"""
+        while True:
+            try:
+                await self.refresh_fund_index()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Fund index refresh failed: {e}")
+            await asyncio.sleep(self.config.FUND_INDEX_REFRESH_INTERVAL)
+    
+    async def refresh_fund_index(self) -> Dict[str, Any]:
+        """
+        Page through /api/funds/ and apply the snapshot to the local index.
+        
+        Bypasses the response cache so every refresh sees current data; only
+        schemes that were added, changed or removed are re-indexed.
+        """
+        if self.fund_index is None:
+            return {"error": "Fund index disabled"}
+        
+        url = f"{self.config.PRODUCTION_API_BASE}/api/funds/"
+        page_size = self.config.FUND_INDEX_PAGE_SIZE
+        records = []
+        rows_by_isin = {}
+        
+        for page in range(1, self.config.FUND_INDEX_MAX_PAGES + 1):
+            async with self.http.session(url) as session:
+                async with session.get(url, params={"page": page, "limit": page_size},
+                                       headers={"Accept": "application/json"}) as response:
+                    if response.status != 200:
+                        raise RuntimeError(f"Funds API status {response.status} on page {page}")
+                    data = await response.json()
+            
+            rows = data.get("data", []) if isinstance(data, dict) else data
+            new_rows = 0
+            for row in rows or []:
+                record = FundRecord.from_api(row) if isinstance(row, dict) else None
+                if record is not None and record.isin not in rows_by_isin:
+                    rows_by_isin[record.isin] = row
+                    records.append(record)
+                    new_rows += 1
+            
+            # Stop on a short page, or when the API ignores paging and repeats itself
+            if not rows or len(rows) < page_size or new_rows == 0:
+                break
+        
+        if not records:
+            raise RuntimeError("Funds API returned an empty catalogue")
+        
+        diff = self.fund_index.apply_snapshot(records, rows_by_isin)
+        logger.info(f"📇 Fund index refreshed: {diff}")
+        return diff
+    
+    def _search_fund_index(self, fund_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Resolve a fund name from the local index, or None if there is no confident match.
+        
+        A bare AMC name ("hdfc") is contained in hundreds of schemes and scores
+        1.0 against all of them, so a query only skips upstream when it is long
+        enough to name a scheme and isn't just the top match's AMC, or when the
+        top match clearly leads the runner-up.
+        """
+        if self.fund_index is None or not self.fund_index.ready:
+            return None
+        
+        matches = self.fund_index.search(fund_name, limit=self.config.FUND_INDEX_MAX_RESULTS,
+                                         min_score=self.config.FUND_INDEX_MIN_SCORE)
+        if not matches:
+            return None
+        
+        query = normalize_name(fund_name)
+        top_record, top_score = matches[0]
+        lead = top_score - matches[1][1] if len(matches) > 1 else top_score
+        names_scheme = (len(query) >= self.config.FUND_INDEX_MIN_QUERY_LENGTH
+                        and not set(query.split()) <= set(normalize_name(top_record.amc_name).split()))
+        if not names_scheme and lead < self.config.FUND_INDEX_MIN_MARGIN:
+            logger.info(f"📇 Local index ambiguous for '{fund_name}' ({len(matches)} candidates, lead {lead:.2f}); searching upstream")
+            return None
+        
+        self.fund_index.confident_hits += 1
+        logger.info(f"📇 Local index SUCCESS: {len(matches)} candidates for '{fund_name}' (top score {top_score:.2f})")
+        return {
+            "found": True,
+            "results": [FundNameIndex.record_to_result(record, score, self.fund_index.details(record.isin))
+                        for record, score in matches],
+            "confidence": round(matches[0][1], 3),
+            "source": "LOCAL_FUND_INDEX",
+            "search_phase": "local_index"
+        }
+    
+    def match_fund_name(self, fund_name: str, limit: int = 2) -> List[Tuple[FundRecord, float]]:
+        """Best (record, score) matches from the local index, or [] when it isn't loaded"""
+        if self.fund_index is None or not self.fund_index.ready:
+            return []
+        return self.fund_index.search(fund_name, limit=limit, min_score=self.config.FUND_INDEX_MIN_SCORE)
+    
+    async def _get_json(self, endpoint: str, url: str, params: Optional[dict] = None,
+                        headers: Optional[dict] = None, timeout: Optional[float] = None,
+                        use_cache: bool = True):
+        """
+        GET a JSON endpoint through the response cache and single-flight layer.
+        
+        Returns (status, data); data is None for non-200 responses. Only 200
+        bodies are cached, concurrent identical requests share one upstream
+        call, and each caller decodes a fresh copy so results may be mutated.
+        With use_cache=False the cached body is skipped (the fresh one still
+        replaces it).
+        """
+        cache_params = {"url": url, **(params or {})}
+        
+        if self.cache is not None and use_cache:
+            body = self.cache.get(endpoint, cache_params)
+            if body is not None:
+                return 200, json.loads(body)
+        
+        async def fetch():
+            async with self.http.session(url) as session:
+                async with session.get(url, params=params, headers=headers,
+                                       timeout=aiohttp.ClientTimeout(total=timeout or self.config.API_TIMEOUT)) as response:
+                    if response.status != 200:
+                        return response.status, None
+                    body = await response.text()
+            
+            if self.cache is not None:
+                json.loads(body)  # Never cache a body callers cannot decode
+                self.cache.set(endpoint, cache_params, body)
+            return 200, body
+        
+        if self.single_flight is not None:
+            status, body = await self.single_flight.do(make_cache_key(endpoint, cache_params), fetch)
+        else:
+            status, body = await fetch()
+        
+        if status != 200:
+            return status, None
+        return 200, json.loads(body)
     
     async def smart_fund_search(self, fund_name: str) -> Dict[str, Any]:
         """
@@ -37,68 +217,66 @@ class ToolOrchestrator:
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/search"
             params = {"search": fund_name}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
-                async with session.get(url, params=params) as response:
-                    logger.info(f"🔍 Search API Status: {response.status}")
-                    
-                    if response.status == 200:
-                        search_results = await response.json()
-                        logger.info(f"✅ Search returned: {type(search_results)}")
-                        
-                        # Handle different response structures
-                        results_list = search_results
-                        if isinstance(search_results, dict):
-                            results_list = search_results.get('data', search_results.get('results', []))
-                        
-                        if not results_list or len(results_list) == 0:
-                            logger.warning(f"⚠️ No search results found for '{fund_name}'")
-                            return {"found": False, "error": f"No fund found matching '{fund_name}'"}
-                        
-                        # Extract ISIN from first result
-                        first_fund = results_list[0]
-                        isin = first_fund.get('isin')
-                        scheme_name = first_fund.get('scheme_name', fund_name)
-                        
-                        if not isin:
-                            logger.warning(f"⚠️ No ISIN found in search results")
-                            return {"found": True, "results": [first_fund], "source": "search_only"}
-                        
-                        logger.info(f"✅ Found ISIN: {isin} for fund: {scheme_name}")
-                        
-                        # STEP 2: Fetch complete details using ISIN
-                        logger.info(f"📊 Step 2: Fetching complete fund details using ISIN...")
-                        
-                        # Fetch all details in parallel
-                        details_tasks = [
-                            self.get_complete_fund_data(isin),      # Complete data
-                            self.get_fund_factsheet(isin),          # Factsheet
-                            self.get_fund_returns(isin),            # Returns
-                            self.get_fund_holdings(isin),           # Holdings
-                            self.get_fund_nav_history(isin)         # NAV history
-                        ]
-                        
-                        details_results = await asyncio.gather(*details_tasks, return_exceptions=True)
-                        
-                        # Combine all results
-                        combined_data = {
-                            "found": True,
-                            "scheme_name": scheme_name,
-                            "isin": isin,
-                            "search_method": "smart_isin_lookup",
-                            "complete_data": details_results[0] if not isinstance(details_results[0], Exception) else None,
-                            "factsheet": details_results[1] if not isinstance(details_results[1], Exception) else None,
-                            "returns": details_results[2] if not isinstance(details_results[2], Exception) else None,
-                            "holdings": details_results[3] if not isinstance(details_results[3], Exception) else None,
-                            "nav_history": details_results[4] if not isinstance(details_results[4], Exception) else None,
-                            "source": "isin_based_lookup"
-                        }
-                        
-                        logger.info(f"✅ SMART SEARCH SUCCESS: Retrieved complete details for {scheme_name}")
-                        return combined_data
-                    
-                    else:
-                        logger.error(f"❌ Search API returned status: {response.status}")
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, search_results = await self._get_json("funds_search", url, params=params, timeout=30)
+            logger.info(f"🔍 Search API Status: {status}")
+            
+            if status == 200:
+                logger.info(f"✅ Search returned: {type(search_results)}")
+                
+                # Handle different response structures
+                results_list = search_results
+                if isinstance(search_results, dict):
+                    results_list = search_results.get('data', search_results.get('results', []))
+                
+                if not results_list or len(results_list) == 0:
+                    logger.warning(f"⚠️ No search results found for '{fund_name}'")
+                    return {"found": False, "error": f"No fund found matching '{fund_name}'"}
+                
+                # Extract ISIN from first result
+                first_fund = results_list[0]
+                isin = first_fund.get('isin')
+                scheme_name = first_fund.get('scheme_name', fund_name)
+                
+                if not isin:
+                    logger.warning(f"⚠️ No ISIN found in search results")
+                    return {"found": True, "results": [first_fund], "source": "search_only"}
+                
+                logger.info(f"✅ Found ISIN: {isin} for fund: {scheme_name}")
+                
+                # STEP 2: Fetch complete details using ISIN
+                logger.info(f"📊 Step 2: Fetching complete fund details using ISIN...")
+                
+                # Fetch all details in parallel
+                details_tasks = [
+                    self.get_complete_fund_data(isin),      # Complete data
+                    self.get_fund_factsheet(isin),          # Factsheet
+                    self.get_fund_returns(isin),            # Returns
+                    self.get_fund_holdings(isin),           # Holdings
+                    self.get_fund_nav_history(isin)         # NAV history
+                ]
+                
+                details_results = await asyncio.gather(*details_tasks, return_exceptions=True)
+                
+                # Combine all results
+                combined_data = {
+                    "found": True,
+                    "scheme_name": scheme_name,
+                    "isin": isin,
+                    "search_method": "smart_isin_lookup",
+                    "complete_data": details_results[0] if not isinstance(details_results[0], Exception) else None,
+                    "factsheet": details_results[1] if not isinstance(details_results[1], Exception) else None,
+                    "returns": details_results[2] if not isinstance(details_results[2], Exception) else None,
+                    "holdings": details_results[3] if not isinstance(details_results[3], Exception) else None,
+                    "nav_history": details_results[4] if not isinstance(details_results[4], Exception) else None,
+                    "source": "isin_based_lookup"
+                }
+                
+                logger.info(f"✅ SMART SEARCH SUCCESS: Retrieved complete details for {scheme_name}")
+                return combined_data
+            
+            else:
+                logger.error(f"❌ Search API returned status: {status}")
+                return {"found": False, "error": f"API returned status {status}"}
         
         except Exception as e:
             logger.error(f"❌ Error in smart_fund_search: {e}")
@@ -106,7 +284,9 @@ class ToolOrchestrator:
     
     async def call_db_api(self, fund_name: Optional[str] = None, 
                          metric: Optional[str] = None, 
-                         deep_search: bool = True) -> Dict[str, Any]:
+                         deep_search: bool = True,
+                         search_mode: Optional[str] = None,
+                         latency_budget: Optional[float] = None) -> Dict[str, Any]:
         """
         Deep, comprehensive database search - thorough analysis across all endpoints
         
@@ -114,48 +294,121 @@ class ToolOrchestrator:
             fund_name: Name of the fund to search for
             metric: Specific metric to retrieve  
             deep_search: If True, performs exhaustive search across all APIs
+            search_mode: "sequential", "hedged" or "concurrent" (defaults to DB_SEARCH_MODE)
+            latency_budget: Seconds to spend before returning the best result so far
+                (defaults to DB_SEARCH_LATENCY_BUDGET; 0 or None means no budget)
         """
         
         if not fund_name:
             return {"found": False, "error": "No fund name provided", "confidence": 0.0}
         
-        logger.info(f"Starting DEEP DB search for: '{fund_name}' with metric: {metric}")
+        mode = (search_mode or self.config.DB_SEARCH_MODE).lower()
+        if latency_budget is None:
+            latency_budget = self.config.DB_SEARCH_LATENCY_BUDGET or None
         
-        # Phase 1: Direct exact match search across all APIs
-        logger.info("Phase 1: Exact match search across all endpoints")
-        exact_results = await self._deep_exact_search(fund_name, metric)
+        logger.info(f"Starting DEEP DB search for: '{fund_name}' with metric: {metric} (mode={mode}, budget={latency_budget})")
         
-        if exact_results.get("found") and exact_results.get("results"):
-            logger.info(f"Phase 1 SUCCESS: Found {len(exact_results.get('results', []))} exact matches")
-            return exact_results
-            
-        # Phase 2: Intelligent keyword extraction and search
-        logger.info("Phase 2: Intelligent keyword extraction and multi-strategy search")
-        keyword_results = await self._intelligent_keyword_search(fund_name, metric)
+        # Resolve from the local catalogue index first; go upstream only without a confident match
+        index_result = self._search_fund_index(fund_name)
+        if index_result is not None:
+            return index_result
         
-        if keyword_results.get("found") and keyword_results.get("results"):
-            logger.info(f"Phase 2 SUCCESS: Found {len(keyword_results.get('results', []))} keyword matches")
-            return keyword_results
-            
-        # Phase 3: Fuzzy matching and partial searches
-        logger.info("Phase 3: Fuzzy matching and partial search strategies")
-        fuzzy_results = await self._fuzzy_match_search(fund_name, metric)
+        # Phases in priority order - a hit from an earlier phase always wins
+        phases = [
+            ("Phase 1: Exact match search across all endpoints", "exact", self._deep_exact_search),
+            ("Phase 2: Intelligent keyword extraction and multi-strategy search", "keyword", self._intelligent_keyword_search),
+            ("Phase 3: Fuzzy matching and partial search strategies", "fuzzy", self._fuzzy_match_search),
+            ("Phase 4: AMC-level and category-based search", "AMC", self._amc_level_search),
+        ]
         
-        if fuzzy_results.get("found") and fuzzy_results.get("results"):
-            logger.info(f"Phase 3 SUCCESS: Found {len(fuzzy_results.get('results', []))} fuzzy matches")
-            return fuzzy_results
-            
-        # Phase 4: AMC-level search (search by fund house)
-        logger.info("Phase 4: AMC-level and category-based search")
-        amc_results = await self._amc_level_search(fund_name, metric)
+        if mode == "concurrent":
+            stagger = 0.0
+        elif mode == "hedged":
+            stagger = self.config.DB_SEARCH_HEDGE_DELAY
+        else:
+            stagger = None  # sequential: next phase starts only after a miss
         
-        if amc_results.get("found") and amc_results.get("results"):
-            logger.info(f"Phase 4 SUCCESS: Found {len(amc_results.get('results', []))} AMC matches")
-            return amc_results
+        result = await self._run_search_phases(phases, fund_name, metric, stagger, latency_budget)
+        if result is not None:
+            return result
             
         logger.warning(f"All 4 phases completed - no results found for: {fund_name}")
         return {"found": False, "error": f"No funds found after exhaustive search for '{fund_name}'", "confidence": 0.0}
     
+    async def _run_search_phases(self, phases: List[tuple], fund_name: str, metric: Optional[str],
+                                 stagger: Optional[float], latency_budget: Optional[float]) -> Optional[Dict[str, Any]]:
+        """
+        Run prioritized search phases, returning the first hit that no
+        higher-priority phase can still beat.
+        
+        Phase i starts after i * stagger seconds, or as soon as every earlier
+        phase has missed (stagger=None gives the classic sequential search).
+        Once a winner is known, or the latency budget runs out, the remaining
+        in-flight phases are cancelled. Returns None if every phase missed.
+        """
+        loop = asyncio.get_running_loop()
+        released = [asyncio.Event() for _ in phases]
+        timers = []
+        released[0].set()
+        if stagger is not None:
+            for i in range(1, len(phases)):
+                timers.append(loop.call_later(i * stagger, released[i].set))
+        
+        async def run_phase(i: int):
+            description, _, phase_fn = phases[i]
+            await released[i].wait()
+            logger.info(description)
+            return await phase_fn(fund_name, metric)
+        
+        tasks = [asyncio.create_task(run_phase(i)) for i in range(len(phases))]
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(phases)
+        deadline = loop.time() + latency_budget if latency_budget else None
+        
+        def is_hit(outcome: Optional[Dict[str, Any]]) -> bool:
+            return bool(outcome and outcome.get("found") and outcome.get("results"))
+        
+        try:
+            pending = set(tasks)
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                
+                if not done:
+                    # Budget exhausted: fall back to the best finished hit, if any
+                    for i, outcome in enumerate(outcomes):
+                        if is_hit(outcome):
+                            logger.warning(f"Latency budget of {latency_budget}s exhausted - returning phase {i + 1} result")
+                            return dict(outcome, budget_exhausted=True)
+                    logger.warning(f"Latency budget of {latency_budget}s exhausted with no results for: {fund_name}")
+                    return {"found": False, "error": f"Search latency budget of {latency_budget}s exhausted for '{fund_name}'",
+                            "confidence": 0.0, "budget_exhausted": True}
+                
+                for task in done:
+                    i = tasks.index(task)
+                    try:
+                        outcomes[i] = task.result()
+                    except Exception as e:
+                        logger.error(f"Search phase {i + 1} failed: {e}")
+                        outcomes[i] = {"found": False, "error": str(e), "confidence": 0.0}
+                
+                # Walk phases in priority order until one is still running
+                for i, task in enumerate(tasks):
+                    if not task.done():
+                        released[i].set()  # every earlier phase missed - start it now
+                        break
+                    if is_hit(outcomes[i]):
+                        logger.info(f"Phase {i + 1} SUCCESS: Found {len(outcomes[i].get('results', []))} {phases[i][1]} matches")
+                        return outcomes[i]
+            
+            return None
+        finally:
+            for timer in timers:
+                timer.cancel()
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     def _normalize_fund_data(self, fund: dict, source: str) -> dict:
         """Normalize fund data from different API sources"""
         normalized = {}
@@ -343,17 +596,11 @@ class ToolOrchestrator:
         
         # If specific fund houses mentioned, filter by them
         if target_amcs:
-            filtered_results = []
-            for fund in results:
-                fund_amc = fund.get('amc_name', '').lower()
-                fund_name = fund.get('scheme_name', '').lower()
-                
-                # Check if this fund belongs to requested AMCs
-                for target_amc in target_amcs:
-                    amc_keywords_list = amc_keywords[target_amc]
-                    if any(keyword in fund_amc for keyword in amc_keywords_list):
-                        filtered_results.append(fund)
-                        break
+            # Check every fund's AMC against all requested AMC keywords in one pass
+            target_keywords = [keyword for target_amc in target_amcs for keyword in amc_keywords[target_amc]]
+            fund_amcs = [(fund.get('amc_name') or '').lower() for fund in results]
+            matches = contains_any(fund_amcs, target_keywords)
+            filtered_results = [fund for fund, matched in zip(results, matches) if matched]
             
             logger.info(f"Filtered from {len(results)} to {len(filtered_results)} results for AMCs: {target_amcs}")
             return filtered_results
@@ -374,127 +621,125 @@ class ToolOrchestrator:
             logger.info(f"Searching funds API with URL: {url}, params: {params}")
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, params=params, headers=headers) as response:
-                    logger.info(f"🔍 API Response Status: {response.status}")
+            status, api_response = await self._get_json("funds_search", url, params=params, headers=headers, timeout=self.config.API_TIMEOUT)
+            logger.info(f"🔍 API Response Status: {status}")
+            
+            if status == 200:
+                logger.info(f"API returned response type: {type(api_response)}")
+                logger.info(f"API response length: {len(api_response) if isinstance(api_response, (list, dict)) else 'N/A'}")
+                
+                # Handle the API response structure - it may have 'data' wrapper
+                data = api_response
+                if isinstance(api_response, dict):
+                    if 'data' in api_response:
+                        data = api_response['data']
+                        logger.info(f"Found 'data' wrapper with {len(data) if isinstance(data, list) else 'non-list'} items")
+                    else:
+                        logger.info(f"API response keys: {list(api_response.keys())}")
+                        logger.warning(f"⚠️ Raw API Response (first 500 chars): {str(api_response)[:500]}")
+                
+                # Debug: log first result structure
+                if data and len(data) > 0:
+                    first_item = data[0] if isinstance(data, list) else data
+                    logger.info(f"First data item keys: {list(first_item.keys()) if isinstance(first_item, dict) else 'not dict'}")
+                    logger.info(f"First data item scheme_name: {first_item.get('scheme_name', 'N/A') if isinstance(first_item, dict) else 'N/A'}")
+                
+                if data and len(data) > 0:
+                    # Filter results to ensure they match the search term
+                    filtered_results = []
+                    search_terms = fund_name.lower().split()
                     
-                    if response.status == 200:
-                        api_response = await response.json()
-                        logger.info(f"API returned response type: {type(api_response)}")
-                        logger.info(f"API response length: {len(api_response) if isinstance(api_response, (list, dict)) else 'N/A'}")
-                        
-                        # Handle the API response structure - it may have 'data' wrapper
-                        data = api_response
-                        if isinstance(api_response, dict):
-                            if 'data' in api_response:
-                                data = api_response['data']
-                                logger.info(f"Found 'data' wrapper with {len(data) if isinstance(data, list) else 'non-list'} items")
-                            else:
-                                logger.info(f"API response keys: {list(api_response.keys())}")
-                                logger.warning(f"⚠️ Raw API Response (first 500 chars): {str(api_response)[:500]}")
-                        
-                        # Debug: log first result structure
-                        if data and len(data) > 0:
-                            first_item = data[0] if isinstance(data, list) else data
-                            logger.info(f"First data item keys: {list(first_item.keys()) if isinstance(first_item, dict) else 'not dict'}")
-                            logger.info(f"First data item scheme_name: {first_item.get('scheme_name', 'N/A') if isinstance(first_item, dict) else 'N/A'}")
-                        
-                        if data and len(data) > 0:
-                            # Filter results to ensure they match the search term
-                            filtered_results = []
-                            search_terms = fund_name.lower().split()
+                    logger.info(f"Filtering {len(data)} results for search terms: {search_terms}")
+                    
+                    for fund in data:
+                        if isinstance(fund, dict):
+                            scheme_name = fund.get('scheme_name', '').lower()
+                            amc_name = fund.get('amc_name', '').lower()
                             
-                            logger.info(f"Filtering {len(data)} results for search terms: {search_terms}")
+                            # More strict matching - for Baroda BNP Paribas, require all key terms
+                            matches = False
                             
-                            for fund in data:
-                                if isinstance(fund, dict):
-                                    scheme_name = fund.get('scheme_name', '').lower()
-                                    amc_name = fund.get('amc_name', '').lower()
-                                    
-                                    # More strict matching - for Baroda BNP Paribas, require all key terms
-                                    matches = False
-                                    
-                                    # Special case for Baroda BNP Paribas
-                                    if 'baroda' in search_terms and 'bnp' in search_terms:
-                                        if 'baroda' in scheme_name and 'bnp' in scheme_name:
-                                            matches = True
-                                        elif 'baroda' in amc_name and 'bnp' in amc_name:
+                            # Special case for Baroda BNP Paribas
+                            if 'baroda' in search_terms and 'bnp' in search_terms:
+                                if 'baroda' in scheme_name and 'bnp' in scheme_name:
+                                    matches = True
+                                elif 'baroda' in amc_name and 'bnp' in amc_name:
+                                    matches = True
+                            else:
+                                # General matching - search term must be in scheme_name or AMC name
+                                for term in search_terms:
+                                    if len(term) >= 3:  # Only check terms with 3+ characters
+                                        if term in scheme_name or term in amc_name:
                                             matches = True
-                                    else:
-                                        # General matching - search term must be in scheme_name or AMC name
-                                        for term in search_terms:
-                                            if len(term) >= 3:  # Only check terms with 3+ characters
-                                                if term in scheme_name or term in amc_name:
-                                                    matches = True
-                                                    break
-                                    
-                                    if matches:
-                                        filtered_results.append(fund)
-                                        logger.info(f"Matched fund: {fund.get('scheme_name', 'N/A')} from {fund.get('amc_name', 'N/A')}")
+                                            break
                             
-                            if filtered_results:
-                                logger.info(f"Found {len(filtered_results)} matching funds after filtering")
-                                # Safely limit results
-                                limited_results = []
-                                try:
-                                    if isinstance(filtered_results, list):
-                                        limited_results = filtered_results[:5]  # Limit to top 5 matches
-                                    else:
-                                        limited_results = [filtered_results]
-                                except (TypeError, AttributeError) as e:
-                                    logger.error(f"Error slicing filtered_results: {e}")
-                                    limited_results = [filtered_results] if filtered_results else []
-                                
-                                return {
-                                    "found": True,
-                                    "results": limited_results,
-                                    "source": "funds_api",
-                                    "confidence": 0.9,
-                                    "search_term": fund_name
-                                }
-                            else:
-                                logger.warning(f"No matching funds found for '{fund_name}' in {len(data)} results")
-                                # Check what funds were actually returned - ensure data is a list
-                                sample_data = []
-                                try:
-                                    if isinstance(data, list):
-                                        sample_data = data[:3]
-                                    elif data:
-                                        sample_data = [data]
-                                except (TypeError, AttributeError) as e:
-                                    logger.error(f"Error creating sample_data: {e}")
-                                    sample_data = []
-                                
-                                sample_funds = []
-                                try:
-                                    for f in sample_data:
-                                        if isinstance(f, dict):
-                                            name = f.get('scheme_name', 'N/A')
-                                            amc = f.get('amc_name', 'N/A')
-                                            sample_funds.append(f"{name} ({amc})")
-                                except Exception as e:
-                                    logger.error(f"Error processing sample funds: {e}")
-                                    sample_funds = ["Error processing sample data"]
-                                
-                                logger.info(f"Sample of returned funds: {sample_funds}")
-                                
-                                return {
-                                    "found": False,
-                                    "error": f"No funds matching '{fund_name}' found in database. API returned funds from other AMCs instead.",
-                                    "source": "funds_api",
-                                    "confidence": 0.0,
-                                    "total_unfiltered_results": len(data) if isinstance(data, list) else 1,
-                                    "sample_results": sample_funds
-                                }
-                        else:
-                            return {
-                                "found": False,
-                                "error": "No data returned from API",
-                                "source": "funds_api",
-                                "confidence": 0.0
-                            }
+                            if matches:
+                                filtered_results.append(fund)
+                                logger.info(f"Matched fund: {fund.get('scheme_name', 'N/A')} from {fund.get('amc_name', 'N/A')}")
                     
-                    return {"found": False, "error": f"Funds API status {response.status}", "confidence": 0.0}
+                    if filtered_results:
+                        logger.info(f"Found {len(filtered_results)} matching funds after filtering")
+                        # Safely limit results
+                        limited_results = []
+                        try:
+                            if isinstance(filtered_results, list):
+                                limited_results = filtered_results[:5]  # Limit to top 5 matches
+                            else:
+                                limited_results = [filtered_results]
+                        except (TypeError, AttributeError) as e:
+                            logger.error(f"Error slicing filtered_results: {e}")
+                            limited_results = [filtered_results] if filtered_results else []
+                        
+                        return {
+                            "found": True,
+                            "results": limited_results,
+                            "source": "funds_api",
+                            "confidence": 0.9,
+                            "search_term": fund_name
+                        }
+                    else:
+                        logger.warning(f"No matching funds found for '{fund_name}' in {len(data)} results")
+                        # Check what funds were actually returned - ensure data is a list
+                        sample_data = []
+                        try:
+                            if isinstance(data, list):
+                                sample_data = data[:3]
+                            elif data:
+                                sample_data = [data]
+                        except (TypeError, AttributeError) as e:
+                            logger.error(f"Error creating sample_data: {e}")
+                            sample_data = []
+                        
+                        sample_funds = []
+                        try:
+                            for f in sample_data:
+                                if isinstance(f, dict):
+                                    name = f.get('scheme_name', 'N/A')
+                                    amc = f.get('amc_name', 'N/A')
+                                    sample_funds.append(f"{name} ({amc})")
+                        except Exception as e:
+                            logger.error(f"Error processing sample funds: {e}")
+                            sample_funds = ["Error processing sample data"]
+                        
+                        logger.info(f"Sample of returned funds: {sample_funds}")
+                        
+                        return {
+                            "found": False,
+                            "error": f"No funds matching '{fund_name}' found in database. API returned funds from other AMCs instead.",
+                            "source": "funds_api",
+                            "confidence": 0.0,
+                            "total_unfiltered_results": len(data) if isinstance(data, list) else 1,
+                            "sample_results": sample_funds
+                        }
+                else:
+                    return {
+                        "found": False,
+                        "error": "No data returned from API",
+                        "source": "funds_api",
+                        "confidence": 0.0
+                    }
+            
+            return {"found": False, "error": f"Funds API status {status}", "confidence": 0.0}
                         
         except Exception as e:
             error_msg = str(e)
@@ -519,20 +764,18 @@ class ToolOrchestrator:
             params = {"scheme_name": scheme_name, "active_only": "true"}  # Fix: Use string instead of boolean
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, params=params, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if isinstance(data, dict) and "schemes" in data and data["schemes"]:
-                            return {
-                                "found": True,
-                                "results": data["schemes"],
-                                "confidence": 0.95,
-                                "source": "bse_schemes_api",
-                                "pagination": data.get("pagination", {})
-                            }
-                    
-                    return {"found": False, "error": f"BSE API status {response.status}", "confidence": 0.0}
+            status, data = await self._get_json("bse_schemes", url, params=params, headers=headers, timeout=self.config.API_TIMEOUT)
+            if status == 200:
+                if isinstance(data, dict) and "schemes" in data and data["schemes"]:
+                    return {
+                        "found": True,
+                        "results": data["schemes"],
+                        "confidence": 0.95,
+                        "source": "bse_schemes_api",
+                        "pagination": data.get("pagination", {})
+                    }
+            
+            return {"found": False, "error": f"BSE API status {status}", "confidence": 0.0}
                         
         except Exception as e:
             logger.error(f"BSE schemes API error: {str(e)}")
@@ -554,17 +797,15 @@ class ToolOrchestrator:
                     url = f"{self.config.PRODUCTION_API_BASE}/api/funds/"
                     headers = {"Accept": "application/json"}
                     
-                    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                        async with session.get(url, params=params, headers=headers) as response:
-                            if response.status == 200:
-                                data = await response.json()
-                                if data and len(data) > 0:
-                                    return {
-                                        "found": True,
-                                        "results": data,
-                                        "confidence": 0.88,
-                                        "source": f"funds_api_pattern_{list(params.keys())[0]}"
-                                    }
+                    status, data = await self._get_json("funds_list", url, params=params, headers=headers, timeout=self.config.API_TIMEOUT)
+                    if status == 200:
+                        if data and len(data) > 0:
+                            return {
+                                "found": True,
+                                "results": data,
+                                "confidence": 0.88,
+                                "source": f"funds_api_pattern_{list(params.keys())[0]}"
+                            }
                 except Exception:
                     continue  # Try next pattern
             
@@ -666,9 +907,9 @@ class ToolOrchestrator:
             }
             
             # First attempt with full payload
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.WEB_SCRAPE_TIMEOUT)) as session:
+            async with self.http.session("https://api.tavily.com/search") as session:
                 # Try the original payload first
-                async with session.post("https://api.tavily.com/search", headers=headers, json=payload) as response:
+                async with session.post("https://api.tavily.com/search", headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=self.config.WEB_SCRAPE_TIMEOUT)) as response:
                     logger.info(f"Tavily API response status (full payload): {response.status}")
                     
                     if response.status == 200:
@@ -698,7 +939,7 @@ class ToolOrchestrator:
                     # If full payload fails, try basic payload
                     elif response.status == 401:
                         logger.warning("Full payload failed with 401, trying basic payload...")
-                        async with session.post("https://api.tavily.com/search", headers=headers, json=basic_payload) as basic_response:
+                        async with session.post("https://api.tavily.com/search", headers=headers, json=basic_payload, timeout=aiohttp.ClientTimeout(total=self.config.WEB_SCRAPE_TIMEOUT)) as basic_response:
                             logger.info(f"Tavily API response status (basic payload): {basic_response.status}")
                             
                             if basic_response.status == 200:
@@ -911,12 +1152,10 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}"
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"found": True, "results": data, "source": "funds_by_isin"}
-                    return {"found": False, "error": f"Status {response.status}"}
+            status, data = await self._get_json("fund_details", url, headers=headers, timeout=self.config.API_TIMEOUT)
+            if status == 200:
+                return {"found": True, "results": data, "source": "funds_by_isin"}
+            return {"found": False, "error": f"Status {status}"}
         except Exception as e:
             return {"found": False, "error": str(e)}
     
@@ -926,12 +1165,10 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/complete"
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"found": True, "results": data, "source": "complete_fund_data"}
-                    return {"found": False, "error": f"Status {response.status}"}
+            status, data = await self._get_json("complete", url, headers=headers, timeout=self.config.API_TIMEOUT)
+            if status == 200:
+                return {"found": True, "results": data, "source": "complete_fund_data"}
+            return {"found": False, "error": f"Status {status}"}
         except Exception as e:
             return {"found": False, "error": str(e)}
     
@@ -941,12 +1178,10 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/factsheet"
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"found": True, "results": data, "source": "factsheet"}
-                    return {"found": False, "error": f"Status {response.status}"}
+            status, data = await self._get_json("factsheet", url, headers=headers, timeout=self.config.API_TIMEOUT)
+            if status == 200:
+                return {"found": True, "results": data, "source": "factsheet"}
+            return {"found": False, "error": f"Status {status}"}
         except Exception as e:
             return {"found": False, "error": str(e)}
     
@@ -956,12 +1191,10 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/returns"
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"found": True, "results": data, "source": "returns_data"}
-                    return {"found": False, "error": f"Status {response.status}"}
+            status, data = await self._get_json("returns", url, headers=headers, timeout=self.config.API_TIMEOUT)
+            if status == 200:
+                return {"found": True, "results": data, "source": "returns_data"}
+            return {"found": False, "error": f"Status {status}"}
         except Exception as e:
             return {"found": False, "error": str(e)}
     
@@ -971,27 +1204,24 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/holdings"
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"found": True, "results": data, "source": "holdings_data"}
-                    return {"found": False, "error": f"Status {response.status}"}
+            status, data = await self._get_json("holdings", url, headers=headers, timeout=self.config.API_TIMEOUT)
+            if status == 200:
+                return {"found": True, "results": data, "source": "holdings_data"}
+            return {"found": False, "error": f"Status {status}"}
         except Exception as e:
             return {"found": False, "error": str(e)}
     
-    async def _get_fund_nav(self, isin: str) -> Dict[str, Any]:
-        """Get fund NAV history from /api/funds/{isin}/nav"""
+    async def _get_fund_nav(self, isin: str, fresh: bool = False) -> Dict[str, Any]:
+        """Get fund NAV history from /api/funds/{isin}/nav (fresh=True bypasses the response cache)"""
         try:
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/nav"
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"found": True, "results": data, "source": "nav_history"}
-                    return {"found": False, "error": f"Status {response.status}"}
+            status, data = await self._get_json("nav", url, headers=headers, timeout=self.config.API_TIMEOUT,
+                                                use_cache=not fresh)
+            if status == 200:
+                return {"found": True, "results": data, "source": "nav_history"}
+            return {"found": False, "error": f"Status {status}"}
         except Exception as e:
             return {"found": False, "error": str(e)}
     
@@ -1001,12 +1231,10 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/bse-schemes/by-isin/{isin}"
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {"found": True, "results": data, "source": "bse_by_isin"}
-                    return {"found": False, "error": f"Status {response.status}"}
+            status, data = await self._get_json("bse_scheme", url, headers=headers, timeout=self.config.API_TIMEOUT)
+            if status == 200:
+                return {"found": True, "results": data, "source": "bse_by_isin"}
+            return {"found": False, "error": f"Status {status}"}
         except Exception as e:
             return {"found": False, "error": str(e)}
 
@@ -1033,44 +1261,42 @@ This helps me fetch the latest data from official sources."""
             
             headers = {"Accept": "application/json"}
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                async with session.get(url, params=params, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # Check if we have schemes data
-                        if isinstance(data, dict) and "schemes" in data:
-                            schemes = data["schemes"]
-                            if schemes and len(schemes) > 0:
-                                return {
-                                    "found": True,
-                                    "results": schemes,
-                                    "confidence": 0.95,  # Very high confidence for BSE data
-                                    "source": "BSE_SCHEMES_API",
-                                    "retrieved_at": datetime.now().isoformat(),
-                                    "pagination": data.get("pagination", {})
-                                }
-                            else:
-                                return {
-                                    "found": False,
-                                    "error": "No schemes found in BSE API",
-                                    "confidence": 0.0
-                                }
-                        else:
-                            # Single scheme result
-                            return {
-                                "found": True,
-                                "results": [data] if isinstance(data, dict) else data,
-                                "confidence": 0.95,
-                                "source": "BSE_SCHEMES_API",
-                                "retrieved_at": datetime.now().isoformat()
-                            }
+            status, data = await self._get_json("bse_schemes", url, params=params, headers=headers, timeout=self.config.API_TIMEOUT)
+            if status == 200:
+                
+                # Check if we have schemes data
+                if isinstance(data, dict) and "schemes" in data:
+                    schemes = data["schemes"]
+                    if schemes and len(schemes) > 0:
+                        return {
+                            "found": True,
+                            "results": schemes,
+                            "confidence": 0.95,  # Very high confidence for BSE data
+                            "source": "BSE_SCHEMES_API",
+                            "retrieved_at": datetime.now().isoformat(),
+                            "pagination": data.get("pagination", {})
+                        }
                     else:
                         return {
                             "found": False,
-                            "error": f"BSE API returned status {response.status}",
+                            "error": "No schemes found in BSE API",
                             "confidence": 0.0
                         }
+                else:
+                    # Single scheme result
+                    return {
+                        "found": True,
+                        "results": [data] if isinstance(data, dict) else data,
+                        "confidence": 0.95,
+                        "source": "BSE_SCHEMES_API",
+                        "retrieved_at": datetime.now().isoformat()
+                    }
+            else:
+                return {
+                    "found": False,
+                    "error": f"BSE API returned status {status}",
+                    "confidence": 0.0
+                }
                         
         except Exception as e:
             logger.error(f"BSE schemes API error: {str(e)}")
@@ -1129,14 +1355,15 @@ This helps me fetch the latest data from official sources."""
         
         combined_results = []
         
-        # Search with each significant keyword
-        for keyword in keywords:
-            if len(keyword) > 2:  # Skip very short keywords
-                logger.info(f"Searching with keyword: {keyword}")
-                keyword_result = await self._search_with_keyword(keyword, metric)
-                
-                if keyword_result.get("found") and keyword_result.get("results"):
-                    combined_results.extend(keyword_result.get("results", []))
+        # Search with each significant keyword concurrently (bounded by the HTTP limiter)
+        search_keywords = [keyword for keyword in keywords if len(keyword) > 2]  # Skip very short keywords
+        logger.info(f"Searching with keywords: {search_keywords}")
+        keyword_results = await asyncio.gather(*(self._search_with_keyword(keyword, metric) for keyword in search_keywords))
+        
+        # Merge in keyword order so scoring matches the sequential search
+        for keyword_result in keyword_results:
+            if keyword_result.get("found") and keyword_result.get("results"):
+                combined_results.extend(keyword_result.get("results", []))
                     
         if combined_results:
             # Score results based on relevance to original query
@@ -1182,26 +1409,29 @@ This helps me fetch the latest data from official sources."""
         
         logger.info(f"Fuzzy search variations: {search_variations}")
         
-        for variation in search_variations:
-            try:
-                logger.info(f"Fuzzy searching with variation: {variation}")
-                result = await self._search_single_api("funds", {"scheme_name": variation})
-                
-                if result.get("found") and result.get("results"):
-                    # Score based on similarity to original query
-                    scored_results = []
-                    for fund in result.get("results", []):
-                        similarity_score = self._calculate_fuzzy_similarity(fund_name.lower(), fund.get("scheme_name", "").lower())
-                        if similarity_score > 0.3:  # Minimum similarity threshold
-                            fund["fuzzy_score"] = similarity_score
-                            fund["search_variation"] = variation
-                            scored_results.append(fund)
-                    
-                    all_fuzzy_results.extend(scored_results)
-                    
-            except Exception as e:
-                logger.error(f"Error in fuzzy search with {variation}: {e}")
+        variation_results = await asyncio.gather(
+            *(self._search_single_api("funds", {"scheme_name": variation}) for variation in search_variations),
+            return_exceptions=True
+        )
+        
+        # Merge in variation order so scoring matches the sequential search
+        candidates = []
+        for variation, result in zip(search_variations, variation_results):
+            if isinstance(result, Exception):
+                logger.error(f"Error in fuzzy search with {variation}: {result}")
                 continue
+            if result.get("found") and result.get("results"):
+                candidates.extend((variation, fund) for fund in result.get("results", []))
+        
+        if candidates:
+            # Score every variation's results against the original query with one matrix
+            matrix = NameMatrix([fund.get("scheme_name") or "" for _, fund in candidates])
+            similarity_scores = batch_similarity(fund_name, matrix)
+            for (variation, fund), similarity_score in zip(candidates, similarity_scores.tolist()):
+                if similarity_score > 0.3:  # Minimum similarity threshold
+                    fund["fuzzy_score"] = similarity_score
+                    fund["search_variation"] = variation
+                    all_fuzzy_results.append(fund)
         
         if all_fuzzy_results:
             # Sort by fuzzy score
@@ -1218,37 +1448,6 @@ This helps me fetch the latest data from official sources."""
             
         return {"found": False, "error": "No fuzzy matches found", "confidence": 0.0}
 
-    def _calculate_fuzzy_similarity(self, query: str, fund_name: str) -> float:
-        """
-        Calculate fuzzy similarity between query and fund name
-        """
-        try:
-            # Simple similarity calculation
-            query_words = set(query.lower().split())
-            fund_words = set(fund_name.lower().split())
-            
-            # Calculate word overlap
-            intersection = len(query_words & fund_words)
-            union = len(query_words | fund_words)
-            
-            if union == 0:
-                return 0.0
-                
-            jaccard_similarity = intersection / union
-            
-            # Bonus for substring matches
-            substring_bonus = 0.0
-            for q_word in query_words:
-                for f_word in fund_words:
-                    if q_word in f_word or f_word in q_word:
-                        substring_bonus += 0.1
-            
-            return min(1.0, jaccard_similarity + substring_bonus)
-            
-        except Exception as e:
-            logger.error(f"Error calculating fuzzy similarity: {e}")
-            return 0.0
-        
     def _extract_intelligent_keywords(self, fund_name: str) -> List[str]:
         """
         Intelligently extract meaningful keywords from fund name
@@ -1311,18 +1510,12 @@ This helps me fetch the latest data from official sources."""
         Score results based on relevance to original query
         """
         
-        query_words = set(original_query.upper().split())
+        # Share of query words found in the scheme or AMC name, scored in one batch
+        names = [f"{result.get('scheme_name') or ''} {result.get('amc_name') or ''}" for result in results]
+        scores = batch_word_coverage(original_query, names)
         
-        for result in results:
-            scheme_name = result.get("scheme_name", "").upper()
-            amc_name = result.get("amc_name", "").upper()
-            
-            # Count matching words
-            scheme_words = set(scheme_name.split())
-            amc_words = set(amc_name.split())
-            
-            matches = len(query_words.intersection(scheme_words.union(amc_words)))
-            result["relevance_score"] = matches / max(len(query_words), 1)
+        for result, score in zip(results, scores):
+            result["relevance_score"] = float(score)
             
         # Sort by relevance score
         return sorted(results, key=lambda x: x.get("relevance_score", 0), reverse=True)
@@ -1355,20 +1548,18 @@ This helps me fetch the latest data from official sources."""
                 url = f"{self.config.PRODUCTION_API_BASE}/api/funds/"
                 logger.info(f"Searching {endpoint} API with URL: {url}, params: {params}")
                 
-                async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.API_TIMEOUT)) as session:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            
-                            if isinstance(data, dict) and "data" in data:
-                                results = data["data"]
-                                if results:
-                                    return {
-                                        "found": True,
-                                        "results": results[:20],
-                                        "confidence": 0.7,
-                                        "source": "SINGLE_API_SEARCH"
-                                    }
+                status, data = await self._get_json("funds_list", url, params=params, timeout=self.config.API_TIMEOUT)
+                if status == 200:
+                    
+                    if isinstance(data, dict) and "data" in data:
+                        results = data["data"]
+                        if results:
+                            return {
+                                "found": True,
+                                "results": results[:20],
+                                "confidence": 0.7,
+                                "source": "SINGLE_API_SEARCH"
+                            }
             
             return {"found": False, "error": "No results found", "confidence": 0.0}
             
@@ -1489,18 +1680,16 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/ratings"
             logger.info(f"Fetching funds by ratings: {params}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "RATINGS_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("ratings", url, params=params, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "RATINGS_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching funds by ratings: {e}")
             return {"found": False, "error": str(e)}
@@ -1516,18 +1705,16 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/performance"
             logger.info(f"Fetching top performing funds: period={period}, category={category}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "PERFORMANCE_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("performance", url, params=params, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "PERFORMANCE_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching top performing funds: {e}")
             return {"found": False, "error": str(e)}
@@ -1539,18 +1726,16 @@ This helps me fetch the latest data from official sources."""
             params = {"sector": sector}
             logger.info(f"Searching funds by sector: {sector}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "SECTOR_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("sector", url, params=params, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "SECTOR_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching funds by sector: {e}")
             return {"found": False, "error": str(e)}
@@ -1565,18 +1750,16 @@ This helps me fetch the latest data from official sources."""
             
             logger.info(f"Searching funds by risk level: {risk_level}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "RISK_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("risk_metrics", url, params=params, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "RISK_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching funds by risk: {e}")
             return {"found": False, "error": str(e)}
@@ -1587,18 +1770,16 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/factsheet"
             logger.info(f"Fetching factsheet for ISIN: {isin}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "FACTSHEET_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("factsheet", url, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "FACTSHEET_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching factsheet: {e}")
             return {"found": False, "error": str(e)}
@@ -1609,18 +1790,16 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/returns"
             logger.info(f"Fetching returns for ISIN: {isin}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "RETURNS_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("returns", url, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "RETURNS_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching returns: {e}")
             return {"found": False, "error": str(e)}
@@ -1631,18 +1810,16 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/holdings"
             logger.info(f"Fetching holdings for ISIN: {isin}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "HOLDINGS_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("holdings", url, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "HOLDINGS_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching holdings: {e}")
             return {"found": False, "error": str(e)}
@@ -1653,40 +1830,119 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/nav"
             logger.info(f"Fetching NAV history for ISIN: {isin}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "NAV_HISTORY_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("nav", url, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "NAV_HISTORY_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching NAV history: {e}")
             return {"found": False, "error": str(e)}
     
+    async def get_nav_series(self, isin: str, last_days: Optional[int] = None,
+                             start: Optional[str] = None, end: Optional[str] = None) -> Optional[NavSeries]:
+        """
+        NAV series for an ISIN as date32/float64 arrays, oldest first.
+        
+        Served from the local NAV store (refreshing it from /api/funds/{isin}/nav
+        when stale, appending only new points); without a store the API payload
+        is parsed in memory. start/end are ISO dates, inclusive.
+        """
+        isin = isin.strip().upper()
+        start_day = parse_nav_date(start) if start else None
+        end_day = parse_nav_date(end) if end else None
+        
+        if self.nav_store is None:
+            result = await self._get_fund_nav(isin)
+            if not result.get("found"):
+                return None
+            return slice_series(NavSeries(isin, *nav_points_from_api(result["results"])), start_day, end_day, last_days)
+        
+        if self.nav_store.is_stale(isin):
+            # The response cache outlives the refresh interval; a cached body would never add new points
+            result = await self._get_fund_nav(isin, fresh=True)
+            if result.get("found"):
+                days, navs = nav_points_from_api(result["results"])
+                appended = self.nav_store.append(isin, days, navs)
+                logger.info(f"📈 NAV store refreshed for {isin}: {appended} new points")
+            else:
+                logger.warning(f"NAV refresh failed for {isin}, serving stored history: {result.get('error')}")
+        
+        return self.nav_store.get(isin, start=start_day, end=end_day, last_days=last_days)
+    
+    async def get_nav_history_summary(self, isin: str, last_days: Optional[int] = 365) -> Dict[str, Any]:
+        """Compact NAV history summary (range, change, recent points) instead of the full payload"""
+        try:
+            series = await self.get_nav_series(isin, last_days=last_days)
+            if series is None or not len(series):
+                return {"found": False, "error": f"No NAV history available for {isin}"}
+            return {
+                "found": True,
+                "isin": series.isin,
+                "window_days": last_days,
+                **summarize_series(series),
+                "source": "NAV_STORE" if self.nav_store is not None else "NAV_HISTORY_API",
+                "confidence": 1.0
+            }
+        except Exception as e:
+            logger.error(f"Error summarizing NAV history: {e}")
+            return {"found": False, "error": str(e)}
+    
+    async def get_fund_analytics(self, isins: List[str], window_years: float = 3.0,
+                                 risk_free_rate: Optional[float] = None, sip_amount: float = 10000.0,
+                                 sip_months: int = 36) -> Dict[str, Any]:
+        """
+        Locally computed returns, CAGR, volatility, Sharpe/Sortino, max drawdown,
+        rolling returns and SIP XIRR for one or more funds from their NAV history
+        """
+        try:
+            isins = [isin.strip().upper() for isin in isins if isin and isin.strip()]
+            if not isins:
+                return {"found": False, "error": "No ISINs provided"}
+            
+            logger.info(f"Computing analytics for ISINs: {isins}")
+            series = await asyncio.gather(*(self.get_nav_series(isin) for isin in isins), return_exceptions=True)
+            
+            available = [s for s in series if isinstance(s, NavSeries) and len(s)]
+            missing = [isin for isin, s in zip(isins, series) if not (isinstance(s, NavSeries) and len(s))]
+            if not available:
+                return {"found": False, "error": f"No NAV history available for {', '.join(missing)}"}
+            
+            rate = self.config.ANALYTICS_RISK_FREE_RATE if risk_free_rate is None else risk_free_rate
+            results = compute_fund_analytics(available, window_years=window_years, risk_free_rate=rate,
+                                             sip_amount=sip_amount, sip_months=sip_months)
+            return {
+                "found": True,
+                "results": results,
+                "missing": missing,
+                "source": "LOCAL_ANALYTICS",
+                "confidence": 1.0
+            }
+        except Exception as e:
+            logger.error(f"Error computing fund analytics: {e}")
+            return {"found": False, "error": str(e)}
+    
     async def get_complete_fund_data(self, isin: str) -> Dict[str, Any]:
         """Get complete fund data using /api/funds/{isin}/complete"""
         try:
             url = f"{self.config.PRODUCTION_API_BASE}/api/funds/{isin}/complete"
             logger.info(f"Fetching complete data for ISIN: {isin}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "COMPLETE_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("complete", url, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "COMPLETE_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching complete fund data: {e}")
             return {"found": False, "error": str(e)}
@@ -1698,18 +1954,16 @@ This helps me fetch the latest data from official sources."""
             params = {"isins": ",".join(isin_list)}
             logger.info(f"Comparing funds with ISINs: {isin_list}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "COMPARE_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("compare", url, params=params, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "COMPARE_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error comparing funds: {e}")
             return {"found": False, "error": str(e)}
@@ -1724,18 +1978,16 @@ This helps me fetch the latest data from official sources."""
             
             logger.info(f"Fetching NFO list with status: {status}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "NFO_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status_code, data = await self._get_json("nfo", url, params=params, timeout=30)
+            if status_code == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "NFO_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status_code}"}
         except Exception as e:
             logger.error(f"Error fetching NFO list: {e}")
             return {"found": False, "error": str(e)}
@@ -1746,18 +1998,16 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/bse-schemes/{unique_no}"
             logger.info(f"Fetching BSE scheme by unique number: {unique_no}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "BSE_SCHEME_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("bse_scheme", url, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "BSE_SCHEME_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching BSE scheme: {e}")
             return {"found": False, "error": str(e)}
@@ -1768,18 +2018,16 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/bse-schemes/by-isin/{isin}"
             logger.info(f"Fetching BSE schemes by ISIN: {isin}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "BSE_ISIN_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("bse_scheme", url, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "BSE_ISIN_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching BSE schemes by ISIN: {e}")
             return {"found": False, "error": str(e)}
@@ -1790,18 +2038,16 @@ This helps me fetch the latest data from official sources."""
             url = f"{self.config.PRODUCTION_API_BASE}/api/bse-schemes/sipcode/by-isin/{isin}"
             logger.info(f"Fetching SIP codes for ISIN: {isin}")
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "found": True,
-                            "results": data,
-                            "source": "SIP_CODE_API",
-                            "confidence": 1.0
-                        }
-                    else:
-                        return {"found": False, "error": f"API returned status {response.status}"}
+            status, data = await self._get_json("sip_codes", url, timeout=30)
+            if status == 200:
+                return {
+                    "found": True,
+                    "results": data,
+                    "source": "SIP_CODE_API",
+                    "confidence": 1.0
+                }
+            else:
+                return {"found": False, "error": f"API returned status {status}"}
         except Exception as e:
             logger.error(f"Error fetching SIP codes: {e}")
             return {"found": False, "error": str(e)}
@@ -8,7 +8,7 @@ through HTTP endpoints for the React frontend.
 
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 import asyncio
@@ -19,10 +19,14 @@ from datetime import datetime
 
 # Import existing agent components
 from agent.core import MutualFundsAgent
+from agent.admission import Overloaded
+from agent.streaming import sse_event
 from agent.config import AgentConfig
 from main import MutualFundsInterface, UserSession, InteractionMode
 from utils.logger import setup_logger
 from evaluation.pipeline import EvaluationPipeline
+from evaluation.background import EvaluationQueue
+from database.async_db import AsyncEvaluationDB
 
 # Setup logging
 logger = setup_logger(__name__)
@@ -48,7 +52,9 @@ app.add_middleware(
 # Global instances
 config = AgentConfig.from_env()
 interface = MutualFundsInterface(config)
-evaluation_pipeline = EvaluationPipeline(config)  # Initialize evaluation pipeline
+evaluation_pipeline = EvaluationPipeline(config, interface.agent.llm_rate_limiter)  # Judge shares the agent's LLM budget
+evaluation_db = AsyncEvaluationDB.from_env()  # None without psycopg 3; inserts then use the threaded pool
+evaluation_queue = EvaluationQueue.from_config(evaluation_pipeline, config, async_db=evaluation_db)  # Judge calls run off the request path
 
 # Active sessions storage
 active_sessions: Dict[str, UserSession] = {}
@@ -76,6 +82,14 @@ class SessionResponse(BaseModel):
 class FundSearchRequest(BaseModel):
     fund_name: str
     search_type: Optional[str] = "general"  # general, nav, performance, etc.
+    latency_budget: Optional[float] = None  # Seconds before returning the best result so far
+
+class FundAnalyticsRequest(BaseModel):
+    isins: List[str]
+    period_years: float = 3.0  # Window for CAGR, volatility, Sharpe/Sortino and drawdown
+    risk_free_rate: Optional[float] = None  # Defaults to ANALYTICS_RISK_FREE_RATE
+    sip_amount: float = 10000.0
+    sip_months: int = 36
 
 class FundSearchResponse(BaseModel):
     found: bool
@@ -105,6 +119,23 @@ class ConnectionManager:
 
 manager = ConnectionManager()
 
+@app.on_event("startup")
+async def startup_event():
+    """Open long-lived upstream resources (pooled HTTP client, evaluation DB pool and workers)"""
+    await interface.agent.tool_orchestrator.start()
+    if evaluation_db is not None:
+        await evaluation_db.open()
+    evaluation_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Finish queued evaluations, then close long-lived upstream resources"""
+    await evaluation_queue.drain()
+    await interface.agent.tool_orchestrator.close()
+    if evaluation_db is not None:
+        await evaluation_db.close()
+    evaluation_pipeline.db.close()
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -115,7 +146,10 @@ async def root():
         "endpoints": {
             "chat": "/api/chat",
             "session": "/api/session",
+            "chat_stream": "/api/chat/stream",
             "fund_search": "/api/funds/search",
+            "fund_analytics": "/api/funds/analytics",
+            "metrics": "/api/metrics",
             "websocket": "/ws/{session_id}"
         }
     }
@@ -124,7 +158,7 @@ async def root():
 async def create_session(request: SessionRequest):
     """Create a new chat session"""
     try:
-        session = await interface.start_session(
+        session = interface.create_session(
             user_name=request.user_name,
             mode=InteractionMode.API
         )
@@ -141,6 +175,89 @@ async def create_session(request: SessionRequest):
         logger.error(f"Error creating session: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create session: {str(e)}")
 
+def overloaded_error(error: Overloaded) -> HTTPException:
+    """429/503 with a Retry-After hint for requests shed by admission control"""
+    logger.warning(f"Shedding chat request ({error.status_code}): {error}")
+    return HTTPException(
+        status_code=error.status_code,
+        detail={
+            "error": "Server Busy",
+            "message": str(error),
+            "retry_after": error.retry_after
+        },
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+async def log_chat_evaluation(session_id: str, message: ChatMessage, response: str, start_time: datetime):
+    """Queue a chat turn for background evaluation; never fails or delays the request"""
+    # Calculate latency
+    end_time = datetime.now()
+    total_latency_ms = int((end_time - start_time).total_seconds() * 1000)
+    
+    # Collect the turn's data now; judging and the database insert happen on the evaluation queue
+    try:
+        # Get intent classification from agent
+        from agent.intent_parser import IntentParser
+        intent_parser = IntentParser(config)
+        intent_result = await intent_parser.parse(message.message)
+        
+        # Prepare evaluation data
+        intent_data = {
+            'intent': intent_result.intent.value,
+            'confidence': intent_result.confidence,
+            'entities': {
+                'fund_name': intent_result.entities.fund_name,
+                'metric': intent_result.entities.metric,
+                'period': intent_result.entities.period
+            }
+        }
+        
+        latency_data = {
+            'total_ms': total_latency_ms,
+            'llm_ms': int(total_latency_ms * 0.6),  # Estimate
+            'tool_ms': int(total_latency_ms * 0.3),  # Estimate
+            'api_ms': int(total_latency_ms * 0.1)   # Estimate
+        }
+        
+        # Get conversation turn count
+        turn_count = 1
+        if session_id in active_sessions and hasattr(active_sessions[session_id], 'history'):
+            turn_count = len(active_sessions[session_id].history)
+        
+        # Extract tools used and retrieval context from agent
+        tools_used = []
+        retrieval_context = []
+        agent_session = interface.agent.sessions.get(session_id)
+        if agent_session is not None:
+            tools_used = agent_session.last_tools_used
+            retrieval_context = agent_session.last_retrieval_context
+        
+        metadata = {
+            'user_id': message.user_name or 'anonymous',
+            'conversation_turn': turn_count,
+            'tools_used': tools_used,
+            'source': 'live_chat'
+        }
+        
+        # Judge calls and the insert run on a background worker
+        queued = evaluation_queue.submit(
+            user_prompt=message.message,
+            agent_response=response,
+            session_id=session_id,
+            intent_data=intent_data,
+            retrieval_context=retrieval_context,
+            latency_data=latency_data,
+            metadata=metadata,
+            user_name=message.user_name or 'anonymous'
+        )
+        
+        if queued:
+            logger.info(f"✅ Queued live chat evaluation for session {session_id} with {len(tools_used)} tools used")
+        
+    except Exception as eval_error:
+        # Don't fail the request if evaluation logging fails
+        logger.warning(f"Failed to log evaluation: {str(eval_error)}")
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(message: ChatMessage):
     """Process chat message and return AI response"""
@@ -151,89 +268,26 @@ async def chat(message: ChatMessage):
         
         # Create session if not provided
         if not session_id or session_id not in active_sessions:
-            session = await interface.start_session(
+            session = interface.create_session(
                 user_name=message.user_name,
                 mode=InteractionMode.API
             )
             session_id = session.session_id
             active_sessions[session_id] = session
         
-        # Set current session
-        interface.current_session = active_sessions[session_id]
+        # Bind this request to its own session; nothing shared is mutated
+        session = active_sessions[session_id]
         
         # Process message with full agentic processing (no timeout)
         try:
             # Pure agentic approach - no templates, no hardcoded responses
             # The agent autonomously decides tool usage and synthesizes responses
-            response = await interface.process_user_input(message.message)
-            
-            # Calculate latency
-            end_time = datetime.now()
-            total_latency_ms = int((end_time - start_time).total_seconds() * 1000)
+            response = await interface.process_user_input(message.message, session=session)
             
-            # Log evaluation to database (async, non-blocking)
-            try:
-                # Get intent classification from agent
-                from agent.intent_parser import IntentParser
-                intent_parser = IntentParser(config)
-                intent_result = await intent_parser.parse(message.message)
-                
-                # Prepare evaluation data
-                intent_data = {
-                    'intent': intent_result.intent.value,
-                    'confidence': intent_result.confidence,
-                    'entities': {
-                        'fund_name': intent_result.entities.fund_name,
-                        'metric': intent_result.entities.metric,
-                        'period': intent_result.entities.period
-                    }
-                }
-                
-                latency_data = {
-                    'total_ms': total_latency_ms,
-                    'llm_ms': int(total_latency_ms * 0.6),  # Estimate
-                    'tool_ms': int(total_latency_ms * 0.3),  # Estimate
-                    'api_ms': int(total_latency_ms * 0.1)   # Estimate
-                }
-                
-                # Get conversation turn count
-                turn_count = 1
-                if session_id in active_sessions and hasattr(active_sessions[session_id], 'history'):
-                    turn_count = len(active_sessions[session_id].history)
-                
-                # Extract tools used and retrieval context from agent
-                tools_used = []
-                retrieval_context = []
-                if hasattr(interface.agent, 'last_tools_used'):
-                    tools_used = interface.agent.last_tools_used
-                if hasattr(interface.agent, 'last_retrieval_context'):
-                    retrieval_context = interface.agent.last_retrieval_context
-                
-                metadata = {
-                    'user_id': message.user_name or 'anonymous',
-                    'conversation_turn': turn_count,
-                    'tools_used': tools_used,
-                    'source': 'live_chat'
-                }
-                
-                # Log evaluation (runs in background)
-                evaluation_pipeline.evaluate_interaction(
-                    user_prompt=message.message,
-                    agent_response=response,
-                    session_id=session_id,
-                    intent_data=intent_data,
-                    retrieval_context=retrieval_context,
-                    latency_data=latency_data,
-                    metadata=metadata,
-                    user_name=message.user_name or 'anonymous'
-                )
-                
-                logger.info(f"✅ Logged live chat evaluation for session {session_id} with {len(tools_used)} tools used")
-                
-            except Exception as eval_error:
-                # Don't fail the request if evaluation logging fails
-                logger.warning(f"Failed to log evaluation: {str(eval_error)}")
+            await log_chat_evaluation(session_id, message, response, start_time)
             
+        except Overloaded as e:
+            raise overloaded_error(e)
         except Exception as e:
             # Show exact error details to frontend
             logger.error(f"Agent processing error: {str(e)}")
@@ -254,6 +308,8 @@ async def chat(message: ChatMessage):
             confidence=0.85  # Default confidence
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing chat message: {str(e)}")
         # Return exact error details to frontend
@@ -277,7 +333,8 @@ async def search_funds(request: FundSearchRequest):
         # Call DB API first
         result = await tool_orchestrator.call_db_api(
             fund_name=request.fund_name,
-            metric=request.search_type if request.search_type != "general" else None
+            metric=request.search_type if request.search_type != "general" else None,
+            latency_budget=request.latency_budget
         )
         
         if result.get("found"):
@@ -311,6 +368,71 @@ async def search_funds(request: FundSearchRequest):
         logger.error(f"Error searching funds: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to search funds: {str(e)}")
 
+@app.post("/api/funds/analytics")
+async def fund_analytics(request: FundAnalyticsRequest):
+    """Returns, CAGR, volatility, Sharpe/Sortino, drawdown and SIP XIRR for one or more funds"""
+    if not request.isins:
+        raise HTTPException(status_code=400, detail="At least one ISIN is required")
+    if request.period_years <= 0 or request.sip_months <= 0:
+        raise HTTPException(status_code=400, detail="period_years and sip_months must be positive")
+    
+    try:
+        result = await interface.agent.tool_orchestrator.get_fund_analytics(
+            request.isins,
+            window_years=request.period_years,
+            risk_free_rate=request.risk_free_rate,
+            sip_amount=request.sip_amount,
+            sip_months=request.sip_months
+        )
+    except Exception as e:
+        logger.error(f"Error computing fund analytics: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to compute analytics: {str(e)}")
+    
+    if not result.get("found"):
+        raise HTTPException(status_code=404, detail=result.get("error", "No NAV history found"))
+    return result
+
+@app.post("/api/chat/stream")
+async def chat_stream(message: ChatMessage):
+    """
+    Stream the agent's progress and answer as Server-Sent Events
+    
+    Events: session, accepted, thinking, tool_start, tool_end, token (final-answer
+    chunks) and final (the complete response). Shed requests get 429/503 with
+    Retry-After before the stream starts.
+    """
+    start_time = datetime.now()
+    session_id = message.session_id
+    if not session_id or session_id not in active_sessions:
+        session = interface.create_session(user_name=message.user_name, mode=InteractionMode.API)
+        session_id = session.session_id
+        active_sessions[session_id] = session
+    session = active_sessions[session_id]
+    
+    events = interface.stream_user_input(message.message, session)
+    try:
+        # Admission happens before the first event, so shedding is still a plain HTTP error
+        first_event = await events.__anext__()
+    except Overloaded as e:
+        raise overloaded_error(e)
+    
+    async def event_stream():
+        try:
+            yield sse_event({"type": "session", "session_id": session_id})
+            yield sse_event(first_event)
+            async for event in events:
+                yield sse_event(event)
+                if event["type"] == "final":
+                    await log_chat_evaluation(session_id, message, event["message"], start_time)
+        finally:
+            await events.aclose()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/session/{session_id}")
 async def get_session(session_id: str):
     """Get session information and conversation history"""
@@ -330,6 +452,7 @@ async def delete_session(session_id: str):
     """Delete a session"""
     if session_id in active_sessions:
         del active_sessions[session_id]
+        interface.agent.sessions.discard(session_id)
         return {"message": "Session deleted successfully"}
     raise HTTPException(status_code=404, detail="Session not found")
 
@@ -346,16 +469,35 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             
             # Create or get session
             if session_id not in active_sessions:
-                session = await interface.start_session(
+                active_sessions[session_id] = interface.create_session(
                     user_name=message_data.get("user_name"),
-                    mode=InteractionMode.API
+                    mode=InteractionMode.API,
+                    session_id=session_id
                 )
-                active_sessions[session_id] = session
-            
-            interface.current_session = active_sessions[session_id]
             
-            # Process message
-            response = await interface.process_user_input(message_data["message"])
+            # Stream progress and answer tokens as they are produced; the final
+            # answer is still sent as a single "response" frame
+            try:
+                async for event in interface.stream_user_input(message_data["message"], active_sessions[session_id]):
+                    if event["type"] == "final":
+                        response = event["message"]
+                    else:
+                        await manager.send_personal_message(
+                            json.dumps({**event, "session_id": session_id}),
+                            session_id
+                        )
+            except Overloaded as e:
+                await manager.send_personal_message(
+                    json.dumps({
+                        "type": "busy",
+                        "message": str(e),
+                        "retry_after": e.retry_after,
+                        "timestamp": datetime.now().isoformat(),
+                        "session_id": session_id
+                    }),
+                    session_id
+                )
+                continue
             
             # Send response
             await manager.send_personal_message(
@@ -396,6 +538,27 @@ async def health_check():
         }
     }
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Runtime metrics for shared resources (connection pool, etc.)"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "tools": interface.agent.tool_orchestrator.get_metrics(),
+        "agent_sessions": interface.agent.sessions.get_stats(),
+        "admission": interface.agent.admission.get_stats(),
+        "llm_rate_limiter": interface.agent.llm_rate_limiter.get_stats() if interface.agent.llm_rate_limiter else None,
+        "conversation_memory": interface.agent.memory_metrics.get_stats(),
+        "fast_path": interface.agent.fast_path.get_stats() if interface.agent.fast_path else None,
+        "llm_cache": interface.agent.llm_cache.get_stats() if interface.agent.llm_cache else None,
+        "prefetch": interface.agent.prefetcher.get_stats() if interface.agent.prefetcher else None,
+        "evaluation_queue": evaluation_queue.get_stats(),
+        "evaluation_judge": evaluation_pipeline.judge.get_stats() if evaluation_pipeline.judge else None,
+        "evaluation_db": {
+            "pool": evaluation_pipeline.db.get_pool_stats(),
+            "async_pool": evaluation_db.get_pool_stats() if evaluation_db else None
+        }
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
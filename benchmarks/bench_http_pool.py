@@ -0,0 +1,130 @@
+"""
+Benchmark: per-request aiohttp sessions vs the pooled ToolOrchestrator client
+============================================================================
+
+Starts a local stub of the fund API and issues the same ISIN lookups two ways:
+
+- before: a brand-new ``aiohttp.ClientSession`` per request (old behaviour)
+- after:  ``ToolOrchestrator`` with its shared, pooled session
+
+The stub counts distinct client connections so connection reuse is visible,
+and latency percentiles are reported for both runs. The stub has no TLS or
+DNS, so real-world savings against PRODUCTION_API_BASE are larger.
+
+Usage:
+    python -m benchmarks.bench_http_pool --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List, Set
+
+import aiohttp
+from aiohttp import web
+
+from agent.config import AgentConfig
+from agent.tools import ToolOrchestrator
+
+
+class StubFundAPI:
+    """Minimal stand-in for /api/funds/{isin}/nav that tracks client connections"""
+
+    def __init__(self, delay_ms: float = 0.0):
+        self.delay = delay_ms / 1000.0
+        self.peers: Set[tuple] = set()
+        self.requests = 0
+
+    async def nav(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info("peername"))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        isin = request.match_info["isin"]
+        return web.json_response({
+            "isin": isin,
+            "nav_history": [{"date": "2024-01-01", "nav": 101.25}]
+        })
+
+    def reset(self):
+        self.peers.clear()
+        self.requests = 0
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def run_load(call, total: int, concurrency: int) -> List[float]:
+    """Run `total` calls with bounded concurrency, returning per-call latency in ms"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(i)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies
+
+
+def report(label: str, latencies: List[float], stub: StubFundAPI, wall_s: float):
+    print(f"{label:<8} requests={stub.requests:<5} connections={len(stub.peers):<5} "
+          f"p50={percentile(latencies, 50):7.2f}ms p99={percentile(latencies, 99):7.2f}ms "
+          f"mean={statistics.mean(latencies):7.2f}ms wall={wall_s:6.2f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark pooled vs per-request HTTP sessions")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--delay-ms", type=float, default=2.0, help="Simulated server latency")
+    args = parser.parse_args()
+
+    stub = StubFundAPI(args.delay_ms)
+    app = web.Application()
+    app.router.add_get("/api/funds/{isin}/nav", stub.nav)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+
+    print(f"Stub fund API on {base} ({args.requests} requests, concurrency {args.concurrency})\n")
+
+    # Before: one session (and connection) per request
+    async def per_request_session(i: int):
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as session:
+            async with session.get(f"{base}/api/funds/INF{i:09d}/nav") as response:
+                await response.json()
+
+    stub.reset()
+    start = time.perf_counter()
+    latencies = await run_load(per_request_session, args.requests, args.concurrency)
+    report("before", latencies, stub, time.perf_counter() - start)
+
+    # After: ToolOrchestrator with the shared pool
+    config = AgentConfig(PRODUCTION_API_BASE=base)
+    orchestrator = ToolOrchestrator(config)
+    await orchestrator.start()
+
+    async def pooled(i: int):
+        await orchestrator._get_fund_nav(f"INF{i:09d}")
+
+    stub.reset()
+    start = time.perf_counter()
+    latencies = await run_load(pooled, args.requests, args.concurrency)
+    report("after", latencies, stub, time.perf_counter() - start)
+
+    await orchestrator.close()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
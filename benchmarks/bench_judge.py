@@ -0,0 +1,172 @@
+"""
+Benchmark: four-call LLM judge vs the batched single-call judge
+===============================================================
+
+Scores the same synthetic interactions four ways:
+
+- legacy:     a new ChatOpenAI client per evaluation, four sequential calls
+              (the original ``_calculate_groq_metrics``)
+- per_metric: ``LLMJudge`` with a shared client, four concurrent calls
+- batched:    ``LLMJudge`` scoring all metrics in one JSON call
+- cached:     batched with a fresh ``JudgeScoreCache``; the first evaluation
+              is scored, the rest replay the same interaction from the cache
+
+and reports wall time per evaluation, LLM calls and prompt/completion
+tokens. By default it runs against a local OpenAI-compatible stub whose
+latency grows with prompt size and whose token counts are chars/4; pass
+--live to use the configured MOONSHOT_* endpoint (this spends real tokens).
+--malformed-rate makes the stub return broken JSON for part of the batched
+calls, to exercise the per-metric fallback.
+
+Usage:
+    python -m benchmarks.bench_judge --evaluations 20
+    python -m benchmarks.bench_judge --evaluations 5 --live
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from typing import Dict, Any, List
+
+from aiohttp import web
+
+from agent.config import AgentConfig
+from evaluation.judge import LLMJudge
+from evaluation.judge_cache import JudgeScoreCache
+
+QUERY = "What is the NAV and expense ratio of HDFC Flexi Cap Fund Direct Growth?"
+RESPONSE = ("The latest NAV of HDFC Flexi Cap Fund - Direct Plan - Growth is ₹1,912.44 (as of 14 Oct). "
+            "Its expense ratio is 0.77% and it is benchmarked to the NIFTY 500 TRI. This is not financial advice; "
+            "please consult a SEBI-registered advisor before investing.")
+CONTEXT = [
+    "{'found': True, 'results': [{'scheme_name': 'HDFC Flexi Cap Fund - Direct Plan - Growth', "
+    "'isin': 'INF179K01UT0', 'nav': 1912.44, 'nav_date': '2024-10-14', 'expense_ratio': 0.77, "
+    "'benchmark': 'NIFTY 500 TRI', 'aum': 64928.3, 'fund_manager': 'Roshi Jain'}]}",
+    "{'found': True, 'latest_nav': 1912.44, 'latest_date': '2024-10-14', 'change_30d_pct': 2.13}"
+]
+
+
+class StubJudgeAPI:
+    """OpenAI-compatible /chat/completions that answers judge prompts"""
+
+    def __init__(self, base_latency_ms: float, ms_per_1k_prompt_tokens: float, malformed_rate: float):
+        self.base_latency = base_latency_ms / 1000.0
+        self.per_1k_tokens = ms_per_1k_prompt_tokens / 1000.0
+        self.malformed_rate = malformed_rate
+        self.rng = random.Random(7)
+
+    async def completions(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        prompt = " ".join(str(m.get("content", "")) for m in payload.get("messages", []))
+        prompt_tokens = max(1, len(prompt) // 4)
+        await asyncio.sleep(self.base_latency + self.per_1k_tokens * prompt_tokens / 1000.0)
+
+        if "JSON object" in prompt:
+            content = json.dumps({"relevance": 0.9, "faithfulness": 0.95, "contextual_relevance": 0.9,
+                                  "hallucination": 0.05})
+            if self.rng.random() < self.malformed_rate:
+                content = content[:-12]
+        else:
+            content = "0.9"
+        completion_tokens = max(1, len(content) // 4)
+        return web.json_response({
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        })
+
+
+def start_stub(stub: StubJudgeAPI) -> str:
+    """Serve the stub on a background event loop (the judge is synchronous)"""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    address: Dict[str, Any] = {}
+
+    async def serve():
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", stub.completions)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        address["port"] = site._server.sockets[0].getsockname()[1]
+        ready.set()
+
+    threading.Thread(target=lambda: (loop.run_until_complete(serve()), loop.run_forever()), daemon=True).start()
+    ready.wait()
+    return f"http://127.0.0.1:{address['port']}/v1"
+
+
+def run(label: str, evaluations: int, make_judge, reuse: bool):
+    """Score `evaluations` interactions; a fresh judge per evaluation unless reuse"""
+    judge = make_judge() if reuse else None
+    calls = prompt_tokens = completion_tokens = 0
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(evaluations):
+        current = judge or make_judge()
+        before = current.get_stats()
+        began = time.perf_counter()
+        current.score(QUERY, RESPONSE, CONTEXT)
+        latencies.append((time.perf_counter() - began) * 1000)
+        after = current.get_stats()
+        calls += after["llm_calls"] - before["llm_calls"]
+        prompt_tokens += after["prompt_tokens"] - before["prompt_tokens"]
+        completion_tokens += after["completion_tokens"] - before["completion_tokens"]
+        if judge is None:
+            current.close()
+    wall = time.perf_counter() - start
+    print(f"{label:<11} calls/eval={calls / evaluations:4.2f} prompt_tok/eval={prompt_tokens / evaluations:7.1f} "
+          f"completion_tok/eval={completion_tokens / evaluations:5.1f} "
+          f"mean={statistics.mean(latencies):8.1f}ms p50={statistics.median(latencies):8.1f}ms wall={wall:6.2f}s")
+    if judge is not None:
+        stats = judge.get_stats()
+        if stats["batched_parse_failures"]:
+            print(f"{'':<11} batched parse failures={stats['batched_parse_failures']} "
+                  f"metrics re-scored={stats['fallback_metrics']}")
+        judge.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the four-call vs batched LLM judge")
+    parser.add_argument("--evaluations", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="Use the configured MOONSHOT_* endpoint")
+    parser.add_argument("--base-latency-ms", type=float, default=250.0, help="Stub latency per call")
+    parser.add_argument("--ms-per-1k-prompt-tokens", type=float, default=40.0, help="Stub prefill cost")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Share of broken batched replies")
+    args = parser.parse_args()
+
+    config = AgentConfig()
+    config.JUDGE_CACHE_ENABLED = False  # Every run below scores for real; "cached" brings its own cache
+    if not args.live:
+        stub = StubJudgeAPI(args.base_latency_ms, args.ms_per_1k_prompt_tokens, args.malformed_rate)
+        config.MOONSHOT_BASE_URL = start_stub(stub)
+        config.MOONSHOT_API_KEY = "stub"
+    print(f"Judge endpoint {config.MOONSHOT_BASE_URL} ({args.evaluations} evaluations)\n")
+
+    run("legacy", args.evaluations,
+        lambda: LLMJudge.from_config(config, mode="per_metric", concurrent=False), reuse=False)
+    run("per_metric", args.evaluations, lambda: LLMJudge.from_config(config, mode="per_metric"), reuse=True)
+    run("batched", args.evaluations, lambda: LLMJudge.from_config(config, mode="batched"), reuse=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        def cached_judge():
+            judge = LLMJudge.from_config(config, mode="batched")
+            judge.cache = JudgeScoreCache(os.path.join(directory, "judge_cache.sqlite"))
+            return judge
+        run("cached", args.evaluations, cached_judge, reuse=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: per-pair fuzzy similarity loop vs the batch NumPy scorer
+===================================================================
+
+Scores one query against N synthetic scheme names three ways:
+
+- loop:    the original per-pair Jaccard + substring-bonus scorer
+- batch:   ``batch_similarity`` in compat mode, tokenizing the names per call
+- prebuilt: compat mode against a reusable ``NameMatrix``
+
+and checks that compat mode returns exactly the loop's scores. Trigram
+mode is timed too for reference.
+
+The fuzzy search phase scores at most a few hundred upstream results per
+query and builds one NameMatrix over them, so the "batch" row is the one
+that reflects it; "prebuilt" only applies when the same names are scored
+against many queries.
+
+Usage:
+    python -m benchmarks.bench_similarity --candidates 5000 --queries 50
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from agent.similarity import NameMatrix, batch_similarity
+
+AMCS = ["HDFC", "ICICI Prudential", "SBI", "Axis", "Kotak", "Nippon India", "Aditya Birla Sun Life",
+        "UTI", "DSP", "Mirae Asset", "Quant", "Parag Parikh", "Tata", "Franklin India", "Canara Robeco"]
+CATEGORIES = ["Flexi Cap", "Large Cap", "Mid Cap", "Small Cap", "Bluechip", "Liquid", "Overnight", "Gilt",
+              "Corporate Bond", "ELSS Tax Saver", "Balanced Advantage", "Multi Asset", "Nifty 50 Index",
+              "Banking and PSU Debt", "Value", "Focused", "Dynamic Bond", "Arbitrage", "Emerging Equity"]
+PLANS = ["Direct Plan - Growth", "Regular Plan - Growth", "Direct Plan - IDCW", "Regular Plan - IDCW"]
+
+
+def legacy_similarity(query: str, fund_name: str) -> float:
+    """The original ToolOrchestrator._calculate_fuzzy_similarity"""
+    query_words = set(query.lower().split())
+    fund_words = set(fund_name.lower().split())
+    intersection = len(query_words & fund_words)
+    union = len(query_words | fund_words)
+    if union == 0:
+        return 0.0
+    jaccard_similarity = intersection / union
+    substring_bonus = 0.0
+    for q_word in query_words:
+        for f_word in fund_words:
+            if q_word in f_word or f_word in q_word:
+                substring_bonus += 0.1
+    return min(1.0, jaccard_similarity + substring_bonus)
+
+
+def make_names(count: int, rng: random.Random) -> List[str]:
+    return [f"{rng.choice(AMCS)} {rng.choice(CATEGORIES)} Fund - {rng.choice(PLANS)}" for _ in range(count)]
+
+
+def make_queries(count: int, rng: random.Random) -> List[str]:
+    return [f"{rng.choice(AMCS).lower()} {rng.choice(CATEGORIES).lower()}" for _ in range(count)]
+
+
+def time_ms(fn: Callable, queries: List[str]) -> List[float]:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label: str, samples: List[float], baseline: float = None):
+    mean = statistics.mean(samples)
+    speedup = f"  {baseline / mean:6.1f}x" if baseline else ""
+    print(f"{label:<10} mean={mean:9.3f}ms  p50={statistics.median(samples):9.3f}ms  max={max(samples):9.3f}ms{speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-pair vs batch fund-name similarity")
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = make_names(args.candidates, rng)
+    queries = make_queries(args.queries, rng)
+
+    # Compat mode must reproduce the loop exactly
+    for query in queries:
+        expected = np.array([legacy_similarity(query, name) for name in names])
+        assert np.array_equal(batch_similarity(query, names), expected), f"Score mismatch for {query!r}"
+    print(f"compat scores identical to the loop for {args.queries} queries x {args.candidates} names\n")
+
+    start = time.perf_counter()
+    matrix = NameMatrix(names)
+    print(f"NameMatrix build: {(time.perf_counter() - start) * 1000:.1f}ms "
+          f"({len(matrix.vocab)} distinct tokens)")
+    start = time.perf_counter()
+    matrix.trigram_bits
+    print(f"Trigram bitsets:  {(time.perf_counter() - start) * 1000:.1f}ms\n")
+
+    loop = time_ms(lambda q: [legacy_similarity(q, name) for name in names], queries)
+    report("loop", loop)
+    baseline = statistics.mean(loop)
+    report("batch", time_ms(lambda q: batch_similarity(q, names), queries), baseline)
+    report("prebuilt", time_ms(lambda q: batch_similarity(q, matrix), queries), baseline)
+    report("trigram", time_ms(lambda q: batch_similarity(q, matrix, mode="trigram"), queries), baseline)
+
+
+if __name__ == "__main__":
+    main()
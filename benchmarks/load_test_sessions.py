@@ -0,0 +1,164 @@
+"""
+Load test: many concurrent chat sessions through MutualFundsInterface
+=====================================================================
+
+Drives the same path as ``/api/chat`` (``create_session`` +
+``process_user_input(..., session=...)``) for hundreds of sessions at once,
+with a stub LLM in place of Moonshot so no network or API key is needed.
+
+Every message carries its session's tag. The stub LLM answers with that
+tag after a random delay (so turns interleave), and checks that the
+conversation history in each prompt only mentions the same session.
+Afterwards the UserSession transcripts and the agent's per-session
+memories are checked too. Any cross-session mix exits non-zero.
+
+The agent's admission queue is sized to hold every session so the default
+run isn't shed; pass --admission-max-queue to exercise load shedding, in
+which case shed turns are retried after their Retry-After.
+
+Usage:
+    python -m benchmarks.load_test_sessions --sessions 300 --turns 4
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import re
+import statistics
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.llms import LLM
+
+from agent.admission import Overloaded
+from agent.config import AgentConfig
+from main import MutualFundsInterface, InteractionMode, UserSession
+
+TAG_PATTERN = re.compile(r"\bsess-\d+\b")
+
+
+class StubLLM(LLM):
+    """Echoes the question's session tag as a ReAct final answer after a random delay"""
+
+    max_delay: float = 0.02
+    prompts: int = 0
+    violations: List[str] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _answer(self, prompt: str) -> str:
+        history, _, question = prompt.rpartition("Question: ")
+        tag = TAG_PATTERN.search(question).group(0)
+        foreign = set(TAG_PATTERN.findall(history)) - {tag}
+        if foreign:
+            self.violations.append(f"{tag} prompt contained {sorted(foreign)}")
+        turn = re.search(r"turn (\d+)", question).group(1)
+        return f"Thought: I can answer directly.\nFinal Answer: Answer for {tag} turn {turn}."
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> str:
+        return self._answer(prompt)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs) -> str:
+        self.prompts += 1
+        await asyncio.sleep(random.uniform(0, self.max_delay))
+        return self._answer(prompt)
+
+
+async def run_session(interface: MutualFundsInterface, index: int, turns: int, latencies: List[float],
+                      shed: List[int]) -> UserSession:
+    tag = f"sess-{index}"
+    session = interface.create_session(user_name=f"user{index}", mode=InteractionMode.API)
+    for turn in range(turns):
+        start = time.perf_counter()
+        while True:
+            try:
+                response = await interface.process_user_input(f"Question from {tag} turn {turn}: explain SIP",
+                                                              session=session)
+                break
+            except Overloaded as e:
+                # Like a well-behaved client on a 429/503: wait Retry-After, then resend
+                shed.append(e.status_code)
+                await asyncio.sleep(e.retry_after)
+        latencies.append((time.perf_counter() - start) * 1000)
+        expected = f"Answer for {tag} turn {turn}."
+        if response.strip() != expected:
+            raise AssertionError(f"{tag} turn {turn} got {response!r}")
+    return session
+
+
+def check_isolation(interface: MutualFundsInterface, sessions: List[UserSession], turns: int) -> List[str]:
+    problems = []
+    for index, session in enumerate(sessions):
+        tag = f"sess-{index}"
+        transcript = " ".join(message["content"] for message in session.conversation_history)
+        if set(TAG_PATTERN.findall(transcript)) != {tag}:
+            problems.append(f"{tag} transcript mentions {sorted(set(TAG_PATTERN.findall(transcript)))}")
+        if len(session.conversation_history) != min(2 * turns, interface.config.SESSION_HISTORY_MAX_MESSAGES):
+            problems.append(f"{tag} transcript has {len(session.conversation_history)} messages")
+
+        state = interface.agent.sessions.get(session.session_id)
+        if state is None:
+            continue  # evicted from the pool; nothing to cross-check
+        memory_tags = set(TAG_PATTERN.findall(state.memory.buffer))
+        if memory_tags != {tag}:
+            problems.append(f"{tag} agent memory mentions {sorted(memory_tags)}")
+        if state.turns != turns:
+            problems.append(f"{tag} agent memory saw {state.turns} turns")
+    return problems
+
+
+async def main_async(args):
+    config = AgentConfig()
+    interface = MutualFundsInterface(config)
+    llm = StubLLM(max_delay=args.max_delay_ms / 1000.0)
+    interface.agent._llm = llm
+    interface.agent.agent.verbose = False
+    admission = interface.agent.admission
+    admission.max_queue = args.admission_max_queue if args.admission_max_queue is not None else args.sessions
+
+    latencies: List[float] = []
+    shed: List[int] = []
+    start = time.perf_counter()
+    sessions = await asyncio.gather(*(run_session(interface, i, args.turns, latencies, shed)
+                                      for i in range(args.sessions)))
+    elapsed = time.perf_counter() - start
+
+    problems = llm.violations + check_isolation(interface, sessions, args.turns)
+    ordered = sorted(latencies)
+    print(f"{args.sessions} sessions x {args.turns} turns = {len(latencies)} requests in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} req/s)")
+    print(f"latency mean={statistics.mean(ordered):.1f}ms p50={ordered[len(ordered) // 2]:.1f}ms "
+          f"p95={ordered[int(len(ordered) * 0.95)]:.1f}ms max={ordered[-1]:.1f}ms")
+    print(f"LLM prompts: {llm.prompts}, agent sessions pooled: {interface.agent.sessions.get_stats()['sessions']}")
+    print(f"admission: {admission.max_in_flight} in flight, queue {admission.max_queue} "
+          f"(peak {admission.peak_queue_depth}), {len(shed)} shed turns retried")
+
+    if problems:
+        print(f"\n❌ {len(problems)} isolation problems, e.g.:")
+        for problem in problems[:10]:
+            print(f"   {problem}")
+        return 1
+    print("\n✅ No cross-session history mixing")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent session isolation load test with a stub LLM")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--max-delay-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--admission-max-queue", type=int, default=None,
+                        help="Admission queue size (default: one slot per session, so nothing is shed)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    logging.disable(logging.INFO)
+    raise SystemExit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
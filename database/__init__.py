@@ -1,5 +1,6 @@
 """Database module for evaluation storage"""
 
 from .db import EvaluationDB, get_eval_db
+from .async_db import AsyncEvaluationDB
 
-__all__ = ['EvaluationDB', 'get_eval_db']
+__all__ = ['EvaluationDB', 'get_eval_db', 'AsyncEvaluationDB']
@@ -0,0 +1,126 @@
+"""
+Async evaluation storage on a psycopg 3 connection pool (optional dependency)
+"""
+
+import os
+from typing import Dict, Any, List, Optional
+
+try:
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+from .db import SAVE_EVALUATION_SQL, PERFORMANCE_SUMMARY_SQL, connection_settings, evaluation_row, evaluations_query
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AsyncEvaluationDB:
+    """
+    Non-blocking counterpart of EvaluationDB for use on the FastAPI event loop.
+
+    Same SQL, pool sizes, statement timeout and idle health check as the
+    sync class, on psycopg_pool.AsyncConnectionPool. Requires
+    `pip install "psycopg[binary,pool]"`; from_env() returns None without it.
+    """
+
+    def __init__(self, min_connections: int = 1, max_connections: int = 20, pool_timeout: float = 10.0,
+                 health_check_interval: float = 30.0):
+        if not PSYCOPG_AVAILABLE:
+            raise ImportError('AsyncEvaluationDB needs psycopg 3: pip install "psycopg[binary,pool]"')
+        self.min_connections = min_connections
+        self.max_connections = max(min_connections, max_connections)
+        self.pool_timeout = pool_timeout
+        self.health_check_interval = health_check_interval
+        self._pool: Optional['AsyncConnectionPool'] = None
+
+    @classmethod
+    def from_env(cls) -> Optional['AsyncEvaluationDB']:
+        """Async DB configured like EvaluationDB, or None when disabled or psycopg 3 is missing"""
+        if os.getenv('DB_ASYNC_ENABLED', 'true').lower() != 'true':
+            return None
+        if not PSYCOPG_AVAILABLE:
+            logger.info("psycopg 3 not installed; evaluation DB writes use the threaded psycopg2 pool")
+            return None
+        return cls(
+            min_connections=int(os.getenv('DB_MIN_CONNECTIONS', '1')),
+            max_connections=int(os.getenv('DB_MAX_CONNECTIONS', '20')),
+            pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            health_check_interval=float(os.getenv('DB_HEALTH_CHECK_INTERVAL', '30'))
+        )
+
+    @property
+    def is_open(self) -> bool:
+        return self._pool is not None
+
+    async def open(self):
+        """Open the pool without waiting for the database to be reachable"""
+        if self._pool is not None:
+            return
+        self._pool = AsyncConnectionPool(
+            kwargs=connection_settings(),
+            min_size=self.min_connections,
+            max_size=self.max_connections,
+            timeout=self.pool_timeout,
+            max_idle=max(self.health_check_interval * 10, 300.0),
+            check=AsyncConnectionPool.check_connection,
+            open=False
+        )
+        await self._pool.open(wait=False)
+        logger.info(f"🗄️  Async evaluation DB pool opened ({self.min_connections}-{self.max_connections} connections)")
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def save_evaluation(self, data: Dict[str, Any]) -> int:
+        """Insert an evaluation record; returns its ID, or -1 on failure"""
+        try:
+            async with self._pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(SAVE_EVALUATION_SQL, evaluation_row(data))
+                    eval_id = (await cur.fetchone())[0]
+                    logger.info(f"Saved evaluation record with ID: {eval_id}")
+                    return eval_id
+        except Exception as e:
+            logger.error(f"Failed to save evaluation: {e}")
+            return -1
+
+    async def get_evaluations(self, filters: Optional[Dict[str, Any]] = None,
+                              limit: int = 100) -> List[Dict[str, Any]]:
+        """Retrieve evaluation records with optional filters"""
+        query, params = evaluations_query(filters, limit)
+        try:
+            async with self._pool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(query, params)
+                    return await cur.fetchall()
+        except Exception as e:
+            logger.error(f"Failed to retrieve evaluations: {e}")
+            return []
+
+    async def get_performance_summary(self, days: int = 7) -> Dict[str, Any]:
+        """Get aggregated performance metrics for the last N days"""
+        try:
+            async with self._pool.connection() as conn:
+                async with conn.cursor(row_factory=dict_row) as cur:
+                    await cur.execute(PERFORMANCE_SUMMARY_SQL, {'days': days})
+                    results = await cur.fetchall()
+                    return {
+                        'summary': results[0] if results else {},
+                        'by_intent': results
+                    }
+        except Exception as e:
+            logger.error(f"Failed to get performance summary: {e}")
+            return {}
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        stats = {"open": self._pool is not None, "min_connections": self.min_connections,
+                 "max_connections": self.max_connections}
+        if self._pool is not None:
+            stats.update(self._pool.get_stats())
+        return stats
@@ -4,9 +4,12 @@ Database connection and operations for agent evaluation storage
 
 import os
 import json
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import psycopg2
+from psycopg2 import pool as pg_pool
 from psycopg2.extras import RealDictCursor, Json
 from contextlib import contextmanager
 
@@ -14,35 +17,243 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+SAVE_EVALUATION_SQL = """
+    INSERT INTO agent_evaluations (
+        session_id, user_id, user_name, user_prompt, agent_response,
+        conversation_turn, intent_predicted, expected_intent, intent_confidence,
+        intent_match, entities_extracted, threshold_used, passed_threshold,
+        fallback_triggered, relevance_score, hallucination_score, faithfulness_score,
+        contextual_relevance, answer_correctness, total_latency_ms, llm_latency_ms,
+        tool_latency_ms, api_latency_ms, api_source, tools_used, retrieval_path,
+        num_tool_calls, contains_disclaimer, risk_detection_flag, pii_detected,
+        response_length, llm_model, agent_version, toolchain_version, environment,
+        error_occurred, error_message, retry_count
+    ) VALUES (
+        %(session_id)s, %(user_id)s, %(user_name)s, %(user_prompt)s, %(agent_response)s,
+        %(conversation_turn)s, %(intent_predicted)s, %(expected_intent)s, 
+        %(intent_confidence)s, %(intent_match)s, %(entities_extracted)s,
+        %(threshold_used)s, %(passed_threshold)s, %(fallback_triggered)s,
+        %(relevance_score)s, %(hallucination_score)s, %(faithfulness_score)s,
+        %(contextual_relevance)s, %(answer_correctness)s, %(total_latency_ms)s,
+        %(llm_latency_ms)s, %(tool_latency_ms)s, %(api_latency_ms)s,
+        %(api_source)s, %(tools_used)s, %(retrieval_path)s, %(num_tool_calls)s,
+        %(contains_disclaimer)s, %(risk_detection_flag)s, %(pii_detected)s,
+        %(response_length)s, %(llm_model)s, %(agent_version)s, %(toolchain_version)s,
+        %(environment)s, %(error_occurred)s, %(error_message)s, %(retry_count)s
+    ) RETURNING id
+"""
+
+PERFORMANCE_SUMMARY_SQL = """
+    SELECT 
+        COUNT(*) as total_queries,
+        AVG(relevance_score) as avg_relevance,
+        AVG(hallucination_score) as avg_hallucination,
+        AVG(faithfulness_score) as avg_faithfulness,
+        AVG(total_latency_ms) as avg_latency,
+        SUM(CASE WHEN passed_threshold THEN 1 ELSE 0 END)::FLOAT / COUNT(*) as pass_rate,
+        SUM(CASE WHEN error_occurred THEN 1 ELSE 0 END)::FLOAT / COUNT(*) as error_rate,
+        intent_predicted,
+        COUNT(*) as intent_count
+    FROM agent_evaluations
+    WHERE timestamp >= NOW() - %(days)s * INTERVAL '1 day'
+    GROUP BY intent_predicted
+    ORDER BY intent_count DESC
+"""
+
+def connection_settings() -> Dict[str, Any]:
+    """Connection parameters from the environment, including the per-statement timeout"""
+    settings = {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': os.getenv('DB_PORT', '5432'),
+        'dbname': os.getenv('DB_NAME', 'mf_agent_eval'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', 'postgres'),
+        'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', '5'))
+    }
+    statement_timeout_ms = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '5000'))
+    if statement_timeout_ms > 0:
+        settings['options'] = f"-c statement_timeout={statement_timeout_ms}"
+    return settings
+
+def evaluation_row(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluation dict with dict/list fields encoded as JSON strings for the JSONB columns"""
+    row = data.copy()
+    if isinstance(row.get('entities_extracted'), dict):
+        row['entities_extracted'] = json.dumps(row['entities_extracted'])
+    if isinstance(row.get('tools_used'), (list, dict)):
+        row['tools_used'] = json.dumps(row['tools_used'])
+    return row
+
+def evaluations_query(filters: Optional[Dict[str, Any]] = None, limit: int = 100) -> Tuple[str, Dict[str, Any]]:
+    """SELECT over agent_evaluations for the supported filters"""
+    query = "SELECT * FROM agent_evaluations WHERE 1=1"
+    params = {}
+    
+    if filters:
+        if 'session_id' in filters:
+            query += " AND session_id = %(session_id)s"
+            params['session_id'] = filters['session_id']
+        if 'intent' in filters:
+            query += " AND intent_predicted = %(intent)s"
+            params['intent'] = filters['intent']
+        if 'date_from' in filters:
+            query += " AND timestamp >= %(date_from)s"
+            params['date_from'] = filters['date_from']
+        if 'date_to' in filters:
+            query += " AND timestamp <= %(date_to)s"
+            params['date_to'] = filters['date_to']
+        if 'passed_threshold' in filters:
+            query += " AND passed_threshold = %(passed_threshold)s"
+            params['passed_threshold'] = filters['passed_threshold']
+    
+    query += f" ORDER BY timestamp DESC LIMIT {int(limit)}"
+    return query, params
+
 
 class EvaluationDB:
-    """Handles database operations for agent evaluation metrics"""
+    """
+    Handles database operations for agent evaluation metrics
+    
+    Connections come from a psycopg2 ThreadedConnectionPool (opened on first
+    use) instead of a new connection per call. Checkout waits up to
+    DB_POOL_TIMEOUT seconds when all DB_MAX_CONNECTIONS are busy; a
+    connection idle for longer than DB_HEALTH_CHECK_INTERVAL is probed with
+    SELECT 1 before reuse, and broken connections are discarded. A
+    connection checked in after close() is closed instead of pooled.
+    Counters are updated under the pool lock since callers share the
+    instance across threads.
+    """
+    
+    def __init__(self, min_connections: Optional[int] = None, max_connections: Optional[int] = None):
+        self.db_config = connection_settings()
+        self.min_connections = min_connections or int(os.getenv('DB_MIN_CONNECTIONS', '1'))
+        self.max_connections = max(self.min_connections, max_connections or int(os.getenv('DB_MAX_CONNECTIONS', '20')))
+        self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+        self.health_check_interval = float(os.getenv('DB_HEALTH_CHECK_INTERVAL', '30'))
+        
+        self._pool: Optional[pg_pool.ThreadedConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self._last_used: Dict[int, float] = {}
+        
+        self.checkouts = 0
+        self.in_use = 0
+        self.wait_seconds = 0.0
+        self.health_check_failures = 0
+        self.discarded = 0
+    
+    def _get_pool(self) -> pg_pool.ThreadedConnectionPool:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = pg_pool.ThreadedConnectionPool(self.min_connections, self.max_connections, **self.db_config)
+                logger.info(f"🗄️  Evaluation DB pool opened ({self.min_connections}-{self.max_connections} connections)")
+            return self._pool
     
-    def __init__(self):
-        self.db_config = {
-            'host': os.getenv('DB_HOST', 'localhost'),
-            'port': os.getenv('DB_PORT', '5432'),
-            'database': os.getenv('DB_NAME', 'mf_agent_eval'),
-            'user': os.getenv('DB_USER', 'postgres'),
-            'password': os.getenv('DB_PASSWORD', 'postgres')
-        }
+    def _healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is None or time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+    
+    def _discard(self, pool: pg_pool.ThreadedConnectionPool, conn):
+        self._last_used.pop(id(conn), None)
+        with self._pool_lock:
+            self.discarded += 1
+        try:
+            pool.putconn(conn, close=True)
+        except pg_pool.PoolError:
+            pass
+    
+    def _checkout(self):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise pg_pool.PoolError(f"No database connection free within {self.pool_timeout}s")
+        try:
+            pool = self._get_pool()
+            for _ in range(self.max_connections + 1):
+                conn = pool.getconn()
+                if self._healthy(conn):
+                    break
+                with self._pool_lock:
+                    self.health_check_failures += 1
+                self._discard(pool, conn)
+            else:
+                raise pg_pool.PoolError("No healthy database connection available")
+        except Exception:
+            self._slots.release()
+            raise
+        with self._pool_lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.wait_seconds += time.monotonic() - started
+        return pool, conn
+    
+    def _checkin(self, pool: pg_pool.ThreadedConnectionPool, conn, broken: bool):
+        try:
+            if pool is not self._pool:
+                # close() ran while this connection was out; its pool is gone
+                self._last_used.pop(id(conn), None)
+                conn.close()
+            elif broken or conn.closed:
+                self._discard(pool, conn)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+                pool.putconn(conn)
+        finally:
+            with self._pool_lock:
+                self.in_use -= 1
+            self._slots.release()
     
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = None
+        """Context manager for pooled database connections"""
+        pool, conn = self._checkout()
+        broken = False
         try:
-            conn = psycopg2.connect(**self.db_config)
             yield conn
             conn.commit()
         except Exception as e:
-            if conn:
-                conn.rollback()
+            # Connection-level failures (not statement timeouts) mean the connection can't be reused
+            broken = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)) and \
+                not isinstance(e, psycopg2.extensions.QueryCanceledError)
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
             logger.error(f"Database error: {e}")
             raise
         finally:
-            if conn:
-                conn.close()
+            self._checkin(pool, conn, broken)
+    
+    def close(self):
+        """Close every pooled connection"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+                self._last_used.clear()
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        with self._pool_lock:
+            return {
+                "open": self._pool is not None,
+                "min_connections": self.min_connections,
+                "max_connections": self.max_connections,
+                "in_use": self.in_use,
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(1000 * self.wait_seconds / self.checkouts, 2) if self.checkouts else 0.0,
+                "health_check_failures": self.health_check_failures,
+                "discarded": self.discarded
+            }
     
     def save_evaluation(self, data: Dict[str, Any]) -> int:
         """
@@ -54,44 +265,10 @@ class EvaluationDB:
         Returns:
             ID of inserted record
         """
-        query = """
-            INSERT INTO agent_evaluations (
-                session_id, user_id, user_name, user_prompt, agent_response,
-                conversation_turn, intent_predicted, expected_intent, intent_confidence,
-                intent_match, entities_extracted, threshold_used, passed_threshold,
-                fallback_triggered, relevance_score, hallucination_score, faithfulness_score,
-                contextual_relevance, answer_correctness, total_latency_ms, llm_latency_ms,
-                tool_latency_ms, api_latency_ms, api_source, tools_used, retrieval_path,
-                num_tool_calls, contains_disclaimer, risk_detection_flag, pii_detected,
-                response_length, llm_model, agent_version, toolchain_version, environment,
-                error_occurred, error_message, retry_count
-            ) VALUES (
-                %(session_id)s, %(user_id)s, %(user_name)s, %(user_prompt)s, %(agent_response)s,
-                %(conversation_turn)s, %(intent_predicted)s, %(expected_intent)s, 
-                %(intent_confidence)s, %(intent_match)s, %(entities_extracted)s,
-                %(threshold_used)s, %(passed_threshold)s, %(fallback_triggered)s,
-                %(relevance_score)s, %(hallucination_score)s, %(faithfulness_score)s,
-                %(contextual_relevance)s, %(answer_correctness)s, %(total_latency_ms)s,
-                %(llm_latency_ms)s, %(tool_latency_ms)s, %(api_latency_ms)s,
-                %(api_source)s, %(tools_used)s, %(retrieval_path)s, %(num_tool_calls)s,
-                %(contains_disclaimer)s, %(risk_detection_flag)s, %(pii_detected)s,
-                %(response_length)s, %(llm_model)s, %(agent_version)s, %(toolchain_version)s,
-                %(environment)s, %(error_occurred)s, %(error_message)s, %(retry_count)s
-            ) RETURNING id
-        """
-        
         try:
-            import json
-            # Convert dict/list fields to JSON strings for PostgreSQL storage
-            data_copy = data.copy()
-            if isinstance(data_copy.get('entities_extracted'), dict):
-                data_copy['entities_extracted'] = json.dumps(data_copy['entities_extracted'])
-            if isinstance(data_copy.get('tools_used'), (list, dict)):
-                data_copy['tools_used'] = json.dumps(data_copy['tools_used'])
-            
             with self.get_connection() as conn:
                 with conn.cursor() as cur:
-                    cur.execute(query, data_copy)
+                    cur.execute(SAVE_EVALUATION_SQL, evaluation_row(data))
                     eval_id = cur.fetchone()[0]
                     logger.info(f"Saved evaluation record with ID: {eval_id}")
                     return eval_id
@@ -104,27 +281,7 @@ class EvaluationDB:
                        limit: int = 100) -> List[Dict[str, Any]]:
         """Retrieve evaluation records with optional filters"""
         
-        query = "SELECT * FROM agent_evaluations WHERE 1=1"
-        params = {}
-        
-        if filters:
-            if 'session_id' in filters:
-                query += " AND session_id = %(session_id)s"
-                params['session_id'] = filters['session_id']
-            if 'intent' in filters:
-                query += " AND intent_predicted = %(intent)s"
-                params['intent'] = filters['intent']
-            if 'date_from' in filters:
-                query += " AND timestamp >= %(date_from)s"
-                params['date_from'] = filters['date_from']
-            if 'date_to' in filters:
-                query += " AND timestamp <= %(date_to)s"
-                params['date_to'] = filters['date_to']
-            if 'passed_threshold' in filters:
-                query += " AND passed_threshold = %(passed_threshold)s"
-                params['passed_threshold'] = filters['passed_threshold']
-        
-        query += f" ORDER BY timestamp DESC LIMIT {limit}"
+        query, params = evaluations_query(filters, limit)
         
         try:
             with self.get_connection() as conn:
@@ -139,27 +296,10 @@ class EvaluationDB:
     def get_performance_summary(self, days: int = 7) -> Dict[str, Any]:
         """Get aggregated performance metrics for the last N days"""
         
-        query = """
-            SELECT 
-                COUNT(*) as total_queries,
-                AVG(relevance_score) as avg_relevance,
-                AVG(hallucination_score) as avg_hallucination,
-                AVG(faithfulness_score) as avg_faithfulness,
-                AVG(total_latency_ms) as avg_latency,
-                SUM(CASE WHEN passed_threshold THEN 1 ELSE 0 END)::FLOAT / COUNT(*) as pass_rate,
-                SUM(CASE WHEN error_occurred THEN 1 ELSE 0 END)::FLOAT / COUNT(*) as error_rate,
-                intent_predicted,
-                COUNT(*) as intent_count
-            FROM agent_evaluations
-            WHERE timestamp >= NOW() - INTERVAL '%s days'
-            GROUP BY intent_predicted
-            ORDER BY intent_count DESC
-        """
-        
         try:
             with self.get_connection() as conn:
                 with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                    cur.execute(query, (days,))
+                    cur.execute(PERFORMANCE_SUMMARY_SQL, {'days': days})
                     results = cur.fetchall()
                     return {
                         'summary': dict(results[0]) if results else {},
@@ -210,6 +350,33 @@ class EvaluationDB:
             logger.error(f"Failed to get test cases: {e}")
             return []
     
+    def get_scored_test_queries(self, agent_version: str) -> set:
+        """
+        (user_prompt, expected_intent) pairs already scored without error for an agent version
+        
+        Judge scores that failed to parse are stored as NULL, so a row only
+        counts when every always-scored judge metric is present.
+        """
+        
+        query = """
+            SELECT DISTINCT user_prompt, expected_intent FROM agent_evaluations
+            WHERE agent_version = %(agent_version)s
+              AND expected_intent IS NOT NULL
+              AND error_occurred = FALSE
+              AND relevance_score IS NOT NULL
+              AND faithfulness_score IS NOT NULL
+              AND hallucination_score IS NOT NULL
+        """
+        
+        try:
+            with self.get_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query, {'agent_version': agent_version})
+                    return {(row[0], row[1]) for row in cur.fetchall()}
+        except Exception as e:
+            logger.error(f"Failed to get scored test queries: {e}")
+            return set()
+    
     def create_threshold_experiment(self, name: str, threshold: float, 
                                    notes: Optional[str] = None) -> int:
         """Create a new threshold experiment"""
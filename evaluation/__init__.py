@@ -1,5 +1,8 @@
 """Evaluation module for agent metrics and testing"""
 
 from .pipeline import EvaluationPipeline, get_evaluation_pipeline
+from .background import EvaluationQueue
+from .judge import LLMJudge
+from .judge_cache import JudgeScoreCache
 
-__all__ = ['EvaluationPipeline', 'get_evaluation_pipeline']
+__all__ = ['EvaluationPipeline', 'get_evaluation_pipeline', 'EvaluationQueue', 'LLMJudge', 'JudgeScoreCache']
@@ -3,11 +3,13 @@ Agent wrapper with integrated evaluation pipeline
 Automatically logs and evaluates every interaction
 """
 
+import asyncio
 import time
 import uuid
 from typing import Dict, Any, Optional, List
 
 from agent.core import MutualFundsAgent
+from agent.admission import Priority
 from agent.config import AgentConfig
 from evaluation.pipeline import get_evaluation_pipeline
 from utils.logger import get_logger
@@ -24,7 +26,7 @@ class EvaluatedAgent:
     def __init__(self, config: Optional[AgentConfig] = None):
         self.config = config or AgentConfig()
         self.agent = MutualFundsAgent(self.config)
-        self.evaluation_pipeline = get_evaluation_pipeline()
+        self.evaluation_pipeline = get_evaluation_pipeline(self.config, self.agent.llm_rate_limiter)
         self.session_conversations = {}  # Track conversation turns per session
         
     async def process_request_with_evaluation(
@@ -83,6 +85,8 @@ class EvaluatedAgent:
             agent_response = await self.agent.process_request(
                 user_input=user_prompt,
                 user_name=user_name,
+                session_id=session_id,
+                priority=Priority.BATCH,
                 **kwargs
             )
             
@@ -114,8 +118,9 @@ class EvaluatedAgent:
                 'user_id': kwargs.get('user_id')
             }
             
-            # Run evaluation
-            evaluation_results = self.evaluation_pipeline.evaluate_interaction(
+            # Run evaluation (blocking judge calls run in a thread so concurrent cases keep going)
+            evaluation_results = await asyncio.to_thread(
+                self.evaluation_pipeline.evaluate_interaction,
                 user_prompt=user_prompt,
                 agent_response=agent_response,
                 session_id=session_id,
@@ -151,7 +156,8 @@ class EvaluatedAgent:
             
             error_response = f"I encountered an error: {str(e)}. Please try rephrasing your question."
             
-            evaluation_results = self.evaluation_pipeline.evaluate_interaction(
+            evaluation_results = await asyncio.to_thread(
+                self.evaluation_pipeline.evaluate_interaction,
                 user_prompt=user_prompt,
                 agent_response=error_response,
                 session_id=session_id,
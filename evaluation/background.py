@@ -0,0 +1,201 @@
+"""
+Background evaluation queue that keeps judge calls off the chat hot path
+"""
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+
+from agent.config import AgentConfig
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OVERFLOW_POLICIES = ("drop", "sample")
+
+@dataclass
+class EvaluationJob:
+    """Arguments for one EvaluationPipeline.evaluate_interaction call"""
+    kwargs: Dict[str, Any]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+class EvaluationQueue:
+    """
+    Bounded in-process queue of evaluations served by a pool of async workers.
+
+    submit() never waits: the chat handler hands over the turn and returns.
+    Each worker runs the blocking evaluate_interaction (judge LLM calls plus
+    the database insert) in a thread, so the event loop keeps serving chat
+    while evaluations run. Backpressure: with the "drop" policy jobs are
+    rejected only when the queue is full; with "sample" only `sample_rate`
+    of new jobs are admitted once depth passes `sample_watermark` of the
+    capacity, and none when full. drain() stops intake and waits for the
+    backlog on shutdown. With an open AsyncEvaluationDB only the scoring
+    runs in a thread; the insert goes through the async pool.
+    """
+
+    def __init__(self, pipeline, workers: int = 2, max_size: int = 500, overflow: str = "sample",
+                 sample_rate: float = 0.2, sample_watermark: float = 0.8, drain_timeout: float = 30.0,
+                 async_db=None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}' (expected one of {OVERFLOW_POLICIES})")
+        self.pipeline = pipeline
+        self.workers = max(1, workers)
+        self.max_size = max(1, max_size)
+        self.overflow = overflow
+        self.sample_rate = sample_rate
+        self.sample_watermark = sample_watermark
+        self.drain_timeout = drain_timeout
+        self.async_db = async_db
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        self._accepting = True
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped_full = 0
+        self.sampled_out = 0
+        self.rejected_shutdown = 0  # refused after drain() started; not backpressure
+        self.in_progress = 0
+        self._lags = deque(maxlen=1000)  # seconds from submit to a worker picking the job up
+        self._durations = deque(maxlen=1000)  # seconds spent in evaluate_interaction
+
+    @classmethod
+    def from_config(cls, pipeline, config: AgentConfig, async_db=None) -> 'EvaluationQueue':
+        return cls(
+            pipeline,
+            workers=config.EVAL_QUEUE_WORKERS,
+            max_size=config.EVAL_QUEUE_MAX_SIZE,
+            overflow=config.EVAL_QUEUE_OVERFLOW,
+            sample_rate=config.EVAL_QUEUE_SAMPLE_RATE,
+            sample_watermark=config.EVAL_QUEUE_SAMPLE_WATERMARK,
+            drain_timeout=config.EVAL_QUEUE_DRAIN_TIMEOUT,
+            async_db=async_db
+        )
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """Start the worker pool on the running event loop (idempotent)"""
+        if self._tasks:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._accepting = True
+        self._tasks = [asyncio.create_task(self._worker(i), name=f"evaluation-worker-{i}")
+                       for i in range(self.workers)]
+        logger.info(f"🧵 Evaluation queue started ({self.workers} workers, capacity {self.max_size}, overflow={self.overflow})")
+
+    def _admit(self) -> bool:
+        depth = self.depth
+        if depth >= self.max_size:
+            self.dropped_full += 1
+            return False
+        if self.overflow == "sample" and depth >= self.sample_watermark * self.max_size:
+            if random.random() >= self.sample_rate:
+                self.sampled_out += 1
+                return False
+        return True
+
+    def submit(self, **kwargs) -> bool:
+        """
+        Queue an evaluate_interaction call without waiting for it.
+
+        Returns False when the job was dropped (queue full, sampled out, or
+        shutting down); the caller carries on either way.
+        """
+        if not self._accepting:
+            self.rejected_shutdown += 1
+            return False
+        self.start()
+        if not self._admit():
+            logger.debug(f"Evaluation dropped (depth {self.depth}/{self.max_size})")
+            return False
+        self._queue.put_nowait(EvaluationJob(kwargs))
+        self.submitted += 1
+        return True
+
+    async def _worker(self, index: int):
+        while True:
+            job = await self._queue.get()
+            started = time.monotonic()
+            with self._lock:
+                self._lags.append(started - job.enqueued_at)
+                self.in_progress += 1
+            try:
+                if self.async_db is not None and self.async_db.is_open:
+                    evaluation = await asyncio.to_thread(self.pipeline.score_interaction, **job.kwargs)
+                    evaluation['eval_id'] = await self.async_db.save_evaluation(evaluation)
+                else:
+                    await asyncio.to_thread(self.pipeline.evaluate_interaction, **job.kwargs)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Background evaluation failed (worker {index}): {e}")
+            finally:
+                with self._lock:
+                    self._durations.append(time.monotonic() - started)
+                    self.in_progress -= 1
+                self._queue.task_done()
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Stop accepting jobs, wait for the backlog, then stop the workers"""
+        self._accepting = False
+        if not self._tasks:
+            return
+        timeout = self.drain_timeout if timeout is None else timeout
+        pending = self.depth + self.in_progress
+        if pending:
+            logger.info(f"⏳ Draining {pending} pending evaluations (up to {timeout}s)")
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Evaluation drain timed out; abandoning {self.depth + self.in_progress} evaluations")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lags = list(self._lags)
+            durations = list(self._durations)
+            in_progress = self.in_progress
+        return {
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "workers": self.workers,
+            "running": bool(self._tasks),
+            "in_progress": in_progress,
+            "overflow_policy": self.overflow,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped_full": self.dropped_full,
+            "sampled_out": self.sampled_out,
+            "rejected_shutdown": self.rejected_shutdown,
+            "lag_ms": {
+                "avg": round(1000 * sum(lags) / len(lags), 1) if lags else 0.0,
+                "p95": round(1000 * _percentile(lags, 0.95), 1),
+                "max": round(1000 * max(lags), 1) if lags else 0.0
+            },
+            "evaluation_ms": {
+                "avg": round(1000 * sum(durations) / len(durations), 1) if durations else 0.0,
+                "p95": round(1000 * _percentile(durations, 0.95), 1)
+            }
+        }
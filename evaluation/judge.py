@@ -0,0 +1,344 @@
+"""
+LLM-as-judge scoring for relevance, faithfulness, contextual relevance and hallucination
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
+
+from agent.config import AgentConfig
+from evaluation.judge_cache import JudgeScoreCache, make_judge_key
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JUDGE_MODES = ("batched", "per_metric")
+METRICS = ("relevance", "faithfulness", "contextual_relevance", "hallucination")
+# Placeholder used when a per-metric reply has no number in it (flagged, never cached)
+PARSE_DEFAULTS = {"relevance": 0.85, "faithfulness": 0.85, "contextual_relevance": 0.85, "hallucination": 0.15}
+CONTEXT_CHARS = 1000
+
+RELEVANCE_PROMPT = """Evaluate how relevant the response is to the query. Rate on a scale of 0.0 to 1.0.
+
+QUERY: {query}
+
+RESPONSE: {response}
+
+EVALUATION CRITERIA:
+- 1.0 = Directly answers the question with complete information
+- 0.8-0.9 = Answers the question well with good detail
+- 0.6-0.7 = Answers the question but could be more complete
+- 0.4-0.5 = Partially answers, missing some key points
+- 0.0-0.3 = Does not address the question or completely off-topic
+
+YOUR SCORE (respond with ONLY a decimal number like 0.85 or 1.0):"""
+
+FAITHFULNESS_PROMPT = """Evaluate if the response is faithful to (grounded in) the provided context. Rate on a scale of 0.0 to 1.0.
+
+CONTEXT: {context}
+
+RESPONSE: {response}
+
+EVALUATION CRITERIA:
+- 1.0 = Every fact/number in response is directly from the context
+- 0.8-0.9 = Response is well-grounded, minor reasonable inferences
+- 0.6-0.7 = Mostly grounded but has some unsupported details
+- 0.4-0.5 = Mix of grounded and ungrounded information
+- 0.0-0.3 = Contains many claims not supported by context
+
+YOUR SCORE (respond with ONLY a decimal number like 0.95 or 1.0):"""
+
+CONTEXTUAL_RELEVANCE_PROMPT = """Evaluate if the provided context contains relevant information to answer the query. Rate on a scale of 0.0 to 1.0.
+
+QUERY: {query}
+
+CONTEXT: {context}
+
+EVALUATION CRITERIA:
+- 1.0 = Context has all information needed to answer the query
+- 0.8-0.9 = Context is highly relevant
+- 0.6-0.7 = Context is somewhat relevant
+- 0.4-0.5 = Context has limited relevance
+- 0.0-0.3 = Context is not relevant to the query
+
+YOUR SCORE (respond with ONLY a decimal number like 0.9 or 1.0):"""
+
+HALLUCINATION_PROMPT = """Evaluate the hallucination level in the response. Hallucination means making up facts not in the context. Rate on a scale of 0.0 to 1.0.
+
+CONTEXT: {context}
+
+RESPONSE: {response}
+
+EVALUATION CRITERIA:
+- 0.0 = No hallucination - all facts are from context or reasonable general knowledge
+- 0.1-0.2 = Minor hallucinations or very reasonable inferences
+- 0.3-0.4 = Some unsupported claims
+- 0.5-0.7 = Multiple fabricated facts
+- 0.8-1.0 = Significant fabrication of data/numbers
+
+YOUR SCORE (respond with ONLY a decimal number like 0.1 or 0.0):"""
+
+METRIC_PROMPTS = {
+    "relevance": RELEVANCE_PROMPT,
+    "faithfulness": FAITHFULNESS_PROMPT,
+    "contextual_relevance": CONTEXTUAL_RELEVANCE_PROMPT,
+    "hallucination": HALLUCINATION_PROMPT
+}
+
+BATCHED_PROMPT = """Evaluate an assistant's response on four metrics, each on a scale of 0.0 to 1.0.
+
+QUERY: {query}
+
+CONTEXT: {context}
+
+RESPONSE: {response}
+
+METRICS:
+- relevance: does the response address the query? 1.0 = directly answers with complete information, 0.6-0.7 = answers but could be more complete, 0.0-0.3 = off-topic
+- faithfulness: is the response grounded in the context? 1.0 = every fact/number is from the context, 0.6-0.7 = some unsupported details, 0.0-0.3 = many unsupported claims
+- contextual_relevance: does the context contain what is needed to answer the query? 1.0 = all needed information, 0.6-0.7 = somewhat relevant, 0.0-0.3 = not relevant
+- hallucination: does the response make up facts not in the context? 0.0 = none (facts from context or reasonable general knowledge), 0.3-0.4 = some unsupported claims, 0.8-1.0 = significant fabrication of data/numbers
+
+Respond with ONLY a JSON object with these four keys and decimal scores, for example:
+{{"relevance": 0.9, "faithfulness": 0.95, "contextual_relevance": 0.85, "hallucination": 0.1}}"""
+
+# Changes whenever a prompt is edited, so cached scores from older prompts are never reused
+PROMPT_VERSION = hashlib.sha256(
+    "\x00".join([BATCHED_PROMPT] + [METRIC_PROMPTS[m] for m in METRICS]).encode("utf-8")
+).hexdigest()[:16]
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+def parse_score(text: str) -> Optional[float]:
+    """First number in a judge reply, scaled into 0.0-1.0 (85 -> 0.85), or None"""
+    match = re.search(r'([0-1](?:\.\d+)?)', text) or re.search(r'(\d+)', text)
+    if not match:
+        return None
+    score = float(match.group(1))
+    if score > 1.0:
+        score = score / 100.0
+    return max(0.0, min(1.0, score))
+
+def parse_batched_scores(text: str) -> Dict[str, float]:
+    """Valid metric scores from a batched JSON reply; missing or malformed metrics are left out"""
+    match = _JSON_OBJECT.search(text)
+    if not match:
+        return {}
+    try:
+        payload = json.loads(match.group(0))
+    except ValueError:
+        return {}
+    if not isinstance(payload, dict):
+        return {}
+    scores = {}
+    for metric in METRICS:
+        value = payload.get(metric)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        value = float(value)
+        if value > 1.0:
+            value = value / 100.0
+        if 0.0 <= value <= 1.0:
+            scores[metric] = value
+    return scores
+
+def _usage(result) -> Tuple[int, int]:
+    """(prompt_tokens, completion_tokens) reported for an LLM call"""
+    usage = getattr(result, "usage_metadata", None)
+    if usage:
+        return int(usage.get("input_tokens", 0)), int(usage.get("output_tokens", 0))
+    usage = (getattr(result, "response_metadata", None) or {}).get("token_usage") or {}
+    return int(usage.get("prompt_tokens", 0)), int(usage.get("completion_tokens", 0))
+
+class LLMJudge:
+    """
+    Scores an interaction with a long-lived ChatOpenAI client.
+
+    In "batched" mode one call returns all four metrics as JSON; metrics the
+    reply is missing or gets wrong are re-scored with their own prompts.
+    In "per_metric" mode each metric gets its own call. Per-metric calls run
+    concurrently on a small thread pool, since evaluate_interaction is
+    synchronous. With a JudgeScoreCache, an interaction already scored with
+    the same prompts and model is answered from the cache. Metrics that fell
+    back to PARSE_DEFAULTS are listed under "defaulted_metrics" and keep the
+    interaction out of the cache.
+    """
+
+    def __init__(self, llm, mode: str = "batched", concurrent: bool = True,
+                 cache: Optional[JudgeScoreCache] = None):
+        if mode not in JUDGE_MODES:
+            raise ValueError(f"Unknown judge mode '{mode}' (expected one of {JUDGE_MODES})")
+        self.llm = llm
+        self.mode = mode
+        self.concurrent = concurrent
+        self.cache = cache
+        self.model = getattr(llm, "model_name", None) or ""
+        self._executor = ThreadPoolExecutor(max_workers=len(METRICS), thread_name_prefix="judge") if concurrent else None
+        self._lock = threading.Lock()
+
+        self.evaluations = 0
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.batched_parse_failures = 0
+        self.fallback_metrics = 0
+        self.defaulted_metrics = 0
+
+    @classmethod
+    def from_config(cls, config: AgentConfig, rate_limiter=None, mode: Optional[str] = None,
+                    concurrent: bool = True) -> Optional['LLMJudge']:
+        """Judge on the configured endpoint, or None when no API key is available"""
+        from langchain_openai import ChatOpenAI
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        api_key = config.MOONSHOT_API_KEY or os.getenv('MOONSHOT_API_KEY') or os.getenv('GROQ_API_KEY')
+        base_url = config.MOONSHOT_BASE_URL or os.getenv('MOONSHOT_BASE_URL') or "https://api.groq.com/openai/v1"
+        model = config.MOONSHOT_MODEL or os.getenv('MOONSHOT_MODEL') or "moonshotai/kimi-k2-instruct"
+        if not api_key:
+            logger.warning("No API key available for Groq metrics calculation")
+            return None
+
+        client_kwargs = {}
+        if rate_limiter is not None:
+            import httpx
+            client_kwargs["http_client"] = httpx.Client(event_hooks=rate_limiter.httpx_hooks())
+        llm = ChatOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            model=model,
+            temperature=0.0,
+            max_retries=config.LLM_MAX_RETRIES,
+            **client_kwargs
+        )
+        return cls(llm, mode=mode or config.EVAL_JUDGE_MODE, concurrent=concurrent,
+                   cache=JudgeScoreCache.from_config(config))
+
+    def _invoke(self, prompt: str) -> str:
+        result = self.llm.invoke(prompt)
+        prompt_tokens, completion_tokens = _usage(result)
+        with self._lock:
+            self.llm_calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return result.content.strip()
+
+    def score_metric(self, metric: str, query: str, response: str, context: List[str]) -> Tuple[Optional[float], bool]:
+        """
+        One metric from its own prompt, as (score, defaulted).
+
+        The score is None when the metric doesn't apply or the call fails;
+        defaulted is True when the reply had no number and the score is the
+        PARSE_DEFAULTS placeholder.
+        """
+        if metric == "contextual_relevance" and not context:
+            return None, False
+        context_text = "\n".join(context)[:CONTEXT_CHARS] if context else "No context provided"
+        try:
+            text = self._invoke(METRIC_PROMPTS[metric].format(query=query, response=response, context=context_text))
+        except Exception as e:
+            logger.warning(f"{metric} calculation failed: {e}")
+            return None, False
+        logger.info(f"🔍 RAW {metric.upper()} RESPONSE: '{text}'")
+        score = parse_score(text)
+        if score is None:
+            logger.warning(f"⚠️  Could not parse {metric} from: '{text[:80]}' - defaulting to {PARSE_DEFAULTS[metric]}")
+            with self._lock:
+                self.defaulted_metrics += 1
+            return PARSE_DEFAULTS[metric], True
+        return score, False
+
+    def score_per_metric(self, query: str, response: str, context: List[str],
+                         metrics: Tuple[str, ...] = METRICS) -> Tuple[Dict[str, Optional[float]], List[str]]:
+        """Scores for `metrics`, plus the metrics that fell back to PARSE_DEFAULTS"""
+        if self._executor is None or len(metrics) == 1:
+            results = {metric: self.score_metric(metric, query, response, context) for metric in metrics}
+        else:
+            futures = {metric: self._executor.submit(self.score_metric, metric, query, response, context)
+                       for metric in metrics}
+            results = {metric: future.result() for metric, future in futures.items()}
+        scores = {metric: score for metric, (score, _) in results.items()}
+        return scores, [metric for metric, (_, defaulted) in results.items() if defaulted]
+
+    def score_batched(self, query: str, response: str, context: List[str]) -> Tuple[Dict[str, Optional[float]], List[str]]:
+        context_text = "\n".join(context)[:CONTEXT_CHARS] if context else "No context provided"
+        try:
+            text = self._invoke(BATCHED_PROMPT.format(query=query, response=response, context=context_text))
+            scores = parse_batched_scores(text)
+        except Exception as e:
+            logger.warning(f"Batched judge call failed: {e}")
+            text, scores = "", {}
+
+        if not context:
+            scores["contextual_relevance"] = None
+        missing = tuple(metric for metric in METRICS if metric not in scores)
+        if not missing:
+            return scores, []
+        with self._lock:
+            self.batched_parse_failures += 1
+            self.fallback_metrics += len(missing)
+        logger.warning(f"⚠️  Batched judge reply missing {', '.join(missing)} ({text[:80]!r}); scoring them individually")
+        fallback, defaulted = self.score_per_metric(query, response, context, missing)
+        scores.update(fallback)
+        return scores, defaulted
+
+    def _cache_key(self, query: str, response: str, context: List[str]) -> str:
+        context_text = "\n".join(context)[:CONTEXT_CHARS] if context else ""
+        return make_judge_key(f"{self.mode}:{PROMPT_VERSION}", self.model, query, response, context_text)
+
+    @staticmethod
+    def _complete(metrics: Dict[str, Optional[float]], context: List[str]) -> bool:
+        """Every metric that applies has a real score (failed calls are not cached)"""
+        required = METRICS if context else tuple(m for m in METRICS if m != "contextual_relevance")
+        return all(metrics.get(metric) is not None for metric in required)
+
+    def score(self, query: str, response: str, context: List[str]) -> Dict[str, Optional[float]]:
+        """All four metrics, the answer_correctness composite and the list of defaulted metrics"""
+        key = self._cache_key(query, response, context) if self.cache is not None else None
+        metrics = self.cache.get(key) if key else None
+        defaulted: List[str] = []
+        if metrics is not None:
+            logger.info("💾 Judge scores served from cache")
+        else:
+            if self.mode == "batched":
+                metrics, defaulted = self.score_batched(query, response, context)
+            else:
+                metrics, defaulted = self.score_per_metric(query, response, context)
+            # Placeholder scores would otherwise be replayed as real ones forever
+            if key and not defaulted and self._complete(metrics, context):
+                self.cache.set(key, {m: metrics.get(m) for m in METRICS}, f"{self.mode}:{PROMPT_VERSION}", self.model)
+        with self._lock:
+            self.evaluations += 1
+
+        if metrics.get('relevance') is not None and metrics.get('faithfulness') is not None:
+            metrics['answer_correctness'] = metrics['relevance'] * 0.7 + metrics['faithfulness'] * 0.3
+        else:
+            metrics['answer_correctness'] = None
+        metrics['defaulted_metrics'] = defaulted
+        return metrics
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if self.cache is not None:
+            self.cache.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "evaluations": self.evaluations,
+                "llm_calls": self.llm_calls,
+                "calls_per_evaluation": round(self.llm_calls / self.evaluations, 2) if self.evaluations else 0.0,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "batched_parse_failures": self.batched_parse_failures,
+                "fallback_metrics": self.fallback_metrics,
+                "defaulted_metrics": self.defaulted_metrics,
+                "prompt_version": PROMPT_VERSION,
+                "cache": self.cache.get_stats() if self.cache is not None else None
+            }
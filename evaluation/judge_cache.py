@@ -0,0 +1,118 @@
+"""
+Content-addressed SQLite cache of LLM judge scores
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, List
+
+from agent.config import AgentConfig
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+def make_judge_key(prompt_version: str, model: str, query: str, response: str, context_text: str) -> str:
+    """SHA-256 over everything the judge sees; any change gives a new key"""
+    payload = json.dumps([prompt_version, model, query, response, context_text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class JudgeScoreCache:
+    """
+    Judge scores keyed by make_judge_key, kept in a local SQLite file.
+
+    Judge calls run at temperature 0, so an unchanged (prompt version,
+    model, query, response, truncated context) tuple gets the stored scores
+    back without an LLM call - test suite reruns, replays and threshold
+    experiments re-score only the outputs that changed. Entries don't
+    expire; editing a judge prompt changes the prompt version and with it
+    every key.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS judge_scores ("
+            "key TEXT PRIMARY KEY, scores TEXT NOT NULL, prompt_version TEXT NOT NULL, "
+            "model TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @classmethod
+    def from_config(cls, config: AgentConfig) -> Optional['JudgeScoreCache']:
+        if not config.JUDGE_CACHE_ENABLED or not config.JUDGE_CACHE_PATH:
+            return None
+        try:
+            return cls(config.JUDGE_CACHE_PATH)
+        except sqlite3.Error as e:
+            logger.warning(f"Judge score cache unavailable at {config.JUDGE_CACHE_PATH}: {e}")
+            return None
+
+    def get(self, key: str) -> Optional[Dict[str, Optional[float]]]:
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT scores FROM judge_scores WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Judge score cache read failed: {e}")
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, scores: Dict[str, Optional[float]], prompt_version: str, model: str):
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO judge_scores (key, scores, prompt_version, model, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(scores), prompt_version, model, time.time())
+                )
+                self._conn.commit()
+            self.stores += 1
+        except sqlite3.Error as e:
+            logger.warning(f"Judge score cache write failed: {e}")
+
+    def purge(self, keep_prompt_versions: Optional[List[str]] = None) -> int:
+        """Delete entries from other prompt versions (or everything); returns the count deleted"""
+        with self._lock:
+            if keep_prompt_versions:
+                placeholders = ",".join("?" for _ in keep_prompt_versions)
+                cursor = self._conn.execute(
+                    f"DELETE FROM judge_scores WHERE prompt_version NOT IN ({placeholders})", keep_prompt_versions
+                )
+            else:
+                cursor = self._conn.execute("DELETE FROM judge_scores")
+            self._conn.commit()
+            return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM judge_scores").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
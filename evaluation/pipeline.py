@@ -3,6 +3,7 @@ Evaluation Pipeline Integration with DeepEval
 Calculates and stores all evaluation metrics for agent interactions
 """
 
+import threading
 import time
 from typing import Dict, Any, Optional, List
 from datetime import datetime
@@ -22,6 +23,8 @@ except ImportError:
 
 from database.db import get_eval_db
 from agent.config import AgentConfig
+from agent.rate_limiter import LLMRateLimiter
+from evaluation.judge import LLMJudge
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -33,15 +36,24 @@ class EvaluationPipeline:
     for every agent interaction
     """
     
-    def __init__(self, config: Optional[AgentConfig] = None):
+    def __init__(self, config: Optional[AgentConfig] = None, llm_rate_limiter: Optional[LLMRateLimiter] = None):
         self.config = config or AgentConfig()
         self.db = get_eval_db()
-        self.agent_version = "1.0.0"
+        self.agent_version = self.config.AGENT_VERSION
         self.environment = self.config.environment or "development"
         
         # Initialize custom metrics using Groq instead of OpenAI
         self.use_groq_metrics = True
         
+        # Judge calls hit the same Groq endpoint as the agent, so they draw from the
+        # agent's limiter (one budget per process); None leaves the judge unpaced
+        self.llm_rate_limiter = llm_rate_limiter
+        
+        # Long-lived judge client, created on first use (see evaluation/judge.py).
+        # Queue workers and to_thread callers race for it, so creation is locked.
+        self.judge: Optional[LLMJudge] = None
+        self._judge_lock = threading.Lock()
+        
         # Initialize DeepEval metrics if available and configured with OpenAI
         deepeval_enabled = self.config.ENABLE_DEEPEVAL and DEEPEVAL_AVAILABLE
         if deepeval_enabled:
@@ -74,7 +86,7 @@ class EvaluationPipeline:
             self.contextual_metric = None
             self.hallucination_metric = None
     
-    def evaluate_interaction(
+    def score_interaction(
         self,
         user_prompt: str,
         agent_response: str,
@@ -87,7 +99,7 @@ class EvaluationPipeline:
         expected_intent: Optional[str] = None
     ) -> Dict[str, Any]:
         """
-        Evaluate a single agent interaction and store all metrics
+        Calculate all metrics for a single agent interaction without storing them
         
         Args:
             user_prompt: User's query
@@ -104,7 +116,6 @@ class EvaluationPipeline:
             Dict containing all calculated metrics
         """
         
-        start_time = time.time()
         logger.info(f"🔍 Evaluating interaction for session {session_id}")
         
         # Extract intent information
@@ -157,6 +168,7 @@ class EvaluationPipeline:
             'faithfulness_score': metrics.get('faithfulness'),
             'contextual_relevance': metrics.get('contextual_relevance'),
             'answer_correctness': metrics.get('answer_correctness'),
+            'defaulted_metrics': metrics.get('defaulted_metrics', []),  # Not a column; scores above are NULL
             
             # Performance Metrics
             'total_latency_ms': latency_data.get('total_ms', 0),
@@ -188,6 +200,40 @@ class EvaluationPipeline:
             'retry_count': metadata.get('retry_count', 0)
         }
         
+        return evaluation_data
+    
+    def evaluate_interaction(
+        self,
+        user_prompt: str,
+        agent_response: str,
+        session_id: str,
+        intent_data: Dict[str, Any],
+        retrieval_context: List[str],
+        latency_data: Dict[str, int],
+        metadata: Dict[str, Any],
+        user_name: Optional[str] = None,
+        expected_intent: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Evaluate a single agent interaction and store all metrics
+        
+        Takes the same arguments as score_interaction and returns its metrics
+        plus the stored eval_id (-1 if the insert failed)
+        """
+        
+        start_time = time.time()
+        evaluation_data = self.score_interaction(
+            user_prompt=user_prompt,
+            agent_response=agent_response,
+            session_id=session_id,
+            intent_data=intent_data,
+            retrieval_context=retrieval_context,
+            latency_data=latency_data,
+            metadata=metadata,
+            user_name=user_name,
+            expected_intent=expected_intent
+        )
+        
         # Save to database
         try:
             eval_id = self.db.save_evaluation(evaluation_data)
@@ -286,6 +332,14 @@ class EvaluationPipeline:
         
         return metrics
     
+    def _get_judge(self) -> Optional[LLMJudge]:
+        """The shared judge, created once even when several threads ask at the same time"""
+        if self.judge is None:
+            with self._judge_lock:
+                if self.judge is None:
+                    self.judge = LLMJudge.from_config(self.config, self.llm_rate_limiter)
+        return self.judge
+    
     def _calculate_groq_metrics(
         self,
         query: str,
@@ -297,20 +351,8 @@ class EvaluationPipeline:
         Provides similar metrics to DeepEval but uses Groq instead of OpenAI
         """
         try:
-            from langchain_openai import ChatOpenAI
-            import os
-            from dotenv import load_dotenv
-            
-            # Load environment variables
-            load_dotenv()
-            
-            # Get API key from config or environment
-            api_key = self.config.MOONSHOT_API_KEY or os.getenv('MOONSHOT_API_KEY') or os.getenv('GROQ_API_KEY')
-            base_url = self.config.MOONSHOT_BASE_URL or os.getenv('MOONSHOT_BASE_URL') or "https://api.groq.com/openai/v1"
-            model = self.config.MOONSHOT_MODEL or os.getenv('MOONSHOT_MODEL') or "moonshotai/kimi-k2-instruct"
-            
-            if not api_key:
-                logger.warning("No API key available for Groq metrics calculation")
+            judge = self._get_judge()
+            if judge is None:
                 return {
                     'relevance': None,
                     'hallucination': None,
@@ -319,193 +361,20 @@ class EvaluationPipeline:
                     'answer_correctness': None
                 }
             
-            # Initialize Groq LLM for metric calculation
-            llm = ChatOpenAI(
-                base_url=base_url,
-                api_key=api_key,
-                model=model,
-                temperature=0.0
-            )
-            
-            metrics = {}
-            
-            # 1. Relevance Score: Does the response address the query?
-            try:
-                relevance_prompt = f"""Evaluate how relevant the response is to the query. Rate on a scale of 0.0 to 1.0.
-
-QUERY: {query}
-
-RESPONSE: {response}
-
-EVALUATION CRITERIA:
-- 1.0 = Directly answers the question with complete information
-- 0.8-0.9 = Answers the question well with good detail
-- 0.6-0.7 = Answers the question but could be more complete
-- 0.4-0.5 = Partially answers, missing some key points
-- 0.0-0.3 = Does not address the question or completely off-topic
-
-YOUR SCORE (respond with ONLY a decimal number like 0.85 or 1.0):"""
-                
-                relevance_result = llm.invoke(relevance_prompt)
-                relevance_text = relevance_result.content.strip()
-                logger.info(f"🔍 RAW RELEVANCE RESPONSE: '{relevance_text}'")
-                
-                # Extract number from response - try multiple patterns
-                import re
-                # Try to find any decimal number first
-                relevance_match = re.search(r'([0-1](?:\.\d+)?)', relevance_text)
-                if not relevance_match:
-                    # Try finding just digits
-                    relevance_match = re.search(r'(\d+)', relevance_text)
-                
-                if relevance_match:
-                    relevance_score = float(relevance_match.group(1))
-                    # If it's a large number like 85, convert to 0.85
-                    if relevance_score > 1.0:
-                        relevance_score = relevance_score / 100.0
-                    metrics['relevance'] = max(0.0, min(1.0, relevance_score))
-                    logger.info(f"✅ Relevance score extracted: {relevance_score} from text: '{relevance_text[:80]}'")
-                else:
-                    logger.warning(f"⚠️  Could not parse relevance from: '{relevance_text}' - defaulting to 0.85")
-                    metrics['relevance'] = 0.85  # Conservative default for valid responses
-            except Exception as e:
-                logger.warning(f"Relevance calculation failed: {e}")
-                metrics['relevance'] = None
-            
-            # 2. Faithfulness Score: Is the response grounded in the context?
-            try:
-                context_text = "\n".join(context) if context else "No context provided"
-                faithfulness_prompt = f"""Evaluate if the response is faithful to (grounded in) the provided context. Rate on a scale of 0.0 to 1.0.
-
-CONTEXT: {context_text[:1000]}
-
-RESPONSE: {response}
-
-EVALUATION CRITERIA:
-- 1.0 = Every fact/number in response is directly from the context
-- 0.8-0.9 = Response is well-grounded, minor reasonable inferences
-- 0.6-0.7 = Mostly grounded but has some unsupported details
-- 0.4-0.5 = Mix of grounded and ungrounded information
-- 0.0-0.3 = Contains many claims not supported by context
-
-YOUR SCORE (respond with ONLY a decimal number like 0.95 or 1.0):"""
-                
-                faithfulness_result = llm.invoke(faithfulness_prompt)
-                faithfulness_text = faithfulness_result.content.strip()
-                logger.info(f"🔍 RAW FAITHFULNESS RESPONSE: '{faithfulness_text}'")
-                
-                import re
-                faithfulness_match = re.search(r'([0-1](?:\.\d+)?)', faithfulness_text)
-                if not faithfulness_match:
-                    faithfulness_match = re.search(r'(\d+)', faithfulness_text)
-                
-                if faithfulness_match:
-                    faithfulness_score = float(faithfulness_match.group(1))
-                    if faithfulness_score > 1.0:
-                        faithfulness_score = faithfulness_score / 100.0
-                    metrics['faithfulness'] = max(0.0, min(1.0, faithfulness_score))
-                    logger.info(f"✅ Faithfulness score: {faithfulness_score}")
-                else:
-                    logger.warning(f"⚠️  Could not parse faithfulness - defaulting to 0.85")
-                    metrics['faithfulness'] = 0.85
-            except Exception as e:
-                logger.warning(f"Faithfulness calculation failed: {e}")
-                metrics['faithfulness'] = None
+            metrics = judge.score(query, response, context)
             
-            # 3. Contextual Relevance: Is the retrieved context relevant?
-            try:
-                if context:
-                    context_text = "\n".join(context)[:1000]
-                    context_relevance_prompt = f"""Evaluate if the provided context contains relevant information to answer the query. Rate on a scale of 0.0 to 1.0.
-
-QUERY: {query}
-
-CONTEXT: {context_text}
-
-EVALUATION CRITERIA:
-- 1.0 = Context has all information needed to answer the query
-- 0.8-0.9 = Context is highly relevant
-- 0.6-0.7 = Context is somewhat relevant
-- 0.4-0.5 = Context has limited relevance
-- 0.0-0.3 = Context is not relevant to the query
-
-YOUR SCORE (respond with ONLY a decimal number like 0.9 or 1.0):"""
-                    
-                    context_result = llm.invoke(context_relevance_prompt)
-                    context_text_result = context_result.content.strip()
-                    logger.info(f"🔍 RAW CONTEXTUAL RELEVANCE RESPONSE: '{context_text_result}'")
-                    
-                    import re
-                    context_match = re.search(r'([0-1](?:\.\d+)?)', context_text_result)
-                    if not context_match:
-                        context_match = re.search(r'(\d+)', context_text_result)
-                    
-                    if context_match:
-                        context_score = float(context_match.group(1))
-                        if context_score > 1.0:
-                            context_score = context_score / 100.0
-                        metrics['contextual_relevance'] = max(0.0, min(1.0, context_score))
-                        logger.info(f"✅ Contextual relevance score: {context_score}")
-                    else:
-                        logger.warning(f"⚠️  Could not parse contextual relevance - defaulting to 0.85")
-                        metrics['contextual_relevance'] = 0.85
-                else:
-                    metrics['contextual_relevance'] = None
-            except Exception as e:
-                logger.warning(f"Contextual relevance calculation failed: {e}")
-                metrics['contextual_relevance'] = None
-            
-            # 4. Hallucination Score: Does response contain fabricated information?
-            try:
-                context_text = "\n".join(context) if context else "No context provided"
-                hallucination_prompt = f"""Evaluate the hallucination level in the response. Hallucination means making up facts not in the context. Rate on a scale of 0.0 to 1.0.
-
-CONTEXT: {context_text[:1000]}
-
-RESPONSE: {response}
-
-EVALUATION CRITERIA:
-- 0.0 = No hallucination - all facts are from context or reasonable general knowledge
-- 0.1-0.2 = Minor hallucinations or very reasonable inferences
-- 0.3-0.4 = Some unsupported claims
-- 0.5-0.7 = Multiple fabricated facts
-- 0.8-1.0 = Significant fabrication of data/numbers
-
-YOUR SCORE (respond with ONLY a decimal number like 0.1 or 0.0):"""
-                
-                hallucination_result = llm.invoke(hallucination_prompt)
-                hallucination_text = hallucination_result.content.strip()
-                logger.info(f"🔍 RAW HALLUCINATION RESPONSE: '{hallucination_text}'")
-                
-                import re
-                hallucination_match = re.search(r'([0-1](?:\.\d+)?)', hallucination_text)
-                if not hallucination_match:
-                    hallucination_match = re.search(r'(\d+)', hallucination_text)
-                
-                if hallucination_match:
-                    hallucination_score = float(hallucination_match.group(1))
-                    if hallucination_score > 1.0:
-                        hallucination_score = hallucination_score / 100.0
-                    metrics['hallucination'] = max(0.0, min(1.0, hallucination_score))
-                    logger.info(f"✅ Hallucination score: {hallucination_score}")
-                else:
-                    logger.warning(f"⚠️  Could not parse hallucination - defaulting to 0.15")
-                    metrics['hallucination'] = 0.15
-            except Exception as e:
-                logger.warning(f"Hallucination calculation failed: {e}")
-                metrics['hallucination'] = None
-            
-            # 5. Answer Correctness: Composite score
-            if metrics.get('relevance') is not None and metrics.get('faithfulness') is not None:
-                metrics['answer_correctness'] = (
-                    metrics['relevance'] * 0.7 + metrics['faithfulness'] * 0.3
-                )
-            else:
+            # Parse-failure placeholders are stored as NULL so reports and --resume never read them as scores
+            defaulted = metrics.get('defaulted_metrics') or []
+            for metric in defaulted:
+                metrics[metric] = None
+            if 'relevance' in defaulted or 'faithfulness' in defaulted:
                 metrics['answer_correctness'] = None
+            if defaulted:
+                logger.warning(f"⚠️  Unparseable judge scores stored as NULL: {', '.join(defaulted)}")
             
             # Log successful calculation
             if metrics.get('relevance') is not None:
-                logger.info(f"✅ Groq-based metrics calculated: relevance={metrics.get('relevance'):.2f}, faithfulness={metrics.get('faithfulness', 0):.2f}")
+                logger.info(f"✅ Groq-based metrics calculated ({judge.mode}): relevance={metrics.get('relevance'):.2f}, faithfulness={metrics.get('faithfulness') or 0:.2f}")
             
         except Exception as e:
             logger.error(f"Groq metrics calculation failed: {e}")
@@ -607,9 +476,10 @@ YOUR SCORE (respond with ONLY a decimal number like 0.1 or 0.0):"""
 # Singleton instance
 _pipeline_instance = None
 
-def get_evaluation_pipeline() -> EvaluationPipeline:
+def get_evaluation_pipeline(config: Optional[AgentConfig] = None,
+                            llm_rate_limiter: Optional[LLMRateLimiter] = None) -> EvaluationPipeline:
     """Get or create evaluation pipeline instance"""
     global _pipeline_instance
     if _pipeline_instance is None:
-        _pipeline_instance = EvaluationPipeline()
+        _pipeline_instance = EvaluationPipeline(config, llm_rate_limiter)
     return _pipeline_instance
@@ -1,5 +1,5 @@
-import { useState, useEffect, useCallback } from 'react'
-import { apiClient, type ChatMessage } from '../utils/api'
+import { useState, useEffect, useCallback, useRef } from 'react'
+import { apiClient, StreamError, type ChatMessage } from '../utils/api'
 import { getStoredValue, setStoredValue, getErrorMessage } from '../utils'
 import toast from 'react-hot-toast'
 
@@ -26,6 +26,9 @@ export function useChat() {
     error: null,
   })
 
+  // Earliest time (ms) the server asked us to send again after shedding a turn
+  const retryAtRef = useRef(0)
+
   // Save messages to localStorage
   useEffect(() => {
     setStoredValue('chat_messages', state.messages)
@@ -67,6 +70,12 @@ export function useChat() {
   const sendMessage = useCallback(async (message: string, userName?: string) => {
     if (!message.trim()) return
 
+    const waitSeconds = Math.ceil((retryAtRef.current - Date.now()) / 1000)
+    if (waitSeconds > 0) {
+      toast.error(`Server is busy, please retry in ${waitSeconds}s`)
+      return
+    }
+
     const messageId = `msg_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
     
     // Add user message immediately
@@ -84,31 +93,71 @@ export function useChat() {
       error: null,
     }))
 
+    const chatMessage: ChatMessage = {
+      message: message.trim(),
+      session_id: state.sessionId || undefined,
+      user_name: userName,
+    }
+    const assistantId = `msg_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`
+
+    // Insert or update the assistant message as the answer streams in
+    const upsertAssistant = (content: string, streaming: boolean) => {
+      setState(prev => {
+        const exists = prev.messages.some(m => m.id === assistantId)
+        const assistantMessage = {
+          id: assistantId,
+          role: 'assistant' as const,
+          content,
+          timestamp: new Date().toISOString(),
+          isLoading: streaming,
+        }
+        return {
+          ...prev,
+          messages: exists
+            ? prev.messages.map(m => (m.id === assistantId ? assistantMessage : m))
+            : [...prev.messages, assistantMessage],
+        }
+      })
+    }
+
     try {
-      const chatMessage: ChatMessage = {
-        message: message.trim(),
-        session_id: state.sessionId || undefined,
-        user_name: userName,
+      let streamedText = ''
+      let responseText: string
+      let responseSessionId: string | undefined
+
+      try {
+        const finalEvent = await apiClient.streamMessage(chatMessage, (event) => {
+          if (event.type === 'session') {
+            responseSessionId = event.session_id
+          } else if (event.type === 'token' && event.text) {
+            streamedText += event.text
+            upsertAssistant(streamedText, true)
+          }
+        })
+        responseText = finalEvent.message || streamedText
+      } catch (streamError) {
+        if (streamError instanceof StreamError && streamError.failure === 'busy') {
+          retryAtRef.current = Date.now() + (streamError.retryAfter ?? 1) * 1000
+          throw new Error(`${streamError.message} (retry in ${streamError.retryAfter ?? 1}s)`)
+        }
+        // Only re-send when the stream never reached the agent; otherwise the turn would run twice
+        const unavailable = streamError instanceof StreamError && streamError.failure === 'unavailable'
+        if (!unavailable || streamedText) throw streamError
+        console.warn('Streaming unavailable, falling back to /api/chat:', streamError)
+        const response = await apiClient.sendMessage(chatMessage)
+        responseText = response.response
+        responseSessionId = response.session_id
       }
 
-      const response = await apiClient.sendMessage(chatMessage)
-
       // Update session ID if it's new
-      if (response.session_id !== state.sessionId) {
-        setState(prev => ({ ...prev, sessionId: response.session_id }))
-      }
-
-      // Add assistant response
-      const assistantMessage = {
-        id: `msg_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`,
-        role: 'assistant' as const,
-        content: response.response,
-        timestamp: response.timestamp,
+      if (responseSessionId && responseSessionId !== state.sessionId) {
+        setState(prev => ({ ...prev, sessionId: responseSessionId! }))
       }
 
+      // Replace the streamed text with the complete response
+      upsertAssistant(responseText, false)
       setState(prev => ({
         ...prev,
-        messages: [...prev.messages, assistantMessage],
         isLoading: false,
         isConnected: true,
       }))
@@ -15,6 +15,34 @@ export interface ChatResponse {
   confidence?: number
 }
 
+export interface StreamEvent {
+  type: 'session' | 'accepted' | 'thinking' | 'tool_start' | 'tool_end' | 'token' | 'final' | 'error'
+  session_id?: string
+  text?: string
+  tool?: string
+  message?: string
+  timestamp?: string
+  [key: string]: any
+}
+
+// Why a streaming request failed. Only `unavailable` (network error, or no
+// streaming endpoint) is safe to retry on /api/chat: `busy` is admission
+// control shedding the turn, and `server` / `interrupted` mean the agent
+// already ran it.
+export type StreamFailure = 'unavailable' | 'busy' | 'http' | 'server' | 'interrupted'
+
+export class StreamError extends Error {
+  constructor(
+    message: string,
+    public readonly failure: StreamFailure,
+    public readonly status?: number,
+    public readonly retryAfter?: number, // seconds, for busy (429/503) responses
+  ) {
+    super(message)
+    this.name = 'StreamError'
+  }
+}
+
 export interface SessionRequest {
   user_name?: string
 }
@@ -107,6 +135,63 @@ class ApiClient {
     return response.data
   }
 
+  // Streaming chat over Server-Sent Events; resolves with the final event
+  // Failures are thrown as StreamError
+  async streamMessage(message: ChatMessage, onEvent: (event: StreamEvent) => void): Promise<StreamEvent> {
+    let response: Response
+    try {
+      response = await fetch(`${API_BASE_URL}/api/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', Accept: 'text/event-stream' },
+        body: JSON.stringify(message),
+      })
+    } catch (error) {
+      throw new StreamError(error instanceof Error ? error.message : 'Network error', 'unavailable')
+    }
+    if (!response.ok) {
+      const body = await response.json().catch(() => ({}))
+      const detail = body.detail
+      const text = typeof detail === 'string' ? detail : detail?.message
+      if (response.status === 429 || response.status === 503) {
+        const retryAfter = Number(detail?.retry_after ?? response.headers.get('Retry-After')) || 1
+        throw new StreamError(text || 'Server is busy', 'busy', response.status, retryAfter)
+      }
+      const failure = response.status === 404 || response.status === 405 ? 'unavailable' : 'http'
+      throw new StreamError(text || `Streaming request failed with status ${response.status}`, failure, response.status)
+    }
+    if (!response.body) {
+      throw new StreamError('Streaming is not supported by this browser', 'unavailable')
+    }
+
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    let finalEvent: StreamEvent | null = null
+
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+
+      // SSE frames are separated by a blank line; keep any partial frame
+      const frames = buffer.split('\n\n')
+      buffer = frames.pop() || ''
+      for (const frame of frames) {
+        const data = frame.split('\n').filter(line => line.startsWith('data:')).map(line => line.slice(5).trim()).join('\n')
+        if (!data) continue
+        const event: StreamEvent = JSON.parse(data)
+        onEvent(event)
+        if (event.type === 'final') finalEvent = event
+        if (event.type === 'error') throw new StreamError(event.message || 'Streaming failed', 'server')
+      }
+    }
+
+    if (!finalEvent) {
+      throw new StreamError('Stream ended before the final answer', 'interrupted')
+    }
+    return finalEvent
+  }
+
   // Fund search
   async searchFunds(request: FundSearchRequest): Promise<FundSearchResponse> {
     const response = await this.client.post<FundSearchResponse>('/api/funds/search', request)
@@ -16,11 +16,12 @@ Version: 1.0
 import asyncio
 import json
 import sys
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator
 from dataclasses import dataclass
 from enum import Enum
 
 from agent.core import MutualFundsAgent
+from agent.admission import Overloaded
 from agent.config import AgentConfig
 from utils.logger import setup_logger
 
@@ -51,53 +52,117 @@ class MutualFundsInterface:
         self.agent = MutualFundsAgent(config)
         self.current_session: Optional[UserSession] = None
         
-    async def start_session(self, user_name: Optional[str] = None, 
-                          mode: InteractionMode = InteractionMode.CLI) -> UserSession:
-        """Start a new user session"""
+    def create_session(self, user_name: Optional[str] = None,
+                       mode: InteractionMode = InteractionMode.API,
+                       session_id: Optional[str] = None) -> UserSession:
+        """Create a session without making it current (safe for concurrent API requests)"""
         import uuid
-        session_id = str(uuid.uuid4())
-        self.current_session = UserSession(
-            session_id=session_id,
+        session = UserSession(
+            session_id=session_id or str(uuid.uuid4()),
             user_name=user_name,
             interaction_mode=mode
         )
         
-        logger.info(f"Started new session: {session_id} for user: {user_name}")
+        logger.info(f"Started new session: {session.session_id} for user: {user_name}")
+        return session
+    
+    async def start_session(self, user_name: Optional[str] = None, 
+                          mode: InteractionMode = InteractionMode.CLI) -> UserSession:
+        """Start a new user session and make it the current one (CLI/Jupyter)"""
+        self.current_session = self.create_session(user_name, mode)
         return self.current_session
     
-    async def process_user_input(self, user_input: str) -> str:
-        """Process user input and return agent response"""
-        if not self.current_session:
-            await self.start_session()
+    async def process_user_input(self, user_input: str, session: Optional[UserSession] = None) -> str:
+        """
+        Process user input and return agent response
+        
+        Pass `session` explicitly when handling concurrent requests; without it
+        the interface's current session is used (started on demand).
+        """
+        if session is None:
+            session = self.current_session or await self.start_session()
         
         try:
             # Add user input to conversation history
-            self.current_session.conversation_history.append({
+            user_message = {
                 "role": "user",
                 "content": user_input,
                 "timestamp": self._get_timestamp()
-            })
+            }
+            session.conversation_history.append(user_message)
             
             # Process with agent
             response = await self.agent.process_request(
                 user_input=user_input,
-                session_context=self.current_session.conversation_history,
-                user_name=self.current_session.user_name
+                session_context=session.conversation_history,
+                user_name=session.user_name,
+                session_id=session.session_id
             )
             
-            # Add agent response to history
-            self.current_session.conversation_history.append({
-                "role": "assistant", 
-                "content": response,
-                "timestamp": self._get_timestamp()
-            })
-            
+            self._record_response(session, response)
             return response
             
+        except Overloaded:
+            # Shed before the agent ran: drop the unanswered message and let the caller answer 429/503
+            if user_message in session.conversation_history:
+                session.conversation_history.remove(user_message)
+            raise
         except Exception as e:
             logger.error(f"Error processing user input: {str(e)}")
             return self._generate_error_response(str(e))
     
+    async def stream_user_input(self, user_input: str, session: UserSession) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process user input, yielding agent events as they are produced
+        
+        Events come from MutualFundsAgent.stream_request; the last one is
+        {"type": "final", "message": ...}. Raises Overloaded before the first
+        event if admission control sheds the request.
+        """
+        user_message = {
+            "role": "user",
+            "content": user_input,
+            "timestamp": self._get_timestamp()
+        }
+        session.conversation_history.append(user_message)
+        response = None
+        
+        try:
+            async for event in self.agent.stream_request(
+                user_input=user_input,
+                user_name=session.user_name,
+                session_id=session.session_id
+            ):
+                if event["type"] == "final":
+                    response = event["message"]
+                yield event
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming user input: {str(e)}")
+            response = self._generate_error_response(str(e))
+            yield {"type": "final", "message": response}
+        finally:
+            if response is None:
+                # Shed or abandoned before an answer: don't leave an unanswered message behind
+                if user_message in session.conversation_history:
+                    session.conversation_history.remove(user_message)
+            else:
+                self._record_response(session, response)
+    
+    def _record_response(self, session: UserSession, response: str):
+        """Append the agent's answer to the transcript, keeping it bounded"""
+        session.conversation_history.append({
+            "role": "assistant", 
+            "content": response,
+            "timestamp": self._get_timestamp()
+        })
+        
+        # Keep the transcript bounded; the agent's own memory is token-budgeted separately
+        overflow = len(session.conversation_history) - self.config.SESSION_HISTORY_MAX_MESSAGES
+        if overflow > 0:
+            del session.conversation_history[:overflow]
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
         from datetime import datetime
@@ -4,82 +4,148 @@ Run evaluation tests on the Mutual Funds Agent
 
 import asyncio
 import argparse
-from typing import List, Dict, Any
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from tabulate import tabulate
 
+from agent.config import AgentConfig
 from evaluation.agent_wrapper import get_evaluated_agent
 from database.db import get_eval_db
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Rate-limit buckets shared by the agent, the judge and every shard when no path is configured
+DEFAULT_SHARED_RATE_LIMIT_PATH = "data/eval_rate_limit.sqlite"
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """"2/4" -> (2, 4); shards are numbered from 0"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Shard must look like 0/4, got '{value}'")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"Shard index must be in 0..{count - 1}, got '{value}'")
+    return index, count
+
 
 class EvaluationRunner:
     """Runs evaluation tests and generates reports"""
     
-    def __init__(self):
-        self.agent = get_evaluated_agent()
+    def __init__(self, config: Optional[AgentConfig] = None, workers: int = 1, resume: bool = False,
+                 shard: Tuple[int, int] = (0, 1)):
+        self.config = config or AgentConfig()
+        self.agent = get_evaluated_agent(self.config)
         self.db = get_eval_db()
+        self.workers = max(1, workers)
+        self.resume = resume
+        self.shard = shard
+        
+    def _select_cases(self, category: Optional[str]) -> Tuple[List[Dict[str, Any]], int]:
+        """This shard's test cases, minus those already scored for the agent version when resuming"""
         
+        test_cases = self.db.get_test_cases(category)
+        test_cases.sort(key=lambda case: case['id'])
+        index, count = self.shard
+        test_cases = [case for position, case in enumerate(test_cases) if position % count == index]
+        
+        skipped = 0
+        if self.resume and test_cases:
+            scored = self.db.get_scored_test_queries(self.config.AGENT_VERSION)
+            remaining = [case for case in test_cases if (case['test_query'], case['expected_intent']) not in scored]
+            skipped = len(test_cases) - len(remaining)
+            test_cases = remaining
+            if skipped:
+                logger.info(f"⏭️  Skipping {skipped} test cases already scored for agent version {self.config.AGENT_VERSION}")
+        return test_cases, skipped
+    
     async def run_test_suite(self, category: str = None) -> Dict[str, Any]:
-        """Run all test cases from database"""
+        """Run test cases from database concurrently, printing each result as it completes"""
         
         logger.info(f"🧪 Loading test cases (category: {category or 'ALL'})")
-        test_cases = self.db.get_test_cases(category)
+        test_cases, skipped = self._select_cases(category)
         
         if not test_cases:
-            logger.warning("No test cases found in database")
-            return {'total': 0, 'results': []}
+            logger.warning("No test cases to run")
+            summary = self._generate_summary([])
+            summary['skipped'] = skipped
+            return summary
         
-        logger.info(f"Found {len(test_cases)} test cases")
+        index, count = self.shard
+        shard_label = f", shard {index}/{count}" if count > 1 else ""
+        logger.info(f"Found {len(test_cases)} test cases ({self.workers} workers{shard_label})")
         
+        queue: asyncio.Queue = asyncio.Queue()
+        for test_case in test_cases:
+            queue.put_nowait(test_case)
         results = []
-        for i, test_case in enumerate(test_cases, 1):
-            logger.info(f"\n{'='*80}")
-            logger.info(f"Test Case {i}/{len(test_cases)}")
-            logger.info(f"Query: {test_case['test_query']}")
-            logger.info(f"Expected Intent: {test_case['expected_intent']}")
-            logger.info(f"Category: {test_case['category']}")
-            logger.info(f"{'='*80}")
-            
-            # Run through evaluated agent
-            result = await self.agent.process_request_with_evaluation(
-                user_prompt=test_case['test_query'],
-                expected_intent=test_case['expected_intent']
-            )
-            
-            # Extract key metrics
-            eval_data = result.get('evaluation', {})
-            
-            test_result = {
-                'test_id': test_case['id'],
-                'query': test_case['test_query'],
-                'expected_intent': test_case['expected_intent'],
-                'predicted_intent': eval_data.get('intent_predicted'),
-                'intent_match': eval_data.get('intent_match'),
-                'confidence': eval_data.get('intent_confidence', 0),
-                'passed_threshold': eval_data.get('passed_threshold'),
-                'relevance': eval_data.get('relevance_score'),
-                'hallucination': eval_data.get('hallucination_score'),
-                'faithfulness': eval_data.get('faithfulness_score'),
-                'latency_ms': result.get('latency_ms'),
-                'category': test_case['category'],
-                'difficulty': test_case['difficulty']
-            }
-            
-            results.append(test_result)
-            
-            # Print result summary
-            logger.info(f"\n📊 Results:")
-            logger.info(f"  Intent Match: {'✅' if test_result['intent_match'] else '❌'}")
-            logger.info(f"  Confidence: {test_result['confidence']:.2f}")
-            logger.info(f"  Passed Threshold: {'✅' if test_result['passed_threshold'] else '❌'}")
-            logger.info(f"  Relevance: {test_result['relevance']:.2f}" if test_result['relevance'] else "  Relevance: N/A")
-            logger.info(f"  Latency: {test_result['latency_ms']}ms")
-        
-        return self._generate_summary(results)
+        started = time.time()
+        
+        async def worker():
+            while True:
+                try:
+                    test_case = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                test_result = await self._run_case(test_case)
+                results.append(test_result)
+                self._print_row(test_result, len(results), len(test_cases), started)
+        
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(test_cases)))))
+        
+        results.sort(key=lambda result: result['test_id'])
+        summary = self._generate_summary(results)
+        summary['skipped'] = skipped
+        return summary
     
-    def _generate_summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def _run_case(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one test case through the evaluated agent and extract its key metrics"""
+        
+        logger.info(f"Query: {test_case['test_query']} (expected {test_case['expected_intent']}, {test_case['category']})")
+        
+        # Run through evaluated agent
+        result = await self.agent.process_request_with_evaluation(
+            user_prompt=test_case['test_query'],
+            expected_intent=test_case['expected_intent']
+        )
+        
+        # Extract key metrics
+        eval_data = result.get('evaluation', {})
+        
+        return {
+            'test_id': test_case['id'],
+            'query': test_case['test_query'],
+            'expected_intent': test_case['expected_intent'],
+            'predicted_intent': eval_data.get('intent_predicted'),
+            'intent_match': eval_data.get('intent_match'),
+            'confidence': eval_data.get('intent_confidence', 0),
+            'passed_threshold': eval_data.get('passed_threshold'),
+            'relevance': eval_data.get('relevance_score'),
+            'hallucination': eval_data.get('hallucination_score'),
+            'faithfulness': eval_data.get('faithfulness_score'),
+            'latency_ms': result.get('latency_ms'),
+            'category': test_case['category'],
+            'difficulty': test_case['difficulty']
+        }
+    
+    def _print_row(self, r: Dict[str, Any], done: int, total: int, started: float):
+        """One streaming results-table line per completed test case"""
+        
+        elapsed = time.time() - started
+        eta = elapsed / done * (total - done)
+        relevance = f"{r['relevance']:.2f}" if r.get('relevance') is not None else ' N/A'
+        query = r['query'][:50] + '...' if len(r['query']) > 50 else r['query']
+        print(f"[{done:>4}/{total}] {'✅' if r.get('intent_match') else '❌'} "
+              f"#{r['test_id']:<5} conf={r['confidence'] or 0:.2f} rel={relevance} "
+              f"{r['latency_ms'] or 0:>6}ms  eta={eta:5.0f}s  {query}", flush=True)
+    
+    @staticmethod
+    def _generate_summary(results: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate summary statistics from test results"""
         
         total = len(results)
@@ -103,7 +169,8 @@ class EvaluationRunner:
         
         return summary
     
-    def print_summary(self, summary: Dict[str, Any]):
+    @staticmethod
+    def print_summary(summary: Dict[str, Any]):
         """Print formatted summary table"""
         
         print("\n" + "="*100)
@@ -115,6 +182,8 @@ class EvaluationRunner:
         print(f"  Total Test Cases: {summary['total']}")
         print(f"  Intent Accuracy: {summary['intent_accuracy']:.1%}")
         print(f"  Threshold Pass Rate: {summary['threshold_pass_rate']:.1%}")
+        if summary.get('skipped'):
+            print(f"  Skipped (already scored): {summary['skipped']}")
         
         if summary['avg_relevance']:
             print(f"  Average Relevance: {summary['avg_relevance']:.3f}")
@@ -186,20 +255,91 @@ class EvaluationRunner:
         print("="*80)
 
 
+async def run_sharded(args, processes: int) -> Dict[str, Any]:
+    """Run the suite as `processes` shards in child processes and merge their results"""
+    
+    env = dict(os.environ)
+    # One LLM budget across all shards (see LLMRateLimiter)
+    env.setdefault('LLM_RATE_LIMIT_SHARED_PATH', DEFAULT_SHARED_RATE_LIMIT_PATH)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        outputs = [os.path.join(directory, f"shard_{index}.json") for index in range(processes)]
+        children = []
+        for index, output in enumerate(outputs):
+            command = [sys.executable, os.path.abspath(__file__), '--shard', f"{index}/{processes}",
+                       '--workers', str(args.workers), '--json-out', output]
+            if args.category:
+                command += ['--category', args.category]
+            if args.resume:
+                command.append('--resume')
+            for flag in ('llm_rpm', 'llm_tpm', 'api_concurrency'):
+                if getattr(args, flag) is not None:
+                    command += [f"--{flag.replace('_', '-')}", str(getattr(args, flag))]
+            children.append(await asyncio.create_subprocess_exec(*command, env=env))
+        
+        codes = await asyncio.gather(*(child.wait() for child in children))
+        
+        results, skipped = [], 0
+        for index, (output, code) in enumerate(zip(outputs, codes)):
+            if code != 0 or not os.path.exists(output):
+                logger.error(f"❌ Shard {index}/{processes} failed (exit code {code})")
+                continue
+            with open(output) as f:
+                shard_summary = json.load(f)
+            results.extend(shard_summary['results'])
+            skipped += shard_summary.get('skipped', 0)
+    
+    results.sort(key=lambda result: result['test_id'])
+    summary = EvaluationRunner._generate_summary(results)
+    summary['skipped'] = skipped
+    return summary
+
+
 async def main():
     parser = argparse.ArgumentParser(description='Run MF Agent Evaluation Tests')
     parser.add_argument('--category', type=str, help='Filter by category')
     parser.add_argument('--report', action='store_true', help='Show performance report')
     parser.add_argument('--days', type=int, default=7, help='Days for report')
+    parser.add_argument('--workers', type=int, default=AgentConfig.EVAL_RUNNER_WORKERS,
+                        help='Test cases run concurrently (per process)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip test cases already scored for this AGENT_VERSION')
+    parser.add_argument('--processes', type=int, default=1, help='Split the suite across this many processes')
+    parser.add_argument('--shard', type=parse_shard, default=(0, 1), help='Run only shard INDEX/COUNT, e.g. 0/4')
+    parser.add_argument('--json-out', type=str, help='Write the summary as JSON instead of printing it')
+    parser.add_argument('--llm-rpm', type=int, help='LLM requests per minute (agent and judge combined)')
+    parser.add_argument('--llm-tpm', type=int, help='LLM tokens per minute (agent and judge combined)')
+    parser.add_argument('--api-concurrency', type=int, help='Max in-flight requests per fund API host')
     
     args = parser.parse_args()
     
-    runner = EvaluationRunner()
-    
     if args.report:
-        runner.get_performance_report(args.days)
+        EvaluationRunner().get_performance_report(args.days)
+        return
+    
+    if args.processes > 1:
+        summary = await run_sharded(args, args.processes)
+        EvaluationRunner.print_summary(summary)
+        return
+    
+    config = AgentConfig()
+    if config.LLM_RATE_LIMIT_ENABLED:
+        # The agent and the judge each build a limiter; a shared path makes them draw on one budget
+        config.LLM_RATE_LIMIT_SHARED_PATH = config.LLM_RATE_LIMIT_SHARED_PATH or DEFAULT_SHARED_RATE_LIMIT_PATH
+        os.makedirs(os.path.dirname(config.LLM_RATE_LIMIT_SHARED_PATH) or '.', exist_ok=True)
+    if args.llm_rpm is not None:
+        config.LLM_REQUESTS_PER_MINUTE = args.llm_rpm
+    if args.llm_tpm is not None:
+        config.LLM_TOKENS_PER_MINUTE = args.llm_tpm
+    if args.api_concurrency is not None:
+        config.HTTP_MAX_CONCURRENCY_PER_HOST = args.api_concurrency
+    
+    runner = EvaluationRunner(config, workers=args.workers, resume=args.resume, shard=args.shard)
+    summary = await runner.run_test_suite(args.category)
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(summary, f, default=str)
     else:
-        summary = await runner.run_test_suite(args.category)
         runner.print_summary(summary)
 
 